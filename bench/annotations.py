@@ -0,0 +1,79 @@
+"""
+Declared types: a library of functions that each build on the previous one,
+and a set of users. When only the users change, an annotated library needn't
+be re-inferred: its declared schemes are all the users need. Also shows how
+declared types shorten the chain of dependencies that parallel checking has
+to go through level by level.
+
+    $ python -m bench.annotations
+"""
+import time
+import types
+
+from hindley_milner.src import check, env, parallel, syntax, typ
+from hindley_milner.src.module import check_module
+from hindley_milner.src.parse import parse_module
+
+
+def library(n, annotated):
+    decls = ["fun h0 f x = pair (f x) (f (f x))"]
+    for i in range(1, n):
+        body = f"h{i - 1} f x"
+        if annotated:
+            decls.append(f"fun h{i} (f : a -> a) (x : a) : a * a = {body}")
+        else:
+            decls.append(f"fun h{i} f x = {body}")
+    return decls
+
+
+def users(n, m):
+    return [f"val u{j} = h{(j * 7) % n} succ {j}" for j in range(m)]
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(n=300, m=100):
+    plain = parse_module("\n".join(library(n, False) + users(n, m)))
+    annotated = parse_module("\n".join(library(n, True) + users(n, m)))
+    assert str(check_module(plain, check.Checker())["u1"]) == str(check_module(annotated, check.Checker())["u1"])
+
+    def recheck_plain():
+        check_module(plain, check.Checker())
+
+    def recheck_users_only():
+        # The library's bodies were checked once already. Its declared
+        # schemes are closed, so they go in a read-only frame, like an
+        # interface's.
+        schemes = check_module(annotated[:1], check.Checker())
+        for left, right in annotated[1:n]:
+            schemes[left.name] = typ.generalize(right.declared)
+        checker = check.Checker()
+        frame = types.MappingProxyType({syntax.Ident(k): v for k, v in schemes.items()})
+        checker.type_env = env.Env(parent=env.Env(locals=frame, parent=checker.type_env.parent))
+        check_module(annotated[n:], checker)
+
+    full_plain = timed(recheck_plain)
+    full_annotated = timed(lambda: check_module(annotated, check.Checker()))
+    users_only = timed(recheck_users_only)
+    print(f"{n} library functions, {m} users")
+    print(f"check everything, no annotations:   {full_plain * 1e3:8.1f} ms")
+    print(f"check everything, annotated:        {full_annotated * 1e3:8.1f} ms")
+    print(f"re-check users against declarations: {users_only * 1e3:7.1f} ms  "
+          f"({full_plain / users_only:.1f}x less than re-checking everything)")
+
+    for name, decls in [("no annotations", plain), ("annotated", annotated)]:
+        deps = parallel.dependencies(decls)
+        declared = {i for i, (_, right) in enumerate(decls) if type(right) is syntax.Annotated}
+        waits = [{d for d in ds if d == v or d not in declared} for v, ds in enumerate(deps)]
+        print(f"parallel levels, {name + ':':16} {len(parallel.levels(waits)):5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Throughput of the batch CLI on many small programs piped through stdin.
+
+    $ python -m bench.batch
+"""
+import subprocess
+import sys
+import time
+
+PROGRAMS = [
+    b"succ 1",
+    b"pair (succ 1) true",
+    b"fn x => pair x x",
+    b"not 1",
+    b"let val id = fn x => x in pair (id 1) (id true) end",
+]
+
+
+def main(n=100_000):
+    data = b"\n".join(PROGRAMS[i % len(PROGRAMS)] for i in range(n)) + b"\n"
+    cmd = [sys.executable, "-m", "hindley_milner", "check"]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, input=data, capture_output=True)
+    elapsed = time.perf_counter() - start
+    lines = proc.stdout.count(b"\n")
+    assert lines == n, (lines, proc.stderr.decode())
+    print(f"{n} programs in {elapsed:.2f} s ({n / elapsed:,.0f} programs/s)")
+
+
+if __name__ == '__main__':
+    main()
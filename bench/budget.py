@@ -0,0 +1,54 @@
+"""
+The cost of inference budgets: checking with no budget, with a generous
+one, and how quickly a budget stops a pathological program (a depth-7
+doubling chain).
+
+    $ python -m bench.budget
+"""
+import time
+import timeit
+
+from hindley_milner.src import check
+from hindley_milner.src.budget import Budget, BudgetExceeded
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.parse import parse
+
+PROGRAM = parse(
+    "let fun length l = if null l then 0 else succ (length (tail l)) in "
+    "let val id = fn x => x in "
+    "pair (length (cons (id 1) nil)) (pair (id true) (fn f => fn x => f (f x))) end end"
+)
+
+
+def doubling(n):
+    src = "let val f0 = fn x => pair x x in "
+    for i in range(1, n):
+        src += f"let val f{i} = fn y => f{i - 1} (f{i - 1} y) in "
+    return parse(src + f"f{n - 1}" + " end" * n)
+
+
+def per_check(make_checker, number=2000):
+    def run():
+        checker = make_checker()
+        checker.concretize(infer_type(PROGRAM, checker))
+    return min(timeit.repeat(run, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    plain = per_check(check.Checker)
+    budgeted = per_check(lambda: check.Checker(budget=Budget(10 ** 9, 10 ** 9, 10 ** 9, 3600)))
+    print(f"no budget:       {plain:7.1f} us/check")
+    print(f"generous budget: {budgeted:7.1f} us/check ({budgeted / plain - 1:+.1%})")
+
+    # Concretizing shares subterms, so the types a doubling chain builds stay
+    # small; it's the exponential occurs check that these limits cut short.
+    for limits in (Budget(timeout=0.5), Budget(max_unify_steps=100_000)):
+        start = time.perf_counter()
+        try:
+            infer_type(doubling(7), check.Checker(budget=limits))
+        except BudgetExceeded as err:
+            print(f"stopped after {time.perf_counter() - start:.2f} s: {err.msg}")
+
+
+if __name__ == '__main__':
+    main()
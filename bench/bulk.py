@@ -0,0 +1,70 @@
+"""
+Solving var-to-var equalities in bulk: unifying up to 10^6 pairs of
+variables one pair at a time with `unify`, against `UnifierSet.unify_all`
+with NumPy and with its pure-Python fallback.
+
+    $ python -m bench.bulk
+"""
+import random
+import sys
+import time
+
+from hindley_milner.src import bulk
+from hindley_milner.src.unifier_set import UnifierSet
+
+
+def equalities(unifiers, n, shape, seed=0):
+    vs = [unifiers.fresh_var() for _ in range(n)]
+    if shape == "chain":  # One class: the most rounds for the NumPy solver.
+        return vs[:-1], vs[1:]
+    rng = random.Random(seed)
+    return vs, [rng.choice(vs) for _ in range(n)]
+
+
+def run(n, shape, how):
+    unifiers = UnifierSet()
+    left, right = equalities(unifiers, n, shape)
+    start = time.perf_counter()
+    if how == "one by one":
+        for a, b in zip(left, right):
+            unifiers.unify(a, b)
+    else:
+        unifiers.unify_all(zip(left, right))
+    elapsed = time.perf_counter() - start
+    return elapsed, len({unifiers.root_of(v) for v in left})
+
+
+def main(sizes=(10 ** 4, 10 ** 5, 10 ** 6)):
+    sys.setrecursionlimit(10_000)
+    numpy = bulk.numpy
+    print(f"NumPy {'available' if numpy is not None else 'missing'}")
+    for n in sizes:
+        for shape in ("random", "chain"):
+            timings = {}
+            for how in ("one by one", "bulk, NumPy", "bulk, Python"):
+                if how == "bulk, NumPy" and numpy is None:
+                    continue
+                bulk.numpy = None if how == "bulk, Python" else numpy
+                timings[how] = run(n, shape, how)
+            bulk.numpy = numpy
+            base = timings["one by one"][0]
+            for how, (seconds, classes) in timings.items():
+                print(f"{n:>8} {shape:>6} {how:>13}: {seconds * 1e3:8.1f} ms  {base / seconds:4.1f}x"
+                      f"  ({classes} classes)")
+    n = sizes[-1]
+
+    unifiers = UnifierSet()
+    ends = equalities(unifiers, n, "random")
+    index = {v: i for i, v in enumerate(ends[0])}
+    left, right = [index[v] for v in ends[0]], [index[v] for v in ends[1]]
+    for name, solve in (("NumPy", bulk._components_np), ("Python", bulk._components_py)):
+        if name == "NumPy" and numpy is None:
+            continue
+        args = (numpy.array(left), numpy.array(right)) if name == "NumPy" else (left, right)
+        start = time.perf_counter()
+        solve(*args, n)
+        print(f"components alone, {name}: {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+The cost of constructing many `Checker`s, as done by batch and per-request
+workflows.
+
+    $ python -m bench.checker_construction
+"""
+import timeit
+
+from hindley_milner.src import check
+
+
+def main(n=100_000):
+    best = min(timeit.repeat(check.Checker, number=n, repeat=5))
+    print(f"{n} checkers: {best:.3f} s ({best / n * 1e6:.2f} us each)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Latency of one check: a cold process per query, the client CLI talking to a
+running daemon, and a connected client.
+
+    $ python -m bench.daemon
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from hindley_milner.src import daemon
+
+SRC = "let fun length l = if null l then 0 else succ (length (tail l)) in length end"
+
+COLD = [sys.executable, "-c",
+        "import sys; from hindley_milner.src import program; "
+        "print(program.check_source(sys.argv[1]).type)", SRC]
+
+
+def time_runs(fn, n):
+    times = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e3
+
+
+def wait_for(path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise TimeoutError(path)
+        time.sleep(0.01)
+
+
+def main(processes=10, requests=2000):
+    path = os.path.join(tempfile.mkdtemp(), "bench.sock")
+    server = subprocess.Popen([sys.executable, "-m", "hindley_milner", "daemon", "--socket", path])
+    try:
+        wait_for(path)
+        cold = time_runs(lambda: subprocess.run(COLD, check=True, capture_output=True), processes)
+        client_cmd = [sys.executable, "-m", "hindley_milner", "client", "--socket", path, SRC]
+        cli = time_runs(lambda: subprocess.run(client_cmd, check=True, capture_output=True), processes)
+        with daemon.Client(path) as client:
+            warm = time_runs(lambda: client.check(SRC), requests)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"cold process:       {cold:8.2f} ms")
+    print(f"client CLI + daemon:{cli:8.2f} ms")
+    print(f"connected client:   {warm:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+The reference and iterative engines side by side on a mixed corpus, with
+any programs they disagree on.
+
+    $ python -m bench.engines
+"""
+from hindley_milner.src import engine
+
+
+def corpus():
+    programs = [
+        "let fun length l = if null l then 0 else succ (length (tail l)) in length end",
+        "let val id = fn x => x in pair (id 1) (id true) end",
+        "fn f => fn x => f (f x)",
+        "fn f => pair (f 3) (f true)",
+        "succ true",
+    ]
+    for n in (10, 50, 200):
+        programs.append("succ (" * n + "0" + ")" * n)
+        programs.append("fn x => " * n + "x")
+        programs.append("".join(f"let val x{i} = {i} in " for i in range(n)) + "x0" + " end" * n)
+    # Deep enough for the recursive engine to run out of stack, but not
+    # the iterative one.
+    programs.append("fn x => " * 300 + "x")
+    return programs
+
+
+def main():
+    programs = corpus()
+    result = engine.compare([engine.ReferenceEngine(), engine.IterativeEngine()], programs)
+    print(f"{len(programs)} programs")
+    for name, seconds in result.seconds.items():
+        print(f"{name:>10}: {seconds * 1e3:8.2f} ms")
+    for i, seen in result.disagreements:
+        print(f"disagreement on program {i} ({programs[i][:30]}...):")
+        for name, (kind, text) in seen.items():
+            print(f"  {name:>10}: {kind} {text[:60]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Running checked programs: the closure compiler of `evaluate.compile_ast`
+against the naive tree-walking `evaluate.interpret`.
+
+    $ python -m bench.evaluate
+"""
+import sys
+import timeit
+
+from hindley_milner.src import check, evaluate
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.parse import parse
+
+PROGRAMS = {
+    "fib 20": "let fun fib n = if less n 2 then n else plus (fib (minus n 1)) (fib (minus n 2)) in fib 20 end",
+    "sum of squares": """
+        let fun upto n = if zero n then nil else cons n (upto (pred n)) in
+        let val sq = fn x => times x x in
+        foldl (fn acc => fn x => plus acc (sq x)) 0 (map sq (filter (fn x => eq (mod x 3) 0) (upto 600)))
+        end end
+    """,
+    "tak 14 8 2": """
+        let fun tak x y z = if not (less y x) then z
+                            else tak (tak (pred x) y z) (tak (pred y) z x) (tak (pred z) x y)
+        in tak 14 8 2 end
+    """,
+}
+
+
+def main(repeat=3):
+    sys.setrecursionlimit(20_000)
+    print(f"{'program':>15} {'interpret':>10} {'compile':>10} {'compiled':>10} {'speedup':>8}")
+    for name, src in PROGRAMS.items():
+        ast = parse(src)
+        checker = check.Checker()
+        infer_type(ast, checker)
+        compile_s = min(timeit.repeat(lambda: evaluate.compile_ast(ast, checker), number=1, repeat=repeat))
+        code = evaluate.compile_ast(ast, checker)
+        assert code() == evaluate.interpret(ast)
+        interpreted_s = min(timeit.repeat(lambda: evaluate.interpret(ast), number=1, repeat=repeat))
+        compiled_s = min(timeit.repeat(code, number=1, repeat=repeat))
+        print(f"{name:>15} {interpreted_s * 1e3:8.1f}ms {compile_s * 1e3:8.2f}ms "
+              f"{compiled_s * 1e3:8.1f}ms {interpreted_s / compiled_s:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
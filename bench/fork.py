@@ -0,0 +1,67 @@
+"""
+Trying many candidate completions against one checked prefix: 1000 forks of
+a checker that has checked a large module, against re-checking the prefix
+for every candidate.
+
+    $ python -m bench.fork
+"""
+import time
+
+from hindley_milner.src import check
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.module import check_module
+from hindley_milner.src.parse import parse, parse_module
+
+
+def prefix(n):
+    decls = ["fun compose f g x = f (g x)"]
+    for i in range(n):
+        decls.append(f"val f{i} = fn x => compose (fn p => pair p x) succ {i}")
+    return parse_module("\n".join(decls))
+
+
+CANDIDATES = [parse(src) for src in ["f0 true", "compose zero (fn x => f1 x)", "compose not zero", "f2 (f3 1)"]]
+
+
+def main(n=500, forks=1000):
+    decls = prefix(n)
+    start = time.perf_counter()
+    checker = check.Checker()
+    check_module(decls, checker)
+    prefix_s = time.perf_counter() - start
+    print(f"prefix of {n} declarations: {prefix_s * 1e3:.1f} ms to check, "
+          f"{len(checker.unifiers.map)} unifier entries")
+
+    start = time.perf_counter()
+    for _ in range(forks):
+        checker.fork()
+    fork_s = (time.perf_counter() - start) / forks
+
+    start = time.perf_counter()
+    for i in range(forks):
+        fork = checker.fork()
+        try:
+            fork.concretize(infer_type(CANDIDATES[i % len(CANDIDATES)], fork))
+        except Exception:
+            pass
+    forked_s = (time.perf_counter() - start) / forks
+
+    recheck_forks = 3
+    start = time.perf_counter()
+    for i in range(recheck_forks):
+        fresh = check.Checker()
+        check_module(decls, fresh)
+        try:
+            fresh.concretize(infer_type(CANDIDATES[i % len(CANDIDATES)], fresh))
+        except Exception:
+            pass
+    recheck_s = (time.perf_counter() - start) / recheck_forks
+
+    print(f"fork():                     {fork_s * 1e6:9.1f} us")
+    print(f"fork + check candidate:     {forked_s * 1e6:9.1f} us")
+    print(f"re-check prefix + candidate: {recheck_s * 1e6:8.1f} us  ({recheck_s / forked_s:.0f}x)")
+    print(f"{forks} candidates: {forked_s * forks:.3f} s forked, {recheck_s * forks:.1f} s re-checking")
+
+
+if __name__ == "__main__":
+    main()
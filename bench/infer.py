@@ -0,0 +1,60 @@
+"""
+Recursive `AstNode.infer_type` versus the iterative `infer.infer_type` driver
+on deep inputs.
+
+    $ python -m bench.infer
+"""
+import sys
+import timeit
+
+from hindley_milner.src import check
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.parse import parse
+from hindley_milner.src.syntax import Ident
+
+
+def spine(n):
+    return parse("f" + " 1" * n)
+
+
+def nested(n):
+    return parse("succ (" * n + "0" + ")" * n)
+
+
+def lambdas(n):
+    return parse("fn x => " * n + "x")
+
+
+def checker_for_spine():
+    checker = check.Checker()
+    checker.type_env[Ident("f")] = checker.fresh_var(non_generic=True)
+    return checker
+
+
+def time_it(infer, ast, make_checker, repeat=5):
+    def run():
+        infer(ast, make_checker())
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def main(n=800):
+    # Give the recursive methods enough stack to finish at all.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20 * n))
+
+    def recursive(ast, checker):
+        return ast.infer_type(checker)
+
+    cases = [
+        ("application spine", spine(n), checker_for_spine),
+        ("nested arguments", nested(n), check.Checker),
+        ("nested lambdas", lambdas(n), check.Checker),
+    ]
+    print(f"depth {n}")
+    for name, ast, make_checker in cases:
+        rec = time_it(recursive, ast, make_checker)
+        it = time_it(infer_type, ast, make_checker)
+        print(f"{name:>18}: recursive {rec * 1e3:7.2f} ms   iterative {it * 1e3:7.2f} ms   ({rec / it:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
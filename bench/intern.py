@@ -0,0 +1,61 @@
+"""
+Plain against interned ASTs on generated, duplication-heavy code: parse
+time, memory held by the parsed program, and inference time.
+
+    $ python -m bench.intern
+"""
+import time
+import tracemalloc
+
+from hindley_milner.src import check
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.parse import parse
+
+PIECES = [
+    "(fn f => fn x => f (f (f x)))",
+    "(pair (cons (pair 1 true) nil) (cons (pair 2 false) nil))",
+    "(fn p => pair (snd p) (fst p))",
+    "(if true then fn x => succ (succ x) else fn x => succ x)",
+]
+
+
+def generated(n):
+    """
+    `n` bindings whose right-hand sides mix the same few closed pieces.
+    """
+    src = ""
+    for i in range(n):
+        a, b = PIECES[i % len(PIECES)], PIECES[(i + 1) % len(PIECES)]
+        src += f"let val b{i} = pair {a} (pair {b} {a}) in "
+    return src + "b0" + " end" * n
+
+
+def measure(src, intern):
+    start = time.perf_counter()
+    parse(src, intern=intern)
+    parse_s = time.perf_counter() - start
+
+    tracemalloc.start()
+    ast = parse(src, intern=intern)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    checker = check.Checker()
+    checker.concretize(infer_type(ast, checker))
+    infer_s = time.perf_counter() - start
+    return parse_s, held, infer_s
+
+
+def main():
+    print(f"{'bindings':>8} {'mode':>8} {'parse':>9} {'AST memory':>11} {'infer':>9}")
+    for n in (50, 200, 800):
+        src = generated(n)
+        for intern in (False, True):
+            parse_s, held, infer_s = measure(src, intern)
+            mode = "interned" if intern else "plain"
+            print(f"{n:8d} {mode:>8} {parse_s * 1e3:7.1f}ms {held / 2 ** 20:9.2f}MiB {infer_s * 1e3:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Startup time and memory of `SignatureFile` as the signature file grows.
+
+    $ python -m bench.lazy_prelude
+"""
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from hindley_milner.src import signatures
+from hindley_milner.src.syntax import Ident
+
+TYPES = [
+    "Int -> Int", "a -> list a -> list a", "(a -> b) -> list a -> list b",
+    "a * b -> b", "list (a * Int) -> Bool", "(b -> a -> b) -> b -> list a -> b",
+]
+
+
+def write_prelude(directory, n, seed=0):
+    rng = random.Random(seed)
+    path = os.path.join(directory, f"prelude{n}.sig")
+    with open(path, "w") as f:
+        for i in range(n):
+            f.write(f"fn_{i} : {rng.choice(TYPES)}\n")
+    signatures.write_index(path)
+    return path
+
+
+def main(sizes=(1_000, 10_000, 100_000, 1_000_000), lookups=100):
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'signatures':>10} {'file':>9} {'open':>9} {'lookup':>9} {'python heap':>12}")
+        for n in sizes:
+            path = write_prelude(directory, n)
+            rng = random.Random(1)
+            names = [Ident(f"fn_{rng.randrange(n)}") for _ in range(lookups)]
+
+            start = time.perf_counter()
+            sigs = signatures.SignatureFile(path)
+            opened = time.perf_counter()
+            for name in names:
+                sigs[name]
+            looked_up = time.perf_counter()
+            del sigs
+
+            tracemalloc.start()
+            sigs = signatures.SignatureFile(path)
+            for name in names:
+                sigs[name]
+            heap = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            size = os.path.getsize(path)
+            print(f"{n:>10} {size / 1e6:>7.1f}MB {(opened - start) * 1e6:>7.0f}us "
+                  f"{(looked_up - opened) / lookups * 1e6:>7.1f}us {heap / 1e3:>10.1f}kB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+The cost of `--memprofile`: checking a let-chain-heavy program plainly, and
+with `memprofile.profile_check`, whose report is printed too.
+
+    $ python -m bench.memprofile
+"""
+import timeit
+
+from hindley_milner.src import memprofile, program
+
+
+def chain(n):
+    lines = ["let fun f x = pair x (succ 1) in"]
+    lines += [f"let val a{i} = f (fst (f {i})) in" for i in range(n)]
+    return "\n".join(lines) + " a0" + " end" * (n + 1)
+
+
+def main(n=500, repeat=3):
+    src = chain(n)
+    plain_s = min(timeit.repeat(lambda: program.check_source(src), number=1, repeat=repeat))
+    profiled_s = min(timeit.repeat(lambda: memprofile.profile_check(src), number=1, repeat=repeat))
+    _, report = memprofile.profile_check(src)
+    print(report.format())
+    print()
+    print(f"check_source:  {plain_s * 1e3:8.1f} ms")
+    print(f"profile_check: {profiled_s * 1e3:8.1f} ms  ({profiled_s / plain_s:.1f}x, only with --memprofile)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Sequential versus parallel inference of a wide program: many independent
+`let` bindings, each of them expensive to check.
+
+    $ python -m bench.parallel
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from hindley_milner.src import check, infer, parallel
+from hindley_milner.src.parse import parse
+
+
+def pair_tree(depth, leaf):
+    if depth == 0:
+        return leaf
+    sub = pair_tree(depth - 1, leaf)
+    return f"pair ({sub}) ({sub})"
+
+
+def wide_program(width, depth):
+    bindings = "".join(
+        f"let val b{i} = fn x => {pair_tree(depth, f'succ (succ x)')} in "
+        for i in range(width)
+    )
+    uses = "0"
+    for i in range(width):
+        uses = f"pair (b{i} {i}) ({uses})"
+    return bindings + uses + " end" * width
+
+
+def main(width=16, depth=7):
+    src = wide_program(width, depth)
+    workers = os.cpu_count()
+
+    start = time.perf_counter()
+    checker = check.Checker()
+    infer.infer_type(parse(src), checker)
+    sequential = time.perf_counter() - start
+
+    with ProcessPoolExecutor(workers) as pool:
+        pool.submit(int).result()  # Start the workers before timing.
+        start = time.perf_counter()
+        checker = check.Checker()
+        parallel.infer_parallel(parse(src), checker, pool)
+        par = time.perf_counter() - start
+
+    print(f"{width} bindings, {workers} workers")
+    print(f"sequential: {sequential * 1e3:8.1f} ms")
+    print(f"parallel:   {par * 1e3:8.1f} ms   ({sequential / par:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
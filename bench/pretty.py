@@ -0,0 +1,43 @@
+"""
+Printing let-polymorphic types: `str` against `pretty.show_type`, on the
+doubling program, whose type has 2 ** (n + 1) leaves but O(n) distinct
+subterms.
+
+    $ python -m bench.pretty
+"""
+import time
+
+from hindley_milner.src import check, pretty
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.parse import parse
+
+
+def doubling(n):
+    src = "let val f0 = fn x => pair x x in "
+    for i in range(1, n):
+        src += f"let val f{i} = fn y => f{i - 1} (f{i - 1} y) in "
+    return parse(src + f"f{n - 1}" + " end" * n)
+
+
+def timed(f, *args):
+    start = time.perf_counter()
+    value = f(*args)
+    return value, time.perf_counter() - start
+
+
+def main():
+    print(" n   infer(s)   str(s)   str chars   show(s)  show chars")
+    for n in range(1, 6):
+        checker = check.Checker()
+        t, infer_s = timed(lambda: checker.concretize(infer_type(doubling(n), checker)))
+        if n <= 4:
+            s, str_s = timed(str, t)
+            str_cols = f"{str_s:8.4f} {len(s):11d}"
+        else:
+            str_cols = f"{'-':>8} {'-':>11}"
+        shown, show_s = timed(pretty.show_type, t)
+        print(f"{n:2d} {infer_s:10.4f} {str_cols} {show_s:9.4f} {len(shown):11d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Reporting every type error of a file: one recovering check against fixing
+the first reported error and checking again until none are left, as without
+recovery. Also the cost of recovery on a program without errors.
+
+    $ python -m bench.recovery
+"""
+import timeit
+
+from hindley_milner.src import program
+
+
+def chain(n, bad=()):
+    lines = ["let fun f x = pair x (succ 1) in"]
+    for i in range(n):
+        arg = "true" if i in bad else str(i)
+        lines.append(f"let val a{i} = succ (fst (f {arg})) in")
+    return "\n".join(lines) + " a0" + " end" * (n + 1)
+
+
+def fix_and_rerun(n, bad):
+    bad = set(bad)
+    runs = 0
+    while True:
+        result = program.check_source(chain(n, bad))
+        runs += 1
+        if result.error is None:
+            return runs
+        bad.remove(result.error.lineno - 2)
+
+
+def main(n=400, errors=20, repeat=3):
+    bad = range(0, n, n // errors)
+    src = chain(n, bad)
+    assert len(program.check_source(src, recover=True).errors) == errors
+
+    one_s = min(timeit.repeat(lambda: program.check_source(src, recover=True), number=1, repeat=repeat))
+    rerun_s = min(timeit.repeat(lambda: fix_and_rerun(n, bad), number=1, repeat=repeat))
+    print(f"{n} bindings, {errors} type errors")
+    print(f"recovering check:  {one_s * 1e3:8.1f} ms, 1 run")
+    print(f"fix and re-run:    {rerun_s * 1e3:8.1f} ms, {fix_and_rerun(n, bad)} runs")
+
+    clean = chain(n)
+    plain_s = min(timeit.repeat(lambda: program.check_source(clean), number=1, repeat=repeat))
+    recover_s = min(timeit.repeat(lambda: program.check_source(clean, recover=True), number=1, repeat=repeat))
+    print(f"no errors: {plain_s * 1e3:.1f} ms plain, {recover_s * 1e3:.1f} ms recovering")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Re-entering expressions in the repl: checking each entry in one checker, as
+the repl used to, against `cache.SessionCache`.
+
+    $ python -m bench.session_cache
+"""
+import random
+import timeit
+
+from hindley_milner.src import cache, check, program
+
+ENTRIES = [
+    "let fun f x y = times x y in f end",
+    "fn x => pair x x",
+    "map (fn x => pair x (zero x)) (cons 0 nil)",
+    "let fun fib n = if less n 2 then n else plus (fib (minus n 1)) (fib (minus n 2)) in fib end",
+    "foldr (fn x => fn acc => cons (succ x) acc) nil",
+    "compose (map succ) (filter zero)",
+    "succ true",
+]
+
+
+def session(n=2000, seed=0):
+    rng = random.Random(seed)
+    return [rng.choice(ENTRIES) for _ in range(n)]
+
+
+def main(repeat=3):
+    entries = session()
+
+    def plain():
+        checker = check.Checker()
+        for src in entries:
+            program.check_source(src, checker)
+        return checker
+
+    def cached():
+        checker = check.Checker()
+        memo = cache.SessionCache(checker)
+        for src in entries:
+            memo.check_source(src)
+        return memo
+
+    plain_s = min(timeit.repeat(plain, number=1, repeat=repeat))
+    cached_s = min(timeit.repeat(cached, number=1, repeat=repeat))
+    memo = cached()
+    print(f"{len(entries)} entries, {len(set(entries))} distinct")
+    print(f"check_source:  {plain_s * 1e3:8.1f} ms, {len(plain().unifiers.map)} unifier entries")
+    print(f"SessionCache:  {cached_s * 1e3:8.1f} ms, {len(memo.checker.unifiers.map)} unifier entries"
+          f"  ({plain_s / cached_s:.1f}x)")
+    print(memo.format_stats())
+
+
+if __name__ == "__main__":
+    main()
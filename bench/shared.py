@@ -0,0 +1,123 @@
+"""
+Worker memory and result transfer with and without shared type data.
+
+Each of 4 spawned workers needs a large set of imported signatures. Either
+every worker gets its own pickled copy of the schemes, or they all attach
+to one `shared.SharedTypes` segment. Then results: pickled `typ` object
+graphs against `interface.encode_scheme` buffers.
+
+    $ python -m bench.shared
+"""
+import multiprocessing
+import pickle
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from hindley_milner.src import check, interface, shared, signatures, syntax
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.parse import parse
+
+TYPES = [
+    "Int -> Int", "a -> list a -> list a", "(a -> b) -> list a -> list b",
+    "a * b -> b", "list (a * Int) -> Bool", "(b -> a -> b) -> b -> list a -> b",
+]
+
+_schemes = None
+
+
+def imported(n, seed=0):
+    rng = random.Random(seed)
+    return dict(signatures.parse_signature(f"fn_{i} : {rng.choice(TYPES)}") for i in range(n))
+
+
+def keep_copy(schemes):
+    global _schemes
+    _schemes = schemes
+
+
+def rss_kib():
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            fields[key] = value.split()[0] if value.split() else "0"
+    return int(fields["RssAnon"]), int(fields.get("RssShmem", 0))
+
+
+def idle(_):
+    from hindley_milner.src import std_env  # Import what the others import.
+    return rss_kib()
+
+
+def lookup_copied(names):
+    for name in names:
+        _schemes[name]
+    return rss_kib()
+
+
+def lookup_shared(segment, names):
+    types = shared.attach(segment)
+    for name in names:
+        types[name]
+    return rss_kib()
+
+
+def worker_memory(n=200_000, workers=4, lookups=1000):
+    schemes = imported(n)
+    names = [f"fn_{random.randrange(n)}" for _ in range(lookups)]
+    spawn = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(workers, spawn) as pool:
+        baseline = max(pool.map(idle, range(workers)))
+
+    with ProcessPoolExecutor(workers, spawn, initializer=keep_copy, initargs=(schemes,)) as pool:
+        copied = max(pool.map(lookup_copied, [names] * workers))
+
+    with shared.SharedTypes(schemes) as types:
+        with ProcessPoolExecutor(workers, spawn) as pool:
+            in_shm = max(pool.map(lookup_shared, [types.name] * workers, [names] * workers))
+        size = types.size
+
+    print(f"{n} imported schemes, {workers} workers, {lookups} lookups each")
+    print(f"  idle worker:        private {baseline[0] / 1024:7.1f} MiB")
+    print(f"  pickled copy:       private {copied[0] / 1024:7.1f} MiB per worker")
+    print(f"  shared segment:     private {in_shm[0] / 1024:7.1f} MiB per worker, "
+          f"shared {in_shm[1] / 1024:.1f} MiB ({size / 2 ** 20:.1f} MiB segment, mapped once)")
+
+
+def result_transfer(rounds=200):
+    programs = [
+        "let fun length l = if null l then 0 else succ (length (tail l)) in length end",
+        "fn f => fn g => fn x => pair (f (g x)) (g (f x))",
+        "let val f0 = fn x => pair x x in let val f1 = fn y => f0 (f0 y) in "
+        "let val f2 = fn y => f1 (f1 y) in let val f3 = fn y => f2 (f2 y) in f3 end end end end",
+    ]
+    print(f"result transfer, {rounds} round trips")
+    for src in programs:
+        checker = check.Checker()
+        scheme = checker.generalize(infer_type(parse(src), checker))
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            pickled = pickle.dumps(scheme)
+            pickle.loads(pickled)
+        pickle_s = (time.perf_counter() - start) / rounds
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            encoded = pickle.dumps(interface.encode_scheme(scheme))
+            interface.decode_scheme(pickle.loads(encoded))
+        encode_s = (time.perf_counter() - start) / rounds
+
+        print(f"  {src[:40]:40}  pickled {len(pickled):6d} B {pickle_s * 1e6:7.1f} us"
+              f"   encoded {len(encoded):6d} B {encode_s * 1e6:7.1f} us")
+
+
+def main():
+    worker_memory()
+    result_transfer()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Throughput of `parse` + `infer_type` in N threads, each with its own
+`Checker`. On a free-threaded build (3.13t and later, run with the GIL off)
+this should scale close to linearly up to the number of cores; with the GIL
+it stays flat.
+
+    $ python -m bench.threads [MAX_THREADS]
+"""
+import os
+import sys
+import threading
+import time
+
+from hindley_milner.src import check
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.parse import parse
+
+SRC = (
+    "let fun length l = if null l then 0 else succ (length (tail l)) in "
+    "let val id = fn x => x in "
+    "pair (length (cons (id 1) nil)) (pair (id true) (fn f => fn x => f (f x))) end end"
+)
+
+
+def work(checks):
+    for _ in range(checks):
+        checker = check.Checker()
+        checker.concretize(infer_type(parse(SRC), checker))
+
+
+def checks_per_second(n_threads, checks=300):
+    threads = [threading.Thread(target=work, args=(checks,)) for _ in range(n_threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return n_threads * checks / (time.perf_counter() - start)
+
+
+def main(max_threads):
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'on' if gil else 'off'}, {os.cpu_count()} CPUs")
+    work(50)  # Warm up the prelude cache.
+    base = None
+    n = 1
+    while n <= max_threads:
+        rate = checks_per_second(n)
+        base = base or rate
+        print(f"{n:3d} threads: {rate:8.0f} checks/s  ({rate / base:.2f}x)")
+        n *= 2
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1)
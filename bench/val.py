@@ -0,0 +1,54 @@
+"""
+Let-chain-heavy programs with their `val` bindings inferred as such, versus
+as if they were recursive like `fun`s (the same types, since no binding
+here refers to itself): fresh type variables, unification steps and time.
+
+    $ python -m bench.val
+"""
+import timeit
+
+from hindley_milner.src import check, syntax
+from hindley_milner.src.budget import Budget
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.parse import parse
+
+
+def chain(n):
+    lines = ["let val x0 = 1 in", "let val id = fn x => x in"]
+    for i in range(1, n):
+        rhs = [f"succ x{i - 1}", f"id x{i - 1}", f"fst (pair x{i - 1} true)"][i % 3]
+        lines.append(f"let val x{i} = {rhs} in")
+    return "\n".join(lines) + f" x{n - 1}" + " end" * (n + 1)
+
+
+def as_recursive(ast):
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if type(node) is syntax.Let:
+            node.recursive = True
+        for name in getattr(node, "__dataclass_fields__", ()):
+            child = getattr(node, name)
+            if isinstance(child, syntax.AstNode):
+                stack.append(child)
+    return ast
+
+
+def main(n=2000, repeat=5):
+    src = chain(n)
+    for name, prepare in [("recursive", as_recursive), ("val", lambda ast: ast)]:
+        ast = prepare(parse(src))
+        budget = Budget()
+        checker = check.Checker(budget=budget)
+        t = checker.concretize(infer_type(ast, checker))
+        stats = budget.stats()
+
+        def run():
+            infer_type(ast, check.Checker())
+        seconds = min(timeit.repeat(run, number=1, repeat=repeat))
+        print(f"{name:>9}: {t}, {stats['fresh_vars']:6} fresh vars, "
+              f"{stats['unify_steps']:6} unify steps, {seconds * 1e3:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
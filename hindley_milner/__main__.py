@@ -1,48 +1,120 @@
-import rply
+import argparse
+import sys
 
-from hindley_milner.src import check
-from hindley_milner.src import unifier_set
-from hindley_milner.src import parse
-from hindley_milner.src import env
 
+def repl(memprofile=False):
+    # Imported here so that the client subcommand starts quickly.
+    from hindley_milner.src import cache
+    from hindley_milner.src import check
+    from hindley_milner.src import pretty
 
-def repl():
     checker = check.Checker()
+    session = cache.SessionCache(checker)
 
     while True:
         inp = input("==> ")
 
-        try:
-            ast = parse.parse(inp)
-        except rply.errors.LexingError as err:
-            idx = err.source_pos.idx
-            lineno = err.source_pos.lineno
-            colno = err.source_pos.colno
+        if inp.strip() == ":stats":
+            print(session.format_stats())
+            continue
+        if memprofile:
+            # Profile every check, repeated or not.
+            from hindley_milner.src.memprofile import profile_check
+            result, report = profile_check(inp, checker)
+            print(report.format())
+        else:
+            result = session.check_source(inp)
+        if result.error is not None:
+            print(result.error.message)
+        else:
+            print(f"_ : {pretty.show_type(result.type)}")
 
-            if lineno < 0 and colno < 0:
-                pos = f"at index {idx}"
-            else:
-                pos = f"on line {lineno}, column {colno} "
 
-            print(f"Lexing Error: Unexpected character {pos}!")
-            continue
-        except rply.errors.ParsingError as err:
-            lineno = err.source_pos.lineno
-            colno = err.source_pos.colno
-            print(f"Parsing Error: Unexpected token on line {lineno}, column {colno}!")
-            continue
+def run(paths) -> int:
+    """
+    Prints the value and type of each program, or why it couldn't run.
+    """
+    import rply
+    from hindley_milner.src import env, evaluate, pretty, program, unifier_set
 
+    if paths:
+        sources = []
+        for path in paths:
+            with open(path) as f:
+                sources.append(f.read())
+    else:
+        sources = [line for line in sys.stdin if line.strip()]
+    status = 0
+    for src in sources:
         try:
-            t = ast.infer_type(checker)
-            t = checker.unifiers.concretize(t)
-            print(f"_ : {t}")
-        except env.EnvKeyError as err:
-            print(f"Semantic Error: Unrecognized symbol '{err.key}'!")
-            continue
-        except unifier_set.UnificationError as err:
-            print(err.msg)
+            value, t = evaluate.run_source(src)
+        except rply.errors.LexingError as err:
+            print(program.lexing_diagnostic(src, err).message)
+        except rply.errors.ParsingError as err:
+            print(program.parsing_diagnostic(src, err).message)
+        except (env.EnvKeyError, unifier_set.UnificationError) as err:
+            print(program.inference_diagnostic(src, err).message)
+        except evaluate.EvalError as err:
+            print(f"Runtime Error: {err.msg}")
+        else:
+            print(f"{evaluate.show_value(value, t)} : {pretty.show_type(t)}")
             continue
+        status = 1
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m hindley_milner")
+    parser.add_argument("--lsp", action="store_true",
+                        help="run a language server over stdio instead of the repl")
+    parser.add_argument("--memprofile", action="store_true",
+                        help="report the memory used by each check (repl and check)")
+    commands = parser.add_subparsers(dest="command")
+
+    check_cmd = commands.add_parser("check", help="check programs, writing JSON lines")
+    check_cmd.add_argument("files", nargs="*",
+                           help="one program per file (default: one per line of stdin)")
+    check_cmd.add_argument("--cache", metavar="DIR", help="reuse results from a cache directory")
+    check_cmd.add_argument("--all-errors", action="store_true",
+                           help="carry on past type errors to report them all")
+
+    daemon_cmd = commands.add_parser("daemon", help="serve checks on a Unix socket")
+    daemon_cmd.add_argument("--socket", help="socket path (default: in the temp directory)")
+    daemon_cmd.add_argument("--timeout", type=float, default=10.0,
+                            help="seconds a check may take (default: %(default)s)")
+    daemon_cmd.add_argument("--workers", type=int, help="worker threads for checks")
+
+    run_cmd = commands.add_parser("run", help="check and run programs")
+    run_cmd.add_argument("files", nargs="*",
+                         help="one program per file (default: one per line of stdin)")
+
+    client_cmd = commands.add_parser("client", help="check programs using a running daemon")
+    client_cmd.add_argument("--socket", help="socket path (default: in the temp directory)")
+    client_cmd.add_argument("src", nargs="*", help="programs to check (default: one per line of stdin)")
+
+    args = parser.parse_args(argv)
+
+    if args.lsp:
+        from hindley_milner.src import lsp
+        return lsp.main()
+    elif args.command == "check":
+        from hindley_milner.src import batch
+        if args.all_errors and args.cache is not None:
+            parser.error("--all-errors can't be used with --cache")
+        if args.memprofile and args.cache is not None:
+            parser.error("--memprofile can't be used with --cache")  # A hit infers nothing.
+        return batch.main(args.files, args.cache, args.memprofile, args.all_errors)
+    elif args.command == "daemon":
+        from hindley_milner.src import daemon
+        return daemon.run_daemon(args.socket, args.timeout, args.workers)
+    elif args.command == "run":
+        return run(args.files)
+    elif args.command == "client":
+        from hindley_milner.src import daemon_client
+        sources = args.src or (line.rstrip("\n") for line in sys.stdin)
+        return daemon_client.run_client(sources, args.socket)
+    repl(args.memprofile)
 
 
 if __name__ == '__main__':
-    repl()
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Checking many programs non-interactively, writing one JSON object per
+program:
+
+    $ python -m hindley_milner check prog.hm other.hm
+    {"file": "prog.hm", "type": "(Int × Bool)"}
+    {"file": "other.hm", "error": {"kind": "type", "message": "Type mismatch: Int != Bool", ...}}
+
+    $ python -m hindley_milner check --all-errors other.hm
+    {"file": "other.hm", "error": {...}, "errors": [{"kind": "type", ...}, {"kind": "type", ...}]}
+
+    $ printf 'succ 1\\nnot 1\\n' | python -m hindley_milner check
+    {"line": 1, "type": "Int"}
+    {"line": 2, "error": {"kind": "type", ...}}
+
+A file holds one program. On stdin (or when the file is `-`), every
+non-blank line is a program. Error positions are relative to the program.
+
+Input is read in chunks and output is buffered. Output is flushed whenever
+the next read might block, so results stream out as soon as they're ready
+without paying for a flush per program.
+"""
+
+import json
+import sys
+from typing import BinaryIO, Callable, Iterable, Optional
+
+from hindley_milner.src import program
+
+CHUNK_SIZE = 64 * 1024
+
+Check = Callable[[str], program.Result]
+
+
+def _write(outfile: BinaryIO, record: dict) -> None:
+    outfile.write(json.dumps(record, ensure_ascii=False).encode())
+    outfile.write(b"\n")
+
+
+def check_lines(infile: BinaryIO, outfile: BinaryIO, check: Check = program.check_source) -> int:
+    """
+    Checks each non-blank line of `infile` as a program. Returns the number
+    of programs that were rejected.
+    """
+    failures = 0
+    lineno = 0
+    pending = b""
+    read = getattr(infile, "read1", infile.read)
+
+    def check_line(line: bytes):
+        nonlocal failures
+        src = line.decode("utf-8", "replace").strip()
+        if src:
+            result = check(src)
+            failures += result.error is not None
+            _write(outfile, {"line": lineno, **result.as_dict()})
+
+    while True:
+        chunk = read(CHUNK_SIZE)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            lineno += 1
+            check_line(line)
+        outfile.flush()  # About to wait for more input.
+
+    if pending:
+        lineno += 1
+        check_line(pending)
+    outfile.flush()
+    return failures
+
+
+def check_files(paths: Iterable[str], outfile: BinaryIO, check: Check = program.check_source) -> int:
+    """
+    Checks each file as one program (`-` meaning stdin, line by line).
+    Returns the number of programs that were rejected.
+    """
+    failures = 0
+    for path in paths:
+        if path == "-":
+            failures += check_lines(sys.stdin.buffer, outfile, check)
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                src = f.read()
+        except (OSError, UnicodeDecodeError) as err:
+            failures += 1
+            _write(outfile, {"file": path, "error": {"kind": "io", "message": str(err)}})
+        else:
+            result = check(src)
+            failures += result.error is not None
+            _write(outfile, {"file": path, **result.as_dict()})
+        outfile.flush()
+    return failures
+
+
+def main(paths: Iterable[str], cache_dir: Optional[str] = None, memprofile: bool = False,
+         all_errors: bool = False) -> int:
+    """
+    Returns an exit status: 1 if any program was rejected. With
+    `memprofile`, a memory report for each program goes to stderr. With
+    `all_errors`, a program's record lists all its type errors, not just
+    the first. Neither goes with `cache_dir`.
+    """
+    check = program.check_source
+    if all_errors:
+        def check(src: str) -> program.Result:
+            return program.check_source(src, recover=True)
+    elif cache_dir is not None:
+        from hindley_milner.src.cache import InferenceCache
+        check = InferenceCache(cache_dir).check_source
+    if memprofile:
+        from hindley_milner.src.memprofile import profile_check
+
+        def check(src: str) -> program.Result:
+            result, report = profile_check(src, recover=all_errors)
+            print(report.format(), file=sys.stderr)
+            return result
+
+    paths = list(paths)
+    if paths:
+        failures = check_files(paths, sys.stdout.buffer, check)
+    else:
+        failures = check_lines(sys.stdin.buffer, sys.stdout.buffer, check)
+    return 1 if failures else 0
@@ -0,0 +1,109 @@
+"""
+Limits on the work a single check may do.
+
+Let-polymorphism can make types exponentially large in the size of the
+program:
+
+    let val f = fn x => pair x x in
+    let val g = fn x => f (f x) in
+    let val h = fn x => g (g x) in h end end end
+
+A `Budget` caps the number of unification steps, the size of any one type
+built, the number of fresh type variables and the wall-clock time of a
+check. Going over raises `BudgetExceeded`, which carries the counts so far.
+
+Counting only happens when a checker has a budget; without one, the cost is
+an attribute test per unification step or fresh variable.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+# How often, in counted events, to look at the clock.
+CLOCK_INTERVAL = 1024
+
+
+class BudgetExceeded(Exception):
+    def __init__(self, msg, stats):
+        self.msg = msg
+        self.stats = stats
+
+
+@dataclass
+class Budget:
+    """
+    Any limit left as None is not enforced.
+
+    Example:
+    >>> from hindley_milner.src import check
+    >>> from hindley_milner.src.parse import parse
+    >>> checker = check.Checker(budget=Budget(max_fresh_vars=3))
+    >>> try:
+    ...     parse("pair (pair 1 2) (pair 3 4)").infer_type(checker)
+    ... except BudgetExceeded as err:
+    ...     print(err.msg)
+    Too many fresh type variables (limit 3)!
+    """
+    max_unify_steps: Optional[int] = None
+    max_type_size: Optional[int] = None
+    max_fresh_vars: Optional[int] = None
+    timeout: Optional[float] = None  # Seconds, from `start()`.
+
+    unify_steps: int = field(default=0, init=False)
+    fresh_vars: int = field(default=0, init=False)
+    largest_type: int = field(default=0, init=False)
+    _started: float = field(default=0.0, init=False, repr=False)
+    _deadline: Optional[float] = field(default=None, init=False, repr=False)
+    _ticks: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        self.start()
+
+    def start(self) -> "Budget":
+        """
+        Resets the counts and starts the clock.
+        """
+        self.unify_steps = self.fresh_vars = self.largest_type = self._ticks = 0
+        self._started = time.monotonic()
+        self._deadline = None if self.timeout is None else self._started + self.timeout
+        return self
+
+    def stats(self) -> dict:
+        return {
+            "unify_steps": self.unify_steps,
+            "fresh_vars": self.fresh_vars,
+            "largest_type": self.largest_type,
+            "elapsed": time.monotonic() - self._started,
+        }
+
+    def _exceeded(self, msg):
+        raise BudgetExceeded(msg, self.stats())
+
+    def _tick(self):
+        self._ticks += 1
+        if self._ticks % CLOCK_INTERVAL == 0 and self._deadline is not None:
+            if time.monotonic() > self._deadline:
+                self._exceeded(f"Check took longer than {self.timeout} seconds!")
+
+    def unify_step(self):
+        self.unify_steps += 1
+        if self.max_unify_steps is not None and self.unify_steps > self.max_unify_steps:
+            self._exceeded(f"Too many unification steps (limit {self.max_unify_steps})!")
+        self._tick()
+
+    def fresh_var(self):
+        self.fresh_vars += 1
+        if self.max_fresh_vars is not None and self.fresh_vars > self.max_fresh_vars:
+            self._exceeded(f"Too many fresh type variables (limit {self.max_fresh_vars})!")
+        self._tick()
+
+    def type_node(self, size: int):
+        """
+        Called for every node of a type being built, with the size so far.
+        """
+        if size > self.largest_type:
+            self.largest_type = size
+            if self.max_type_size is not None and size > self.max_type_size:
+                self._exceeded(f"Type too large (limit {self.max_type_size} nodes)!")
+        self._tick()
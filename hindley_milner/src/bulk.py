@@ -0,0 +1,74 @@
+"""
+Solving many variable-to-variable equalities at once.
+
+`components(left, right, n)` finds the connected components of the graph on
+nodes `0 .. n-1` with an edge between `left[i]` and `right[i]` for each `i`,
+labelling each node with the smallest node of its component:
+
+    >>> components([0, 3, 4], [1, 2, 3], 6)
+    [0, 0, 2, 2, 2, 5]
+
+With NumPy, this runs on arrays by hooking and pointer jumping, in the style
+of Shiloach and Vishkin: each round, every edge hooks the larger of its two
+labels onto the smaller, then every label jumps to its label's label until
+the labels are roots again. A component's labels collapse in a number of
+rounds logarithmic in its size. NumPy is optional; without it a union-find
+in Python gives the same labels.
+
+`UnifierSet.unify_all` uses it once a run of equalities it has gathered is
+long enough to pay for the conversion to arrays. `UnifierSet.unify` never
+does: only types with thousands of children would reach it, and no program
+writes those.
+"""
+
+from typing import List, Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Shorter runs of var-to-var equalities are joined one by one.
+MIN_EQUALITIES = 1024
+
+
+def components(left: Sequence[int], right: Sequence[int], n: int) -> List[int]:
+    if numpy is None:
+        return _components_py(left, right, n)
+    return _components_np(numpy.asarray(left, dtype=numpy.int64),
+                          numpy.asarray(right, dtype=numpy.int64), n).tolist()
+
+
+def _components_np(left, right, n):
+    labels = numpy.arange(n, dtype=numpy.int64)
+    while True:
+        a, b = labels[left], labels[right]
+        differ = a != b
+        if not differ.any():
+            return labels
+        a, b = a[differ], b[differ]
+        # Both are roots, so hooking the larger onto the smaller can't make a cycle.
+        numpy.minimum.at(labels, numpy.maximum(a, b), numpy.minimum(a, b))
+        while True:
+            jumped = labels[labels]
+            if numpy.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+
+def _components_py(left, right, n):
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # Path halving.
+            x = parent[x]
+        return x
+
+    for a, b in zip(left, right):
+        a, b = find(a), find(b)
+        if a < b:
+            parent[b] = a
+        elif b < a:
+            parent[a] = b
+    return [find(x) for x in range(n)]
@@ -0,0 +1,245 @@
+"""
+Caches of inference results: `InferenceCache`, content-addressed and on
+disk, and `SessionCache`, a small in-memory one for a repl session.
+
+`InferenceCache` keys results by a hash of the source text, the prelude version and the
+engine version, so a hit skips lexing, parsing and inference altogether. Each
+entry is one file, written atomically (to a temporary file, then renamed into
+place), so any number of processes can share a cache directory. When the
+directory grows past its size limit, the least recently used entries are
+evicted; a hit refreshes an entry's modification time.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from hindley_milner.src import check, interface, program, std_env, typ
+
+TYPE_ENTRY = b"T"
+ERROR_ENTRY = b"E"
+
+
+class InferenceCache:
+    """
+    Example:
+    >>> import tempfile
+    >>> cache = InferenceCache(tempfile.mkdtemp())
+    >>> print(cache.check_source("pair 1 true").type)
+    (Int × Bool)
+    >>> print(cache.check_source("pair 1 true").type)
+    (Int × Bool)
+    >>> cache.stats()
+    {'hits': 1, 'misses': 1, 'writes': 1, 'evictions': 0}
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._size: Optional[int] = None  # Lazily computed total entry size.
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, src: str) -> str:
+        h = hashlib.sha256()
+        for part in (check.ENGINE_VERSION, std_env.prelude_version(), src):
+            data = part.encode()
+            h.update(len(data).to_bytes(8, "little"))
+            h.update(data)
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, src: str) -> Optional[program.Result]:
+        path = self._path(self.key(src))
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # Mark as recently used.
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return decode_result(data)
+
+    def put(self, src: str, result: program.Result) -> None:
+        path = self._path(self.key(src))
+        data = encode_result(result)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.writes += 1
+        self._size = self._total_size() if self._size is None else self._size + len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def check_source(self, src: str) -> program.Result:
+        """
+        Like `program.check_source`, but answered from the cache when
+        possible.
+        """
+        result = self.get(src)
+        if result is None:
+            result = program.check_source(src)
+            self.put(src, result)
+            # Hand back exactly what a later hit will see.
+            result = decode_result(encode_result(result))
+        return result
+
+    def _entries(self):
+        for sub in os.scandir(self.directory):
+            if sub.is_dir():
+                for entry in os.scandir(sub.path):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue  # Evicted by another process.
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+    def _total_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> None:
+        """
+        Removes least recently used entries until the cache is back under
+        90% of its size limit.
+        """
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+
+def env_key(checker: check.Checker) -> Tuple:
+    """
+    What a check in `checker`'s environment depends on, besides the source:
+    the concretized bindings of its frames above the prelude.
+    """
+    frames = []
+    frame = checker.type_env
+    while frame is not None and isinstance(frame.locals, dict):
+        frames.append(tuple(
+            (str(k), str(v) if type(v) is typ.Scheme else str(checker.concretize(v)))
+            for k, v in frame.locals.items()
+        ))
+        frame = frame.parent
+    return tuple(frames)
+
+
+class SessionCache:
+    """
+    A bounded, least recently used cache of checks run in one checker, as
+    the repl does. Entries are keyed by the source and `env_key`. A hit
+    hands back the stored, generalized type and leaves the checker alone,
+    where a miss parses and infers again, growing its unifier.
+
+    Example:
+    >>> cache = SessionCache(check.Checker())
+    >>> print(cache.check_source("pair 1 nil").type)
+    (Int × (list α))
+    >>> print(cache.check_source("pair 1 nil").type)
+    (Int × (list α))
+    >>> cache.hits, cache.misses
+    (1, 1)
+    """
+
+    def __init__(self, checker: check.Checker, max_entries: int = 256):
+        self.checker = checker
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, object]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.hit_seconds = 0.0
+        self.miss_seconds = 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def check_source(self, src: str) -> program.Result:
+        start = time.perf_counter()
+        key = src, env_key(self.checker)
+        entry = self._entries.get(key)
+        hit = entry is not None
+        if hit:
+            self._entries.move_to_end(key)
+        else:
+            result = program.check_source(src, self.checker)
+            # A type is kept as a scheme, a diagnostic as it is.
+            entry = result.error if result.error is not None else typ.generalize(result.type)
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if type(entry) is typ.Scheme:
+            result = program.Result(type=entry.body)
+        else:
+            result = program.Result(error=entry)
+        elapsed = time.perf_counter() - start
+        if hit:
+            self.hits += 1
+            self.hit_seconds += elapsed
+        else:
+            self.misses += 1
+            self.miss_seconds += elapsed
+        return result
+
+    def format_stats(self) -> str:
+        """
+        The hit rate and the mean latency of hits and of misses.
+        """
+        lookups = self.hits + self.misses
+        rate = 100 * self.hits / lookups if lookups else 0.0
+        return (
+            f"hits: {self.hits}/{lookups} ({rate:.1f}%), "
+            f"entries: {len(self)}/{self.max_entries}\n"
+            f"mean hit: {_ms(self.hit_seconds, self.hits)}, "
+            f"mean miss: {_ms(self.miss_seconds, self.misses)}"
+        )
+
+
+def _ms(seconds: float, n: int) -> str:
+    return f"{1e3 * seconds / n:.3f} ms" if n else "-"
+
+
+def encode_result(result: program.Result) -> bytes:
+    if result.error is None:
+        return TYPE_ENTRY + interface.encode_scheme(typ.generalize(result.type))
+    else:
+        return ERROR_ENTRY + json.dumps(vars(result.error)).encode()
+
+
+def decode_result(data: bytes) -> program.Result:
+    if data[:1] == TYPE_ENTRY:
+        return program.Result(type=interface.decode_scheme(data, 1).body)
+    else:
+        return program.Result(error=program.Diagnostic(**json.loads(data[1:])))
@@ -1,16 +1,92 @@
 from contextlib import contextmanager
+from typing import List, Optional, Set
 
+from hindley_milner.src import engine as engines
 from hindley_milner.src import env
 from hindley_milner.src import syntax
 from hindley_milner.src import typ
 from hindley_milner.src import unifier_set
 from hindley_milner.src import std_env
 
+# Bump whenever a change to inference can change the result for some program,
+# so that stale cached results are never used.
+ENGINE_VERSION = "4"
+
 
 class Checker:
-    def __init__(self):
+    """
+    The state of one check: its unifiers and a type environment over the
+    shared, read-only prelude. Every inference step mutates it, so a
+    `Checker` must only be used by one thread at a time.
+    """
+
+    def __init__(self, budget=None, engine=None):
+        self.engine: engines.Engine = engines.ITERATIVE if engine is None else engine
         self.unifiers = unifier_set.UnifierSet()
-        self.type_env: std_env.StdEnv = std_env.std_env(self)
+        self.unifiers.budget = budget
+        self.type_env: std_env.StdEnv = env.Env(parent=std_env.PRELUDE)
+        # The errors recovered from so far, when recovering (see `recover`).
+        self.errors: Optional[List[Exception]] = None
+
+    def fork(self) -> "Checker":
+        """
+        Returns a checker that carries on from this one's state independently,
+        e.g. to try several continuations of one checked prefix. Forking
+        takes time proportional to the scope depth, not to the size of the
+        state; afterwards each checker pays only for what it changes.
+
+        Example:
+        >>> checker = Checker()
+        >>> a = checker.fresh_var()
+        >>> other = checker.fork()
+        >>> checker.unify(a, typ.Int)
+        >>> other.unify(a, typ.Bool)
+        >>> checker.concretize(a), other.concretize(a)
+        (Int, Bool)
+        """
+        copy = Checker.__new__(Checker)
+        copy.engine = self.engine
+        copy.unifiers = self.unifiers.fork()
+        copy.type_env = self.type_env.fork()
+        copy.errors = None if self.errors is None else list(self.errors)
+        return copy
+
+    @property
+    def budget(self):
+        """
+        The `budget.Budget` limiting this checker's work, or None.
+        """
+        return self.unifiers.budget
+
+    @budget.setter
+    def budget(self, budget):
+        self.unifiers.budget = budget
+
+    def recover(self, err: Exception, node, path=None) -> typ.Type:
+        """
+        Called by an engine with an `EnvKeyError` or `UnificationError`
+        raised while checking `node`, reached by `path` if it's shared (see
+        `infer.infer_type`). Unless `errors` is a list, re-raises it.
+        Otherwise records it and returns `typ.Error`, the type `node` gets so
+        that checking can carry on.
+
+        Example:
+        >>> checker = Checker()
+        >>> checker.errors = []
+        >>> x = syntax.Ident("x")
+        >>> checker.recover(env.EnvKeyError(x), x)
+        Error
+        >>> len(checker.errors)
+        1
+        """
+        if self.errors is None:
+            raise err
+        if getattr(err, "node", None) is None:
+            err.node = node
+            if path is not None:
+                err.path = path
+        self.errors.append(err)
+        return typ.Error
 
     def is_non_generic(self, v):
         return v in self.unifiers.non_generic_vars
@@ -67,6 +143,107 @@ class Checker:
         """
         return self.unifiers.concretize(t)
 
+    def instantiate(self, t) -> typ.Type:
+        """
+        Gives a type for a use of a binding whose type (or scheme) is `t`.
+
+        The bound variables of a `typ.Scheme` are replaced with fresh ones.
+        Anything else is duplicated with `duplicate_type`.
+
+        Example:
+        >>> checker = Checker()
+        >>> a = typ.Var("a")
+        >>> checker.instantiate(typ.Scheme([a], typ.Fn(a, a)))
+        Fn(Var('α'), Var('α'))
+        """
+        return self.engine.instantiate(self, t)
+
+    def generalize(self, t: typ.Type) -> typ.Scheme:
+        """
+        Quantifies over the variables of `t` that aren't free in the type
+        environment. Those still belong to an enclosing binder (a lambda
+        parameter, say) and must be shared, not copied, on instantiation.
+
+        Example:
+        >>> checker = Checker()
+        >>> a, b = checker.fresh_var(), checker.fresh_var()
+        >>> checker.type_env[syntax.Ident("x")] = b
+        >>> print(checker.generalize(typ.Fn(a, b)))
+        ∀α. (α → β)
+        """
+        return self.engine.generalize(self, t)
+
+    def env_vars(self) -> Set[typ.Var]:
+        """
+        The type variables free in the (non-prelude) type environment.
+        """
+        found = set()
+        frame = self.type_env
+        while frame is not None:
+            if isinstance(frame.locals, dict):
+                for t in frame.locals.values():
+                    if type(t) is typ.Scheme:
+                        free = [v for v in typ.type_vars(t.body) if v not in t.bound]
+                    else:
+                        free = typ.type_vars(t)
+                    for v in free:
+                        if v in self.unifiers:
+                            found.update(typ.type_vars(self.concretize(v)))
+                        else:
+                            found.add(v)
+            frame = frame.parent
+        return found
+
+    def check_declared(self, declared: typ.Scheme, t: typ.Type) -> None:
+        """
+        Checks that an expression of type `t` has the `declared` type. Each
+        bound variable of `declared` is rigid: it must stay a variable of its
+        own, not fixed by the environment.
+
+        Example:
+        >>> checker = Checker()
+        >>> a = typ.Var("a")
+        >>> b = checker.fresh_var()
+        >>> checker.check_declared(typ.Scheme([a], typ.Fn(a, a)), typ.Fn(b, b))
+        >>> try:
+        ...     checker.check_declared(typ.Scheme([a], typ.Fn(a, a)), typ.Fn(typ.Int, typ.Int))
+        ... except unifier_set.AnnotationError as err:
+        ...     print(err.msg)
+        Declared type (a → a) is too general: a is Int
+        """
+        rigid = {v: self.fresh_var() for v in declared.bound}
+        self.unify(self._substitute(declared.body, rigid), t)
+        seen = dict()
+        for v, r in rigid.items():
+            root = self.concretize(r)
+            if type(root) is not typ.Var:
+                problem = f"{v} is {root}"
+            elif root in seen:
+                problem = f"{seen[root]} and {v} are the same type"
+            else:
+                seen[root] = v
+                continue
+            raise unifier_set.AnnotationError(f"Declared type {declared.body} is too general: {problem}")
+        if seen:
+            env_vars = self.env_vars()
+            fixed = [v for root, v in seen.items() if root in env_vars]
+            if fixed:
+                msg = f"Declared type {declared.body} is too general: {fixed[0]} depends on the environment"
+                raise unifier_set.AnnotationError(msg)
+
+    def _substitute(self, t: typ.Type, substitutions, memo=None) -> typ.Type:
+        memo = dict() if memo is None else memo
+        if type(t) is typ.Var:
+            return substitutions.get(t, t)
+        elif isinstance(t, typ.Poly) and t.vals:
+            done = memo.get(id(t))
+            if done is None:
+                cls = type(t)
+                done = memo[id(t)] = cls(*(self._substitute(x, substitutions, memo) for x in t.vals))
+            return done
+        else:
+            return t
+
     def duplicate_type(self, t: typ.Type, substitutions=None) -> typ.Type:
         """
         Duplicates a type, taking into consideration the genericness and
@@ -84,7 +261,10 @@ class Checker:
         # If t = Var("a") and Var("a") is unified with Tuple(x, y), duplicate
         # the Tuple, not the Var.
         t = self.unifiers.concretize(t)
+        return self._duplicate(t, substitutions, dict())
 
+    def _duplicate(self, t: typ.Type, substitutions, memo) -> typ.Type:
+        # `t` is already concretized. Shared subterms are copied once.
         if type(t) is typ.Var:
             if self.is_non_generic(t):
                 # Non-generic variables should be shared, not duplicated.
@@ -98,11 +278,13 @@ class Checker:
                 substitutions[t] = self.fresh_var()
                 return substitutions[t]
         elif isinstance(t, typ.Poly):
-            cls = type(t)
-            args = (self.duplicate_type(x, substitutions) for x in t.vals)
-            return cls(*args)
+            done = memo.get(id(t))
+            if done is None:
+                cls = type(t)
+                done = memo[id(t)] = cls(*(self._duplicate(x, substitutions, memo) for x in t.vals))
+            return done
 
     def unify(self, t1: typ.Type, t2: typ.Type) -> None:
-        self.unifiers.unify(t1, t2)
+        self.engine.unify(self, t1, t2)
 
 
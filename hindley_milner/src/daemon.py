@@ -0,0 +1,176 @@
+"""
+A long-lived check server on a Unix socket, so that clients don't pay for
+interpreter start-up and parser construction on every query.
+
+    $ python -m hindley_milner daemon &
+    $ python -m hindley_milner client "pair 1 true"
+    _ : (Int × Bool)
+
+`daemon_client` has a blocking client, kept apart so that it starts quickly.
+
+The protocol is JSON lines. Each request is an object with an `op`, and may
+carry an `id`, which is echoed back in its response:
+
+    {"id": 1, "op": "check", "src": "succ 1"}  ->  {"id": 1, "type": "Int"}
+    {"op": "check", "src": "succ true"}        ->  {"error": {"kind": "type", ...}}
+    {"op": "reset"}                            ->  {"ok": true}
+    {"op": "ping"}                             ->  {"ok": true}
+
+Every connection is a session with a `Checker` of its own, like a `repl()`,
+and its requests are answered in order. Checks run on a pool of worker
+threads, so the event loop keeps serving other sessions meanwhile. A check
+is held to a `budget.Budget` with a deadline (the daemon's timeout, or the
+request's own `timeout`, a positive number of seconds), so a pathological
+program stops itself and gets a "budget" error. Should a check still not
+finish shortly after its deadline, it's answered with a "timeout" error and
+the session carries on with a fresh checker.
+"""
+
+import asyncio
+import json
+import math
+import os
+import signal
+import socket
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional
+
+from hindley_milner.src import budget, check, program
+from hindley_milner.src.daemon_client import Client, DaemonError, default_socket_path
+
+DEFAULT_TIMEOUT = 10.0
+GRACE = 1.0  # Seconds past its deadline before a check is abandoned.
+LINE_LIMIT = 16 * 1024 * 1024  # Longest request, in bytes.
+
+
+def _error(kind: str, message: str) -> dict:
+    return {"error": {"kind": kind, "message": message}}
+
+
+class Session:
+    def __init__(self):
+        self.checker = check.Checker()
+
+
+class Daemon:
+    def __init__(self, path: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT,
+                 executor: Optional[Executor] = None, workers: Optional[int] = None):
+        self.path = path or default_socket_path()
+        self.timeout = timeout
+        self.executor = executor or ThreadPoolExecutor(workers)
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.sessions = 0
+
+    async def start(self) -> None:
+        _remove_stale_socket(self.path)
+        self.server = await asyncio.start_unix_server(self.handle, self.path, limit=LINE_LIMIT)
+
+    async def serve_forever(self) -> None:
+        if self.server is None:
+            await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = Session()
+        self.sessions += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # Longer than LINE_LIMIT.
+                    writer.write(json.dumps(_error("protocol", "Request too long!")).encode() + b"\n")
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await self.respond(session, line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    async def respond(self, session: Session, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("expected an object")
+        except ValueError as err:
+            return _error("protocol", f"Bad request: {err}")
+
+        op = request.get("op")
+        if op == "check":
+            response = await self.check(session, request)
+        elif op == "reset":
+            session.checker = check.Checker()
+            response = {"ok": True}
+        elif op == "ping":
+            response = {"ok": True}
+        else:
+            response = _error("protocol", f"Unknown op {op!r}!")
+
+        if "id" in request:
+            response = {"id": request["id"], **response}
+        return response
+
+    async def check(self, session: Session, request: dict) -> dict:
+        src = request.get("src")
+        if not isinstance(src, str):
+            return _error("protocol", "Expected a string `src`!")
+        timeout = request.get("timeout", self.timeout)
+        if type(timeout) not in (int, float) or not 0 < timeout < math.inf:
+            return _error("request", f"Expected a positive number of seconds for `timeout`, found {timeout!r}!")
+        loop = asyncio.get_running_loop()
+        limits = budget.Budget(timeout=timeout)
+        work = loop.run_in_executor(self.executor, program.check_source, src, session.checker, limits)
+        try:
+            result = await asyncio.wait_for(work, timeout + GRACE)
+        except asyncio.TimeoutError:
+            # The worker may still be using the old checker; leave it to it.
+            session.checker = check.Checker()
+            return _error("timeout", f"Check took longer than {timeout} seconds!")
+        return result.as_dict()
+
+
+def _remove_stale_socket(path: str) -> None:
+    """
+    Removes a socket file left behind by a daemon that is no longer running.
+    """
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX) as sock:
+        try:
+            sock.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)
+            return
+    raise DaemonError(f"A daemon is already listening on {path}!")
+
+
+def run_daemon(path: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT,
+               workers: Optional[int] = None) -> None:
+    daemon = Daemon(path, timeout, workers=workers)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        await daemon.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
@@ -0,0 +1,69 @@
+"""
+A blocking client for `daemon`. It only needs the standard library's socket
+and json modules, so a short-lived client process starts quickly.
+"""
+
+import json
+import os
+import socket
+import tempfile
+from typing import Iterable, Optional
+
+
+def default_socket_path() -> str:
+    return os.path.join(tempfile.gettempdir(), f"hindley-milner-{os.getuid()}.sock")
+
+
+class DaemonError(Exception):
+    def __init__(self, msg):
+        self.msg = msg
+
+
+class Client:
+    """
+    A blocking client for one session.
+    """
+
+    def __init__(self, path: Optional[str] = None, timeout: Optional[float] = None):
+        self.sock = socket.socket(socket.AF_UNIX)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path or default_socket_path())
+        self.file = self.sock.makefile("rwb")
+
+    def request(self, **fields) -> dict:
+        self.file.write(json.dumps(fields).encode() + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise DaemonError("The daemon closed the connection!")
+        return json.loads(line)
+
+    def check(self, src: str) -> dict:
+        return self.request(op="check", src=src)
+
+    def close(self) -> None:
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_client(sources: Iterable[str], path: Optional[str] = None) -> int:
+    """
+    Checks each source in one session, printing results like the repl does.
+    Returns 1 if any check failed.
+    """
+    status = 0
+    with Client(path) as client:
+        for src in sources:
+            response = client.check(src)
+            if "error" in response:
+                print(response["error"]["message"])
+                status = 1
+            else:
+                print(f"_ : {response['type']}")
+    return status
@@ -36,13 +36,13 @@ class DisjointSet:
         return all(x_root == self.root_of(y) for y in ys)
 
     def __contains__(self, other):
-        return other in self.map.keys()
+        return other in self.map
 
     def update(self, other):
         self.map.update(other)
 
     def add(self, e):
-        if e not in self.map.keys():
+        if e not in self.map:
             self.map[e] = 1  # Root node of tree with size 1.
 
     def root_of(self, e):
@@ -59,7 +59,8 @@ class DisjointSet:
         r1 = self.root_of(e1)
         r2 = self.root_of(e2)
 
-        self.join_roots(r1, r2)
+        if r1 != r2:  # Already joined otherwise; don't make a root its own parent.
+            self.join_roots(r1, r2)
 
     def join_roots(self, r1, r2):
         """
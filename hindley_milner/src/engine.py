@@ -0,0 +1,304 @@
+"""
+Inference engines.
+
+An engine is the algorithm behind a `check.Checker`: how an expression's type
+is inferred, and how types are unified, instantiated and generalized. The AST
+doesn't know the rules; `AstNode.infer_type` asks the checker's engine, so an
+alternative algorithm can be tried without touching `syntax`:
+
+    >>> from hindley_milner.src import check
+    >>> from hindley_milner.src.parse import parse
+    >>> checker = check.Checker(engine=ReferenceEngine())
+    >>> print(checker.concretize(parse("pair (succ 1) true").infer_type(checker)))
+    (Int × Bool)
+
+`ReferenceEngine` is the recursive algorithm of Cardelli's paper.
+`IterativeEngine`, the default, runs the same rules with the explicit work
+stack of `infer.infer_type`. Both recover from errors when the checker asks
+them to (see `check.Checker.recover`); only the iterative one infers a
+closed subtree shared by an interned AST once, which saves time without
+changing any type. `compare` checks a corpus with several engines and
+reports each one's time and any programs on which they disagree:
+
+    $ python -m hindley_milner.src.engine FILE...
+"""
+
+import functools
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Protocol, Sequence, Tuple
+
+from hindley_milner.src import env, syntax, typ, unifier_set
+
+
+class Engine(Protocol):
+    name: str
+
+    def infer(self, node: "syntax.AstNode", checker) -> typ.Type:
+        """
+        Infers the type of `node`, storing it in `node._type`.
+        """
+
+    def unify(self, checker, t1: typ.Type, t2: typ.Type) -> None:
+        ...
+
+    def instantiate(self, checker, t) -> typ.Type:
+        """
+        Gives a type for a use of a binding whose type (or scheme) is `t`.
+        """
+
+    def generalize(self, checker, t: typ.Type) -> typ.Scheme:
+        ...
+
+
+class ReferenceEngine:
+    """
+    Recursive inference, one method per kind of node.
+    """
+    name = "reference"
+
+    @functools.cached_property
+    def _rules(self):
+        # Built on first use: this module is imported while `syntax` is.
+        return {
+            syntax.Ident: self.infer_ident,
+            syntax.Const: self.infer_const,
+            syntax.Lambda: self.infer_lambda,
+            syntax.Call: self.infer_call,
+            syntax.If: self.infer_if,
+            syntax.Let: self.infer_let,
+            syntax.Annotated: self.infer_annotated,
+        }
+
+    def infer(self, node, checker) -> typ.Type:
+        rule = self._rules.get(type(node))
+        if rule is None:
+            raise TypeError(f"No inference rule for {type(node).__name__}!")
+        try:
+            return rule(node, checker)
+        except Exception as err:
+            # Record where inference stopped, as `infer.infer_type` does.
+            if getattr(err, "node", None) is None:
+                err.node = node
+            raise
+
+    def infer_ident(self, node, checker) -> typ.Type:
+        try:
+            return checker.instantiate(checker.type_env[node])
+        except env.EnvKeyError as err:
+            return checker.recover(err, node)
+
+    def infer_const(self, node, checker) -> typ.Type:
+        return node.type
+
+    def infer_lambda(self, node, checker) -> typ.Type:
+        # In a new scope, infer the type of the body.
+        # Scoped because `node.param` is valid only inside this scope.
+        # Parameter types are non-generic while checking the body.
+        with checker.new_scope(), checker.scoped_non_generic() as arg_type:
+            checker.type_env[node.param] = arg_type
+            if node.annotation is not None:
+                try:
+                    checker.unify(arg_type, checker.instantiate(typ.generalize(node.annotation)))
+                except unifier_set.UnificationError as err:
+                    checker.recover(err, node)
+            body_type = node.body.infer_type(checker)
+
+        # After inferring body's type, arg type might be known.
+        arg_type = checker.unifiers.concretize(arg_type)
+
+        return typ.Fn(arg_type, body_type)
+
+    def infer_call(self, node, checker) -> typ.Type:
+        # Get best guess as to the type of `node.arg`.
+        arg_type = node.arg.infer_type(checker)
+
+        # Set up a function type.
+        beta = checker.fresh_var()
+        fn_type_joiner = typ.Fn(arg_type, beta)
+
+        # Ensure the `node.fn` refers to a Fn type.
+        fn_type = node.fn.infer_type(checker)
+
+        try:
+            checker.unify(fn_type, fn_type_joiner)
+        except unifier_set.UnificationError as err:
+            return checker.recover(err, node)
+        if checker.errors is not None and checker.unifiers.concretize(fn_type) == typ.Error:
+            return typ.Error  # Whatever it's applied to.
+
+        # In case beta's root was changed in the last unification, get it's
+        # current root.
+        return checker.unifiers.concretize(beta)
+
+    def infer_if(self, node, checker) -> typ.Type:
+        pred_type = node.pred.infer_type(checker)
+        try:
+            checker.unify(pred_type, typ.Bool)
+        except unifier_set.UnificationError as err:
+            checker.recover(err, node.pred)
+
+        yes_type = node.yes.infer_type(checker)
+        no_type = node.no.infer_type(checker)
+        try:
+            checker.unify(yes_type, no_type)
+        except unifier_set.UnificationError as err:
+            return checker.recover(err, node)
+
+        return checker.unifiers.concretize(yes_type)
+
+    def infer_let(self, node, checker) -> typ.Type:
+        # A declared type is `left`'s scheme from the start, so the body
+        # doesn't wait on `right`, nor depend on how it's inferred.
+        if type(node.right) is syntax.Annotated:
+            declared = typ.generalize(node.right.declared)
+            if not node.recursive:
+                node.right.infer_type(checker)
+            with checker.new_scope():
+                checker.type_env[node.left] = declared
+                if node.recursive:
+                    node.right.infer_type(checker)
+                return node.body.infer_type(checker)
+
+        # A `val` can't refer to itself, so `right` needs no placeholder
+        # type for `left`: its type is bound as is. Its variables are
+        # generic unless fixed by an enclosing binder, so uses of `left`
+        # copy them just as they would `alpha`'s below.
+        if not node.recursive:
+            right_type = node.right.infer_type(checker)
+            with checker.new_scope():
+                checker.type_env[node.left] = right_type
+                return node.body.infer_type(checker)
+
+        # Scope the `left = right` binding.
+        with checker.new_scope():
+
+            # First, bind `left` to a fresh type variable. This allows
+            # for recursive let statements.
+            # Note: `alpha` is only non-generic while inferring `right`. TODO: Why tho?
+            with checker.scoped_non_generic() as alpha:
+                checker.type_env[node.left] = alpha
+
+                # Next infer the type of `right` using the binding just created.
+                right_type = node.right.infer_type(checker)
+
+            # Link the type variable with the inferred type of `right`.
+            try:
+                checker.unify(alpha, right_type)
+            except unifier_set.UnificationError as err:
+                checker.recover(err, node.right)
+
+            # With the environment set up, now the body can be typechecked.
+            return node.body.infer_type(checker)
+
+    def infer_annotated(self, node, checker) -> typ.Type:
+        declared = typ.generalize(node.declared)
+        try:
+            checker.check_declared(declared, node.expr.infer_type(checker))
+        except unifier_set.UnificationError as err:
+            checker.recover(err, node)  # Uses still get the declared type.
+        return checker.instantiate(declared)
+
+    def unify(self, checker, t1: typ.Type, t2: typ.Type) -> None:
+        checker.unifiers.unify(t1, t2)
+
+    def instantiate(self, checker, t) -> typ.Type:
+        if type(t) is not typ.Scheme:
+            return checker.duplicate_type(t)
+        substitutions = {v: checker.fresh_var() for v in t.bound}
+        return checker._substitute(t.body, substitutions)
+
+    def generalize(self, checker, t: typ.Type) -> typ.Scheme:
+        t = checker.concretize(t)
+        fixed = checker.env_vars()
+        bound = [v for v in typ.type_vars(t) if v not in fixed]
+        return typ.Scheme(bound, t)
+
+
+class IterativeEngine(ReferenceEngine):
+    """
+    The reference rules, driven by `infer.infer_type` so that deep programs
+    don't hit the recursion limit.
+    """
+    name = "iterative"
+
+    def infer(self, node, checker) -> typ.Type:
+        from hindley_milner.src import infer  # It imports `check`, which imports this.
+        return infer.infer_type(node, checker)
+
+
+REFERENCE = ReferenceEngine()
+ITERATIVE = IterativeEngine()
+
+Outcome = Tuple[str, str]  # ("type", canonical type) or ("error", class name)
+
+
+def outcome(src: str, engine: Engine) -> Outcome:
+    """
+    Checks `src` with a fresh checker using `engine`. Types are compared up
+    to the names of their variables, errors by their class.
+    """
+    from hindley_milner.src import check, pretty
+    from hindley_milner.src.parse import parse
+    checker = check.Checker(engine=engine)
+    try:
+        t = checker.concretize(parse(src).infer_type(checker))
+    except Exception as err:
+        return "error", type(err).__name__
+    names = {v: typ.Var(f"t{i}") for i, v in enumerate(typ.type_vars(t))}
+    return "type", pretty.show_type(checker._substitute(t, names))
+
+
+@dataclass
+class Comparison:
+    seconds: Dict[str, float] = field(default_factory=dict)  # By engine name.
+    # Per disagreeing program: its index in the corpus and every outcome.
+    disagreements: List[Tuple[int, Dict[str, Outcome]]] = field(default_factory=list)
+
+
+def compare(engines: Sequence[Engine], corpus: Iterable[str], repeat: int = 3) -> Comparison:
+    """
+    Checks every program in `corpus` with each engine. An engine's time is
+    the best of `repeat` runs over the whole corpus.
+
+    >>> c = compare([ReferenceEngine(), IterativeEngine()], ["succ 1", "not 1"], repeat=1)
+    >>> sorted(c.seconds), c.disagreements
+    (['iterative', 'reference'], [])
+    """
+    corpus = list(corpus)
+    result = Comparison()
+    outcomes = {}
+    for engine in engines:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            found = [outcome(src, engine) for src in corpus]
+            best = min(best, time.perf_counter() - start)
+        result.seconds[engine.name] = best
+        outcomes[engine.name] = found
+    for i in range(len(corpus)):
+        seen = {name: found[i] for name, found in outcomes.items()}
+        if len(set(seen.values())) > 1:
+            result.disagreements.append((i, seen))
+    return result
+
+
+def main(paths: List[str]) -> int:
+    corpus = []
+    for path in paths:
+        with open(path) as f:
+            corpus.append(f.read())
+    engines = [ReferenceEngine(), IterativeEngine()]
+    result = compare(engines, corpus)
+    for name, seconds in result.seconds.items():
+        print(f"{name:>12}: {seconds * 1e3:9.2f} ms")
+    for i, seen in result.disagreements:
+        print(f"{paths[i]}:")
+        for name, (kind, text) in seen.items():
+            print(f"  {name:>12}: {kind} {text}")
+    return 1 if result.disagreements else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
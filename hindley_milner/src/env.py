@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Optional, Dict, TypeVar, Generic
 
+from hindley_milner.src import overlay
+
 K = TypeVar("K")
 V = TypeVar("V")
 MISSING = object()
@@ -22,10 +24,46 @@ class Env(Generic[K, V]):
         self.locals[key] = value
 
     def __getitem__(self, key: K) -> V:
-        res = self.locals.get(key, MISSING)
-        if res is not MISSING:
-            return res
-        elif self.parent is not None:
-            return self.parent[key]
-        else:
-            raise EnvKeyError(key)
+        # Walk the chain with a loop; long `let` chains make deep envs.
+        frame = self
+        while frame is not None:
+            res = frame.locals.get(key, MISSING)
+            if res is not MISSING:
+                return res
+            frame = frame.parent
+        raise EnvKeyError(key)
+
+    def frame_of(self, key: K) -> Optional[Env[K, V]]:
+        """
+        The innermost frame that binds `key`, or None.
+        """
+        frame = self
+        while frame is not None:
+            if key in frame.locals:
+                return frame
+            frame = frame.parent
+        return None
+
+    def fork(self) -> Env[K, V]:
+        """
+        Returns an independent copy of this chain of frames, in time
+        proportional to its length. Frames whose `locals` aren't a `dict`,
+        like the prelude's, are read-only and stay shared.
+
+        >>> outer = Env(locals={"x": 1})
+        >>> inner = Env(parent=outer)
+        >>> copy = inner.fork()
+        >>> copy.parent["x"] = 2
+        >>> inner["x"], copy["x"]
+        (1, 2)
+        """
+        frames = []
+        frame = self
+        while frame is not None and isinstance(frame.locals, dict):
+            frames.append(frame)
+            frame = frame.parent
+        copy = frame
+        for frame in reversed(frames):
+            frame.locals, mine = overlay.fork_dict(frame.locals)
+            copy = Env(mine, copy)
+        return copy
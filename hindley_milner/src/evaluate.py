@@ -0,0 +1,366 @@
+"""
+Running checked programs.
+
+`compile_ast(ast, checker)` turns an AST that `checker` has inferred into
+nested Python closures, once, and returns a function that runs it:
+
+    >>> from hindley_milner.src.parse import parse
+    >>> ast = parse("let fun fact n = if zero n then 1 else times n (fact (pred n)) in fact 5 end")
+    >>> checker = check.Checker()
+    >>> t = ast.infer_type(checker)
+    >>> compile_ast(ast, checker)()
+    120
+
+Names are resolved to frame depths at compile time, and the types
+inferred for each node pick specialized code: a saturated call of a prelude
+primitive at its prelude type, like `plus x y` or `fst p`, becomes the Python
+operation itself, and an `If` on a `Bool` tests it directly. Since the
+program has been checked, none of this needs runtime tag checks.
+
+`interpret(ast)` is the naive tree-walking interpreter it's measured against:
+it looks names up in `env.Env` chains and checks the tag of every value it
+branches on or calls. It also runs unchecked programs, for what that's worth.
+
+Values are Python ints and bools, tuples for tuples, `None` for the empty
+list and `(head, tail)` pairs for the others, and one-argument callables
+for functions. `show_value` writes one according to its type.
+"""
+
+from typing import Callable, Dict, Optional
+
+from hindley_milner.src import check, env, std_env, syntax, typ
+
+
+class EvalError(Exception):
+    def __init__(self, msg):
+        self.msg = msg
+
+
+def _from_list(items, tail=None):
+    for item in reversed(items):
+        tail = (item, tail)
+    return tail
+
+
+def _iter(xs):
+    while xs is not None:
+        yield xs[0]
+        xs = xs[1]
+
+
+def _head(xs):
+    if xs is None:
+        raise EvalError("head of an empty list!")
+    return xs[0]
+
+
+def _tail(xs):
+    if xs is None:
+        raise EvalError("tail of an empty list!")
+    return xs[1]
+
+
+def _div(a, b):
+    if b == 0:
+        raise EvalError("Division by zero!")
+    return a // b
+
+
+def _mod(a, b):
+    if b == 0:
+        raise EvalError("Division by zero!")
+    return a % b
+
+
+def _foldl(f, acc, xs):
+    for x in _iter(xs):
+        acc = f(acc)(x)
+    return acc
+
+
+def _foldr(f, acc, xs):
+    for x in reversed(list(_iter(xs))):
+        acc = f(x)(acc)
+    return acc
+
+
+def _curry(n, fn):
+    if n == 1:
+        return fn
+    return lambda x: _curry(n - 1, lambda *rest: fn(x, *rest))
+
+
+# The value of each prelude name.
+PRELUDE: Dict[str, object] = {
+    "zero": lambda n: n == 0,
+    "succ": lambda n: n + 1,
+    "pred": lambda n: n - 1,
+    "plus": lambda a: lambda b: a + b,
+    "minus": lambda a: lambda b: a - b,
+    "times": lambda a: lambda b: a * b,
+    "div": _curry(2, _div),
+    "mod": _curry(2, _mod),
+    "eq": lambda a: lambda b: a == b,
+    "less": lambda a: lambda b: a < b,
+    "not": lambda b: not b,
+    "and": lambda a: lambda b: a and b,
+    "or": lambda a: lambda b: a or b,
+    "pair": lambda a: lambda b: (a, b),
+    "fst": lambda p: p[0],
+    "snd": lambda p: p[1],
+    "nil": None,
+    "cons": lambda x: lambda xs: (x, xs),
+    "null": lambda xs: xs is None,
+    "head": _head,
+    "tail": _tail,
+    "length": lambda xs: sum(1 for _ in _iter(xs)),
+    "append": lambda xs: lambda ys: _from_list(list(_iter(xs)), ys),
+    "reverse": lambda xs: _foldl(lambda acc: lambda x: (x, acc), None, xs),
+    "map": lambda f: lambda xs: _from_list([f(x) for x in _iter(xs)]),
+    "filter": lambda f: lambda xs: _from_list([x for x in _iter(xs) if f(x)]),
+    "foldl": _curry(3, _foldl),
+    "foldr": _curry(3, _foldr),
+    "zip": lambda xs: lambda ys: _from_list(list(zip(_iter(xs), _iter(ys)))),
+    "id": lambda x: x,
+    "const": lambda x: lambda y: x,
+    "compose": lambda f: lambda g: lambda x: f(g(x)),
+    "flip": lambda f: lambda x: lambda y: f(y)(x),
+}
+
+# Prelude functions that saturated calls are replaced with, by name and
+# number of arguments. Each takes the compiled arguments and returns the
+# compiled call. Only total functions are here, so that errors are raised
+# by `PRELUDE` the same way whichever path a program takes.
+_UNARY = {
+    "zero": lambda a: lambda e: a(e) == 0,
+    "succ": lambda a: lambda e: a(e) + 1,
+    "pred": lambda a: lambda e: a(e) - 1,
+    "not": lambda a: lambda e: not a(e),
+    "fst": lambda a: lambda e: a(e)[0],
+    "snd": lambda a: lambda e: a(e)[1],
+    "null": lambda a: lambda e: a(e) is None,
+}
+_BINARY = {
+    "plus": lambda a, b: lambda e: a(e) + b(e),
+    "minus": lambda a, b: lambda e: a(e) - b(e),
+    "times": lambda a, b: lambda e: a(e) * b(e),
+    "eq": lambda a, b: lambda e: a(e) == b(e),
+    "less": lambda a, b: lambda e: a(e) < b(e),
+    # Both operands are evaluated, as they would be for a call.
+    "and": lambda a, b: lambda e: a(e) & b(e),
+    "or": lambda a, b: lambda e: a(e) | b(e),
+    "pair": lambda a, b: lambda e: (a(e), b(e)),
+    "cons": lambda a, b: lambda e: (a(e), b(e)),
+}
+
+
+def _const_value(node: syntax.Const):
+    value = node.value
+    return _from_list(value) if isinstance(value, list) else value
+
+
+def interpret(ast: syntax.AstNode, scope: Optional[env.Env] = None):
+    """
+    Evaluates `ast` by walking it. `scope` maps `Ident`s to values, over
+    the prelude's.
+
+    >>> from hindley_milner.src.parse import parse
+    >>> interpret(parse("let val f = fn x => pair x x in f 3 end"))
+    (3, 3)
+    """
+    if scope is None:
+        scope = env.Env(locals={syntax.Ident(k): v for k, v in PRELUDE.items()})
+    cls = type(ast)
+    if cls is syntax.Const:
+        return _const_value(ast)
+    elif cls is syntax.Ident:
+        try:
+            return scope[ast]
+        except env.EnvKeyError:
+            raise EvalError(f"Unbound name '{ast.name}'!")
+    elif cls is syntax.Lambda:
+        return lambda v: interpret(ast.body, env.Env(locals={ast.param: v}, parent=scope))
+    elif cls is syntax.Call:
+        fn = interpret(ast.fn, scope)
+        if not callable(fn):
+            raise EvalError(f"Called a value that isn't a function: {fn!r}!")
+        return fn(interpret(ast.arg, scope))
+    elif cls is syntax.If:
+        cond = interpret(ast.pred, scope)
+        if type(cond) is not bool:
+            raise EvalError(f"Expected a Bool, found {cond!r}!")
+        return interpret(ast.yes if cond else ast.no, scope)
+    elif cls is syntax.Let:
+        # A chain of `let`s in a loop, so that long ones don't recurse.
+        while type(ast) is syntax.Let:
+            inner = env.Env(parent=scope)
+            inner[ast.left] = interpret(ast.right, inner if ast.recursive else scope)
+            scope, ast = inner, ast.body
+        return interpret(ast, scope)
+    elif cls is syntax.Annotated:
+        return interpret(ast.expr, scope)
+    raise EvalError(f"Can't evaluate a {cls.__name__}!")
+
+
+# Compiled code runs on frames: `[value, parent frame]` lists, one per
+# binding, so that a recursive binding's frame can be made before its value.
+
+def _lookup(depth: int) -> Callable:
+    if depth == 0:
+        return lambda e: e[0]
+    elif depth == 1:
+        return lambda e: e[1][0]
+    elif depth == 2:
+        return lambda e: e[1][1][0]
+
+    def lookup(e):
+        for _ in range(depth):
+            e = e[1]
+        return e[0]
+    return lookup
+
+
+class _Compiler:
+    def __init__(self, checker: check.Checker):
+        self.checker = checker
+
+    def type_of(self, node: syntax.AstNode) -> typ.Type:
+        return self.checker.concretize(node.type)
+
+    def is_primitive(self, fn: syntax.AstNode, scope, arity: int) -> bool:
+        """
+        Whether `fn` names a prelude primitive of `arity` arguments, used at
+        its prelude type, which its inlined code relies on.
+        """
+        table = _UNARY if arity == 1 else _BINARY
+        if type(fn) is not syntax.Ident or fn.name not in table or fn.name in scope:
+            return False
+        scheme = std_env.PRELUDE[fn]
+        # The polymorphic ones (`pair`, `fst`, `null`...) only move values
+        # around, so their inlined code is right at any instance.
+        return bool(scheme.bound) or self.type_of(fn) == scheme.body
+
+    def compile(self, node: syntax.AstNode, scope: Dict[str, int], depth: int) -> Callable:
+        """
+        `scope` maps each local name to the depth of the frame that binds
+        it; `depth` is the number of frames so far.
+        """
+        cls = type(node)
+        if cls is syntax.Const:
+            value = _const_value(node)
+            return lambda e: value
+        elif cls is syntax.Ident:
+            if node.name in scope:
+                return _lookup(depth - 1 - scope[node.name])
+            if node.name not in PRELUDE:
+                raise EvalError(f"Unbound name '{node.name}'!")
+            value = PRELUDE[node.name]
+            return lambda e: value
+        elif cls is syntax.Lambda:
+            body = self.compile(node.body, {**scope, node.param.name: depth}, depth + 1)
+            return lambda e: lambda v: body([v, e])
+        elif cls is syntax.Call:
+            return self.compile_call(node, scope, depth)
+        elif cls is syntax.If:
+            pred = self.compile(node.pred, scope, depth)
+            yes = self.compile(node.yes, scope, depth)
+            no = self.compile(node.no, scope, depth)
+            if self.type_of(node.pred) == typ.Bool:
+                return lambda e: yes(e) if pred(e) else no(e)
+            raise EvalError("Compiled an If whose condition isn't a Bool!")
+        elif cls is syntax.Let:
+            return self.compile_let(node, scope, depth)
+        elif cls is syntax.Annotated:
+            return self.compile(node.expr, scope, depth)
+        raise EvalError(f"Can't compile a {cls.__name__}!")
+
+    def compile_let(self, node: syntax.Let, scope, depth) -> Callable:
+        """
+        Compiles a chain of `let`s into one function that pushes their
+        frames in a loop, so that neither compiling nor running a long chain
+        recurses.
+        """
+        steps = []
+        scope = dict(scope)
+        while type(node) is syntax.Let:
+            if node.recursive:
+                scope[node.left.name] = depth
+                steps.append((True, self.compile(node.right, scope, depth + 1)))
+            else:
+                steps.append((False, self.compile(node.right, scope, depth)))
+                scope[node.left.name] = depth
+            depth += 1
+            node = node.body
+        body = self.compile(node, scope, depth)
+
+        def let_chain(e):
+            for recursive, right in steps:
+                if recursive:
+                    e = [None, e]
+                    e[0] = right(e)
+                else:
+                    e = [right(e), e]
+            return body(e)
+        return let_chain
+
+    def compile_call(self, node: syntax.Call, scope, depth) -> Callable:
+        if self.is_primitive(node.fn, scope, 1):
+            return _UNARY[node.fn.name](self.compile(node.arg, scope, depth))
+        inner = node.fn
+        if type(inner) is syntax.Call and self.is_primitive(inner.fn, scope, 2):
+            a = self.compile(inner.arg, scope, depth)
+            b = self.compile(node.arg, scope, depth)
+            return _BINARY[inner.fn.name](a, b)
+        fn = self.compile(node.fn, scope, depth)
+        arg = self.compile(node.arg, scope, depth)
+        return lambda e: fn(e)(arg(e))
+
+
+def compile_ast(ast: syntax.AstNode, checker: check.Checker) -> Callable[[], object]:
+    """
+    Compiles `ast`, which `checker` must have inferred, into a function
+    that evaluates it.
+    """
+    if ast._type is None:
+        raise EvalError("Only checked programs can be compiled!")
+    code = _Compiler(checker).compile(ast, dict(), 0)
+    return lambda: code(None)
+
+
+def show_value(value, t: typ.Type) -> str:
+    """
+    >>> show_value(((1, True), ((2, False), None)), typ.List(typ.Tuple(typ.Int, typ.Bool)))
+    '[(1, true), (2, false)]'
+    """
+    cls = type(t)
+    if t == typ.Bool:
+        return "true" if value else "false"
+    elif cls is typ.Tuple:
+        return "(" + ", ".join(show_value(v, u) for v, u in zip(value, t.vals)) + ")"
+    elif cls is typ.List:
+        [elem] = t.vals
+        return "[" + ", ".join(show_value(v, elem) for v in _iter(value)) + "]"
+    elif cls is typ.Fn:
+        return "<fn>"
+    return str(value)
+
+
+def run_source(src: str):
+    """
+    Checks and runs `src`, returning its value and type. Raises what
+    `parse` and inference raise for programs that don't check, and
+    `EvalError` for those that fail at runtime, recursing too deeply
+    included.
+
+    >>> value, t = run_source("map succ (cons 1 (cons 2 nil))")
+    >>> show_value(value, t)
+    '[2, 3]'
+    """
+    from hindley_milner.src.parse import parse
+    ast = parse(src)
+    checker = check.Checker()
+    t = checker.concretize(ast.infer_type(checker))
+    try:
+        return compile_ast(ast, checker)(), t
+    except RecursionError:
+        raise EvalError("Recursion too deep!") from None
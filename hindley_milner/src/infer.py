@@ -0,0 +1,274 @@
+"""
+An iterative inference driver for the `syntax` AST.
+
+`infer_type(node, checker)` computes the same types, in the same order and
+with the same fresh variables, as `engine.ReferenceEngine`, but instead of
+recursing through Python frames it keeps an explicit work stack of
+continuation records. Deep inputs, like long application spines or `let`
+chains, therefore don't hit the recursion limit.
+
+It's the algorithm of `engine.IterativeEngine`, the default engine, so it's
+usually reached through `node.infer_type(checker)`.
+
+Example:
+>>> from hindley_milner.src import check
+>>> from hindley_milner.src.parse import parse
+>>> checker = check.Checker()
+>>> t = infer_type(parse("pair (succ 1) true"), checker)
+>>> print(checker.concretize(t))
+(Int × Bool)
+"""
+
+from hindley_milner.src import check, env, syntax, typ, unifier_set
+
+# Continuation record kinds. A record is a tuple `(kind, node, data)`. For
+# EVAL, `data` is the node's index among its parent's children.
+EVAL = 0
+LAMBDA_EXIT = 1
+CALL_FN = 2
+CALL_EXIT = 3
+IF_BRANCHES = 4
+IF_EXIT = 5
+LET_BODY = 6
+LET_EXIT = 7
+MEMO_EXIT = 8
+ANNOTATED_EXIT = 9
+DECLARED_BODY = 10
+VAL_BODY = 11
+
+
+def _closed(shared: syntax.Shared, type_env: env.Env) -> bool:
+    """
+    Whether every name free in a shared node refers to a read-only frame
+    (the prelude's, or an interface's), whose schemes are closed. Its type
+    is then the same wherever it's used.
+    """
+    for name in shared.free:
+        frame = type_env.frame_of(name)
+        if frame is None or isinstance(frame.locals, dict):
+            return False
+    return True
+
+
+def _path(node: syntax.AstNode, uses: list, i=None):
+    """
+    If `node` is shared, the indices of the children that lead to it from
+    the node being inferred: those of the unfinished nodes in `uses`, less
+    the root's, then `i` if given.
+    """
+    if type(node._span) is not syntax.Shared:
+        return None
+    return (*uses[1:], i) if i is not None else tuple(uses[1:])
+
+
+def infer_type(node: syntax.AstNode, checker: check.Checker) -> typ.Type:
+    """
+    Infers the type of `node`, caching each subexpression's type in its
+    `_type` attribute just like `AstNode.infer_type` does. An error raised
+    along the way gets a `node` attribute: the subexpression being checked.
+
+    A closed subexpression shared by an interned AST (see `parse.intern`) is
+    inferred once; its other uses get a copy of its type with fresh variables.
+    One that failed isn't, so that every use reports its errors. An error in
+    a shared subexpression also gets a `path` attribute, the indices of the
+    children that lead to the use it's in, for `program` to position it.
+
+    When `checker.errors` is a list, an unbound name or a failed unification
+    is recorded there instead (see `check.Checker.recover`), the node that
+    failed gets the type `typ.Error`, and inference carries on.
+    """
+    saved_env = checker.type_env
+    unifiers = checker.unifiers
+    work = [(EVAL, node, None)]
+    types = []  # Inferred types of finished subexpressions.
+    memo = dict()  # By id of a closed shared node: its type, and which vars were non-generic.
+    uses = []  # The child indices of the unfinished nodes, innermost last.
+    depth = 0
+
+    try:
+        while work:
+            kind, node, data = work.pop()
+
+            if kind == EVAL:
+                depth = len(uses)
+                shared = node._span
+                if type(shared) is syntax.Shared and shared.free is not None and \
+                        _closed(shared, checker.type_env):
+                    known = memo.get(id(node))
+                    if known is not None:
+                        scheme, non_generic = known
+                        fresh = {v: checker.fresh_var(v in non_generic) for v in scheme.bound}
+                        types.append(checker._substitute(scheme.body, fresh))
+                        continue
+                    # The errors recorded so far, when recovering.
+                    recorded = None if checker.errors is None else len(checker.errors)
+                    work.append((MEMO_EXIT, node, recorded))
+                cls = type(node)
+                if cls is syntax.Ident:
+                    try:
+                        t = checker.instantiate(checker.type_env[node])
+                    except env.EnvKeyError as err:
+                        t = checker.recover(err, node, _path(node, uses, data))
+                    node._type = t
+                    types.append(t)
+                elif cls is syntax.Call:
+                    uses.append(data)
+                    work.append((CALL_FN, node, None))
+                    work.append((EVAL, node.arg, 1))
+                elif cls is syntax.Const:
+                    types.append(node.type)
+                elif cls is syntax.Lambda:
+                    uses.append(data)
+                    checker.type_env = env.Env(parent=checker.type_env)
+                    alpha = checker.fresh_var(non_generic=True)
+                    checker.type_env[node.param] = alpha
+                    if node.annotation is not None:
+                        try:
+                            checker.unify(alpha, checker.instantiate(typ.generalize(node.annotation)))
+                        except unifier_set.UnificationError as err:
+                            checker.recover(err, node, _path(node, uses))
+                    work.append((LAMBDA_EXIT, node, alpha))
+                    work.append((EVAL, node.body, 1))
+                elif cls is syntax.If:
+                    uses.append(data)
+                    work.append((IF_BRANCHES, node, None))
+                    work.append((EVAL, node.pred, 0))
+                elif cls is syntax.Let and type(node.right) is syntax.Annotated:
+                    uses.append(data)
+                    if node.recursive:
+                        checker.type_env = env.Env(parent=checker.type_env)
+                        checker.type_env[node.left] = typ.generalize(node.right.declared)
+                    work.append((DECLARED_BODY, node, None))
+                    work.append((EVAL, node.right, 1))
+                elif cls is syntax.Let and not node.recursive:
+                    uses.append(data)
+                    work.append((VAL_BODY, node, None))
+                    work.append((EVAL, node.right, 1))
+                elif cls is syntax.Let:
+                    uses.append(data)
+                    checker.type_env = env.Env(parent=checker.type_env)
+                    alpha = checker.fresh_var(non_generic=True)
+                    checker.type_env[node.left] = alpha
+                    work.append((LET_BODY, node, alpha))
+                    work.append((EVAL, node.right, 1))
+                elif cls is syntax.Annotated:
+                    uses.append(data)
+                    work.append((ANNOTATED_EXIT, node, None))
+                    work.append((EVAL, node.expr, 0))
+                elif cls.infer_type is not syntax.AstNode.infer_type:
+                    # Node types with their own rule infer themselves.
+                    types.append(node.infer_type(checker))
+                else:
+                    raise TypeError(f"No inference rule for {cls.__name__}!")
+
+            elif kind == CALL_FN:
+                beta = checker.fresh_var()
+                fn_type_joiner = typ.Fn(types.pop(), beta)
+                work.append((CALL_EXIT, node, (beta, fn_type_joiner)))
+                work.append((EVAL, node.fn, 0))
+
+            elif kind == CALL_EXIT:
+                beta, fn_type_joiner = data
+                fn_type = types.pop()
+                try:
+                    checker.unify(fn_type, fn_type_joiner)
+                    t = unifiers.concretize(beta)
+                except unifier_set.UnificationError as err:
+                    t = checker.recover(err, node, _path(node, uses))
+                if checker.errors is not None and unifiers.concretize(fn_type) == typ.Error:
+                    t = typ.Error  # Whatever it's applied to.
+                node._type = t
+                types.append(t)
+                uses.pop()
+
+            elif kind == LAMBDA_EXIT:
+                body_type = types.pop()
+                unifiers.make_generic(data)
+                checker.type_env = checker.type_env.parent
+                t = typ.Fn(unifiers.concretize(data), body_type)
+                node._type = t
+                types.append(t)
+                uses.pop()
+
+            elif kind == IF_BRANCHES:
+                try:
+                    checker.unify(types.pop(), typ.Bool)
+                except unifier_set.UnificationError as err:
+                    checker.recover(err, node.pred, _path(node.pred, uses, 0))
+                work.append((IF_EXIT, node, None))
+                work.append((EVAL, node.no, 2))
+                work.append((EVAL, node.yes, 1))
+
+            elif kind == IF_EXIT:
+                no_type = types.pop()
+                yes_type = types.pop()
+                try:
+                    checker.unify(yes_type, no_type)
+                    t = unifiers.concretize(yes_type)
+                except unifier_set.UnificationError as err:
+                    t = checker.recover(err, node, _path(node, uses))
+                node._type = t
+                types.append(t)
+                uses.pop()
+
+            elif kind == LET_BODY:
+                right_type = types.pop()
+                unifiers.make_generic(data)
+                try:
+                    checker.unify(data, right_type)
+                except unifier_set.UnificationError as err:
+                    checker.recover(err, node.right, _path(node.right, uses, 1))
+                work.append((LET_EXIT, node, None))
+                work.append((EVAL, node.body, 2))
+
+            elif kind == VAL_BODY:
+                checker.type_env = env.Env(parent=checker.type_env)
+                checker.type_env[node.left] = types.pop()
+                work.append((LET_EXIT, node, None))
+                work.append((EVAL, node.body, 2))
+
+            elif kind == DECLARED_BODY:
+                types.pop()
+                if not node.recursive:
+                    checker.type_env = env.Env(parent=checker.type_env)
+                    checker.type_env[node.left] = typ.generalize(node.right.declared)
+                work.append((LET_EXIT, node, None))
+                work.append((EVAL, node.body, 2))
+
+            elif kind == ANNOTATED_EXIT:
+                declared = typ.generalize(node.declared)
+                try:
+                    checker.check_declared(declared, types.pop())
+                except unifier_set.UnificationError as err:
+                    checker.recover(err, node, _path(node, uses))  # Uses still get the declared type.
+                t = checker.instantiate(declared)
+                node._type = t
+                types.append(t)
+                uses.pop()
+
+            elif kind == LET_EXIT:
+                checker.type_env = checker.type_env.parent
+                node._type = types[-1]
+                uses.pop()
+
+            elif kind == MEMO_EXIT:
+                if data is not None and len(checker.errors) > data:
+                    continue  # So that each use reports its errors.
+                scheme = typ.generalize(unifiers.concretize(types[-1]))
+                non_generic = {v for v in scheme.bound if checker.is_non_generic(v)}
+                memo[id(node)] = scheme, non_generic
+
+    except Exception as err:
+        # Unlike the recursive methods, leave the checker's scope as we found
+        # it so that it can be reused after an error.
+        checker.type_env = saved_env
+        # Record where inference stopped, for error positions.
+        if getattr(err, "node", None) is None:
+            err.node = node
+            path = _path(node, uses[:depth], data) if kind == EVAL else _path(node, uses)
+            if path is not None:
+                err.path = path
+        raise
+
+    [t] = types
+    return t
@@ -0,0 +1,255 @@
+"""
+Binary interface files: the generalized types of a checked module's exports,
+saved so that downstream checks can use them without re-inferring the module.
+
+An interface file is laid out as:
+
+    magic      b"HMI1"
+    count      u32
+    directory  `count` entries of (name offset, name length, scheme offset,
+               scheme length), u32 each, sorted by name
+    strings and encoded schemes
+
+An encoded scheme is:
+
+    nbound     u32    bound variables have ids 0 .. nbound - 1
+    nnodes     u32
+    nodes      `nnodes` records of (tag u8, arity u8, pad u16, first u32)
+    children   u32 node indices
+
+Node tags are VAR, INT, BOOL, LIST, TUPLE and FN, 0 to 5. For a VAR,
+`first` is its variable id, otherwise it's the offset of the node's first
+child in `children`. Children come before their parents, and the last node
+is the root.
+
+Decoded bound variables are named α, β, ...; free ones get names of their
+own, `_0`, `_1`, ..., that no checker's `fresh_var` or signature gives out.
+
+`InterfaceFile` memory-maps a file, binary-searches the fixed-size directory
+and decodes a scheme the first time it's looked up.
+
+To write the interface of a module:
+
+    $ python -m hindley_milner.src.interface lib.hm     # writes lib.hmi
+"""
+
+import itertools
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
+from typing import Dict, List
+
+from hindley_milner.src import env, typ, utils
+
+MAGIC = b"HMI1"
+COUNT = struct.Struct("<I")
+ENTRY = struct.Struct("<IIII")
+HEADER = struct.Struct("<II")
+NODE = struct.Struct("<BBxxI")
+CHILD = struct.Struct("<I")
+
+# Node tags.
+VAR, INT, BOOL, LIST, TUPLE, FN = range(6)
+
+TAG_OF_CLASS = {
+    type(typ.Int): INT,
+    type(typ.Bool): BOOL,
+    typ.List: LIST,
+    typ.Tuple: TUPLE,
+    typ.Fn: FN,
+}
+
+CLASS_OF_TAG = {tag: cls for cls, tag in TAG_OF_CLASS.items()}
+
+# Numbers the free variables of every scheme decoded, so that none is mistaken
+# for another, or for one of the consuming checker's variables.
+_free_var_numbers = itertools.count()
+
+
+class InterfaceError(Exception):
+    def __init__(self, msg):
+        self.msg = msg
+
+
+def encode_scheme(scheme: typ.Scheme) -> bytes:
+    """
+    >>> a = typ.Var("a")
+    >>> scheme = typ.Scheme([a], typ.Fn(a, typ.List(a)))
+    >>> print(decode_scheme(encode_scheme(scheme)))
+    ∀α. (α → (list α))
+
+    Nodes refer to their children by index, so a type that shares subterms
+    is encoded as the graph it is, not as a tree.
+    """
+    var_ids = {v: i for i, v in enumerate(scheme.bound)}
+    nodes = bytearray()
+    children: List[int] = []
+    count = 0
+    index_of: Dict[int, int] = dict()  # Subterms shared in `scheme` are encoded once.
+
+    def encode(t) -> int:
+        nonlocal count
+        i = index_of.get(id(t))
+        if i is not None:
+            return i
+        if type(t) is typ.Var:
+            record = NODE.pack(VAR, 0, var_ids.setdefault(t, len(var_ids)))
+        else:
+            kids = [encode(x) for x in t.vals]
+            record = NODE.pack(TAG_OF_CLASS[type(t)], len(kids), len(children))
+            children.extend(kids)
+        nodes.extend(record)
+        count += 1
+        index_of[id(t)] = count - 1
+        return count - 1
+
+    encode(scheme.body)
+    header = HEADER.pack(len(scheme.bound), count)
+    return header + bytes(nodes) + struct.pack(f"<{len(children)}I", *children)
+
+
+def decode_scheme(buf, offset: int = 0) -> typ.Scheme:
+    nbound, nnodes = HEADER.unpack_from(buf, offset)
+    nodes_at = offset + HEADER.size
+    children_at = nodes_at + nnodes * NODE.size
+    names = utils.fresh_greek_stream()
+    var_of_id: Dict[int, typ.Var] = dict()
+    decoded: List[typ.Type] = []
+
+    # Unpack every record, then every child index, in one call each.
+    records = list(NODE.iter_unpack(buf[nodes_at:children_at]))
+    nchildren = sum(arity for tag, arity, _ in records if tag != VAR)
+    children = struct.unpack_from(f"<{nchildren}I", buf, children_at)
+
+    for tag, arity, first in records:
+        if tag == VAR:
+            if first not in var_of_id:
+                name = next(names) if first < nbound else f"_{next(_free_var_numbers)}"
+                var_of_id[first] = typ.Var(name)
+            decoded.append(var_of_id[first])
+        elif tag == INT:
+            decoded.append(typ.Int)
+        elif tag == BOOL:
+            decoded.append(typ.Bool)
+        else:
+            kids = children[first:first + arity]
+            decoded.append(CLASS_OF_TAG[tag](*[decoded[k] for k in kids]))
+
+    bound = [var_of_id[i] for i in range(nbound) if i in var_of_id]
+    return typ.Scheme(bound, decoded[-1])
+
+
+def encode_interface(exports: Dict[str, typ.Scheme]) -> bytes:
+    names = sorted(exports, key=str.encode)
+    data_at = len(MAGIC) + COUNT.size + ENTRY.size * len(names)
+    directory = bytearray()
+    data = bytearray()
+    for name in names:
+        name_bytes = name.encode()
+        scheme_bytes = encode_scheme(exports[name])
+        name_at = data_at + len(data)
+        data.extend(name_bytes)
+        scheme_at = data_at + len(data)
+        data.extend(scheme_bytes)
+        directory.extend(ENTRY.pack(name_at, len(name_bytes), scheme_at, len(scheme_bytes)))
+    return MAGIC + COUNT.pack(len(names)) + bytes(directory) + bytes(data)
+
+
+def write_interface(path: str, exports: Dict[str, typ.Scheme]) -> None:
+    with open(path, "wb") as f:
+        f.write(encode_interface(exports))
+
+
+class InterfaceFile(Mapping):
+    """
+    A read-only mapping from `syntax.Ident`s to the schemes in an interface
+    file (or any buffer holding one). Use it as the `locals` of an `env.Env`.
+    Like a `signatures.SignatureFile`, it can be shared between threads.
+    """
+
+    def __init__(self, path_or_buffer):
+        if isinstance(path_or_buffer, (str, os.PathLike)):
+            with open(path_or_buffer, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    raise InterfaceError("Not an interface file!")  # mmap can't map it.
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._buf = path_or_buffer
+        if len(self._buf) < len(MAGIC) + COUNT.size or bytes(self._buf[:len(MAGIC)]) != MAGIC:
+            raise InterfaceError("Not an interface file!")
+        [self._count] = COUNT.unpack_from(self._buf, len(MAGIC))
+        self._cache: Dict[str, typ.Scheme] = dict()
+
+    def _entry(self, i: int):
+        return ENTRY.unpack_from(self._buf, len(MAGIC) + COUNT.size + i * ENTRY.size)
+
+    def _name(self, i: int) -> bytes:
+        name_at, name_len, _, _ = self._entry(i)
+        return bytes(self._buf[name_at:name_at + name_len])
+
+    def _load(self, name: str):
+        key = name.encode()
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            found = self._name(mid)
+            if found == key:
+                _, _, scheme_at, _ = self._entry(mid)
+                scheme = decode_scheme(self._buf, scheme_at)
+                # Another thread may have decoded it too: agree on one copy.
+                scheme = self._cache.setdefault(name, scheme)
+                return scheme
+            elif found < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def get(self, key, default=None):
+        name = getattr(key, "name", key)
+        scheme = self._cache.get(name)
+        if scheme is None:
+            scheme = self._load(name)
+        return default if scheme is None else scheme
+
+    def __getitem__(self, key):
+        scheme = self.get(key)
+        if scheme is None:
+            raise KeyError(key)
+        return scheme
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def names(self):
+        return (self._name(i).decode() for i in range(self._count))
+
+    def __iter__(self):
+        from hindley_milner.src import syntax
+        return (syntax.Ident(name) for name in self.names())
+
+    def __len__(self):
+        return self._count
+
+
+def import_interface(checker, path_or_buffer) -> InterfaceFile:
+    """
+    Makes the exports of an interface file visible to `checker`, beneath any
+    bindings it makes from now on.
+    """
+    iface = InterfaceFile(path_or_buffer)
+    checker.type_env = env.Env(parent=env.Env(locals=iface, parent=checker.type_env))
+    return iface
+
+
+if __name__ == '__main__':
+    from hindley_milner.src import check, module
+    from hindley_milner.src.parse import parse_module
+
+    for path in sys.argv[1:]:
+        with open(path) as f:
+            decls = parse_module(f.read())
+        exports = module.check_module(decls, check.Checker())
+        write_interface(os.path.splitext(path)[0] + ".hmi", exports)
@@ -0,0 +1,398 @@
+"""
+A language server, speaking LSP over stdio:
+
+    $ python -m hindley_milner --lsp
+
+A document holds either one expression or a module of declarations. Edits
+are applied to the server's copy of the text as they arrive. Checks run a
+short while after the last edit, on a worker thread, so a burst of typing
+only gets checked once. The event loop keeps answering requests meanwhile:
+hovers are served from the last finished check of the document.
+
+Supported: `initialize`, `shutdown`, `exit`, `textDocument/didOpen`,
+`didChange` (full or incremental), `didClose` and `textDocument/hover`.
+Diagnostics are pushed with `textDocument/publishDiagnostics`.
+
+Positions count characters (code points), not UTF-16 code units, so they
+only agree with most editors on text within the Basic Multilingual Plane.
+"""
+
+import asyncio
+import json
+import sys
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import rply
+
+from hindley_milner.src import check, env, module, pretty, program, syntax, typ, unifier_set
+from hindley_milner.src.parse import parse_program
+
+# Seconds to wait after an edit before checking.
+DEBOUNCE = 0.25
+
+PARSE_ERROR = -32700
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+SYNC_INCREMENTAL = 2
+SEVERITY_ERROR = 1
+
+
+@dataclass
+class Analysis:
+    """
+    The outcome of checking one version of a document. `roots` are the top
+    level expression, or the `(name, rhs)` declarations of a module.
+    """
+    text: str
+    roots: list = field(default_factory=list)
+    checker: Optional[check.Checker] = None
+    diagnostics: List[program.Diagnostic] = field(default_factory=list)
+
+
+@dataclass
+class Document:
+    text: str
+    version: int
+    analysis: Optional[Analysis] = None
+    pending: Optional[asyncio.Task] = None
+
+
+def analyze(text: str) -> Analysis:
+    """
+    Parses and checks a document. Runs on a worker thread, with a checker of
+    its own.
+    """
+    try:
+        res = parse_program(text)
+    except rply.errors.LexingError as err:
+        return Analysis(text, diagnostics=[program.lexing_diagnostic(text, err)])
+    except rply.errors.ParsingError as err:
+        return Analysis(text, diagnostics=[program.parsing_diagnostic(text, err)])
+
+    checker = check.Checker()
+    checker.errors = []  # Report every type error, not just the first.
+    roots = res if isinstance(res, list) else [res]
+    analysis = Analysis(text, roots, checker)
+    try:
+        if isinstance(res, list):
+            module.check_module(res, checker)
+        else:
+            res.infer_type(checker)
+    except (env.EnvKeyError, unifier_set.UnificationError) as err:
+        checker.errors.append(err)
+    analysis.diagnostics = program.inference_diagnostics(text, checker.errors)
+    return analysis
+
+
+def _span_of(x) -> Optional[Tuple[int, int]]:
+    if isinstance(x, tuple):  # A module declaration.
+        left, right = x
+        return left.span[0], right.span[1]
+    return x.span
+
+
+def _children(x) -> list:
+    cls = type(x)
+    if cls is tuple:
+        return list(x)
+    elif cls is syntax.Lambda:
+        return [x.param, x.body]
+    elif cls is syntax.Call:
+        return [x.fn, x.arg]
+    elif cls is syntax.If:
+        return [x.pred, x.yes, x.no]
+    elif cls is syntax.Let:
+        return [x.left, x.right, x.body]
+    elif cls is syntax.Annotated:
+        return [x.expr]
+    return []
+
+
+def _binder_type(parent, child) -> Optional[typ.Type]:
+    """
+    Binding occurrences of names aren't inferred themselves: their type is
+    found on the node that binds them.
+    """
+    if type(parent) is tuple and child is parent[0]:
+        return parent[1]._type
+    elif type(parent) is syntax.Lambda and child is parent.param and parent._type is not None:
+        return parent._type.vals[0]
+    elif type(parent) is syntax.Let and child is parent.left:
+        return parent.right._type
+    return None
+
+
+def type_at(roots: list, index: int) -> Optional[Tuple[Tuple[int, int], typ.Type]]:
+    """
+    The span and type of the innermost checked subexpression at `index`.
+
+    >>> from hindley_milner.src.parse import parse
+    >>> ast = parse("fn x => succ x")
+    >>> _ = ast.infer_type(check.Checker())
+    >>> span, t = type_at([ast], 8)
+    >>> span, str(t)
+    ((8, 12), '(Int → Int)')
+    """
+    path = []
+    candidates = roots
+    while True:
+        for x in candidates:
+            span = _span_of(x)
+            if span is not None and span[0] <= index < span[1]:
+                path.append(x)
+                candidates = _children(x)
+                break
+        else:
+            break
+
+    for i in reversed(range(len(path))):
+        x = path[i]
+        t = None if type(x) is tuple else x._type
+        if t is None and i > 0:
+            t = _binder_type(path[i - 1], x)
+        if t is not None:
+            return _span_of(x), t
+    return None
+
+
+def offset_of(text: str, position: dict) -> int:
+    """
+    Converts an LSP position to an index into `text`.
+
+    >>> offset_of("ab\\ncd", {"line": 1, "character": 1})
+    4
+    """
+    start = 0
+    for _ in range(position["line"]):
+        newline = text.find("\n", start)
+        if newline == -1:
+            return len(text)
+        start = newline + 1
+    end = text.find("\n", start)
+    end = len(text) if end == -1 else end
+    return min(start + position["character"], end)
+
+
+def position_of(text: str, index: int) -> dict:
+    line = text.count("\n", 0, index)
+    character = index - (text.rfind("\n", 0, index) + 1)
+    return {"line": line, "character": character}
+
+
+def range_of(text: str, start: int, end: int) -> dict:
+    return {"start": position_of(text, start), "end": position_of(text, end)}
+
+
+def apply_change(text: str, change: dict) -> str:
+    """
+    Applies one `TextDocumentContentChangeEvent`.
+
+    >>> apply_change("succ 1", {"range": {"start": {"line": 0, "character": 5},
+    ...                                   "end": {"line": 0, "character": 6}}, "text": "true"})
+    'succ true'
+    """
+    if "range" not in change:
+        return change["text"]
+    start = offset_of(text, change["range"]["start"])
+    end = offset_of(text, change["range"]["end"])
+    return text[:start] + change["text"] + text[end:]
+
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[dict]:
+    """
+    Reads one `Content-Length` framed message, or returns None at the end of
+    the stream.
+    """
+    length = None
+    while True:
+        line = await reader.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    if length is None:
+        return None
+    try:
+        body = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
+    return json.loads(body)
+
+
+def frame(message: dict) -> bytes:
+    body = json.dumps(message).encode()
+    return b"Content-Length: %d\r\n\r\n" % len(body) + body
+
+
+class LanguageServer:
+    """
+    Serves one client. `write` is called with each framed outgoing message.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, write: Callable[[bytes], None],
+                 debounce: float = DEBOUNCE, executor: Optional[Executor] = None):
+        self.reader = reader
+        self.write = write
+        self.debounce = debounce
+        self.executor = executor or ThreadPoolExecutor(max_workers=2)
+        self.documents: Dict[str, Document] = dict()
+        self.shutdown_requested = False
+
+    def send(self, message: dict) -> None:
+        self.write(frame(message))
+
+    async def serve(self) -> int:
+        """
+        Handles messages until `exit` or the end of input. Returns the
+        process exit code.
+        """
+        try:
+            while True:
+                try:
+                    message = await read_message(self.reader)
+                except (ValueError, json.JSONDecodeError) as err:
+                    self.send({"jsonrpc": "2.0", "id": None,
+                               "error": {"code": PARSE_ERROR, "message": str(err)}})
+                    continue
+                if message is None or message.get("method") == "exit":
+                    break
+                self.dispatch(message)
+        finally:
+            for doc in self.documents.values():
+                if doc.pending is not None:
+                    doc.pending.cancel()
+        return 0 if self.shutdown_requested else 1
+
+    def dispatch(self, message: dict) -> None:
+        method = message.get("method")
+        handler = getattr(self, "on_" + method.replace("/", "_"), None) if method else None
+        is_request = "id" in message
+        if handler is None:
+            if is_request:
+                error = {"code": METHOD_NOT_FOUND, "message": f"Unknown method {method!r}"}
+                self.send({"jsonrpc": "2.0", "id": message["id"], "error": error})
+            return
+        try:
+            result = handler(message.get("params") or {})
+        except Exception as err:
+            if is_request:
+                error = {"code": INTERNAL_ERROR, "message": f"{type(err).__name__}: {err}"}
+                self.send({"jsonrpc": "2.0", "id": message["id"], "error": error})
+            return
+        if is_request:
+            self.send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+    def on_initialize(self, params):
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": SYNC_INCREMENTAL},
+                "hoverProvider": True,
+            },
+            "serverInfo": {"name": "hindley-milner"},
+        }
+
+    def on_initialized(self, params):
+        pass
+
+    def on_shutdown(self, params):
+        self.shutdown_requested = True
+
+    def on_textDocument_didOpen(self, params):
+        item = params["textDocument"]
+        self.documents[item["uri"]] = Document(item["text"], item.get("version", 0))
+        self.schedule_check(item["uri"])
+
+    def on_textDocument_didChange(self, params):
+        uri = params["textDocument"]["uri"]
+        doc = self.documents[uri]
+        for change in params["contentChanges"]:
+            doc.text = apply_change(doc.text, change)
+        doc.version = params["textDocument"].get("version", doc.version + 1)
+        self.schedule_check(uri)
+
+    def on_textDocument_didClose(self, params):
+        uri = params["textDocument"]["uri"]
+        doc = self.documents.pop(uri, None)
+        if doc is not None and doc.pending is not None:
+            doc.pending.cancel()
+        self.publish(uri, None, [], "")
+
+    def on_textDocument_hover(self, params):
+        doc = self.documents.get(params["textDocument"]["uri"])
+        if doc is None or doc.analysis is None or doc.analysis.checker is None:
+            return None
+        analysis = doc.analysis
+        # Positions refer to the current text, which may be ahead of the
+        # last check. Only answer where the two agree.
+        index = offset_of(doc.text, params["position"])
+        if doc.text != analysis.text and doc.text[:index + 1] != analysis.text[:index + 1]:
+            return None
+        found = type_at(analysis.roots, index)
+        if found is None:
+            return None
+        (start, end), t = found
+        return {
+            "contents": {"kind": "plaintext", "value": pretty.show_type(analysis.checker.concretize(t))},
+            "range": range_of(analysis.text, start, end),
+        }
+
+    def schedule_check(self, uri: str) -> None:
+        doc = self.documents[uri]
+        if doc.pending is not None:
+            doc.pending.cancel()
+        doc.pending = asyncio.ensure_future(self._check_later(uri, doc))
+
+    async def _check_later(self, uri: str, doc: Document) -> None:
+        await asyncio.sleep(self.debounce)
+        version, text = doc.version, doc.text
+        if doc.analysis is not None and doc.analysis.text == text:
+            analysis = doc.analysis  # E.g. an edit that was undone.
+        else:
+            loop = asyncio.get_running_loop()
+            analysis = await loop.run_in_executor(self.executor, analyze, text)
+        if self.documents.get(uri) is not doc or doc.version != version:
+            return  # Superseded while checking.
+        doc.analysis = analysis
+        doc.pending = None
+        self.publish(uri, version, analysis.diagnostics, text)
+
+    def publish(self, uri: str, version: Optional[int],
+                diagnostics: List[program.Diagnostic], text: str) -> None:
+        items = []
+        for d in diagnostics:
+            start = d.start if d.start is not None else 0
+            end = d.end if d.end is not None else start
+            items.append({
+                "range": range_of(text, start, end),
+                "severity": SEVERITY_ERROR,
+                "source": "hindley-milner",
+                "code": d.kind,
+                "message": d.message,
+            })
+        params = {"uri": uri, "diagnostics": items}
+        if version is not None:
+            params["version"] = version
+        self.send({"jsonrpc": "2.0", "method": "textDocument/publishDiagnostics", "params": params})
+
+
+async def _serve_stdio() -> int:
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    def write(data: bytes) -> None:
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+
+    return await LanguageServer(reader, write).serve()
+
+
+def main() -> int:
+    return asyncio.run(_serve_stdio())
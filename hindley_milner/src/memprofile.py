@@ -0,0 +1,156 @@
+"""
+Where a check's memory goes.
+
+`profile_check(src)` checks `src` like `program.check_source`, with
+`tracemalloc` tracing allocations, and reports:
+
+- for parsing and for inference, the memory each `hindley_milner` module
+  allocated and kept, charging each allocation to the innermost frame in the
+  package (so the nodes built by a dataclass' generated `__init__` count
+  against the module that called it);
+- the peak traced memory while parsing or inferring, read at the end of
+  each phase so that the snapshots taken and compared between them don't
+  count;
+- a census of what's live afterwards, by class: the AST nodes, the types
+  and variables of the checker's `UnifierSet`, and its `env.Env` frames.
+
+    >>> result, report = profile_check("pair (succ 1) true")
+    >>> print(result.type)
+    (Int × Bool)
+    >>> report.classes["Call"][0]
+    3
+
+Tracing slows everything down, so only `--memprofile` turns it on; nothing
+here is imported otherwise.
+"""
+
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from hindley_milner.src import check, env, program, syntax, typ
+
+# Frames kept per allocation: enough to get from the allocating code (a
+# generated `__init__`, rply) up to a frame in the package. Tracing cost
+# grows with it.
+TRACEBACK_LIMIT = 4
+
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@dataclass
+class MemoryReport:
+    # By phase ("parse", "infer"): bytes kept, by module.
+    phases: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    peak: int = 0
+    # By class name: how many live instances, and their shallow size in bytes.
+    classes: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    unifier_entries: int = 0
+
+    def format(self, top: int = 8) -> str:
+        lines = [f"peak traced memory: {_kib(self.peak)}"]
+        for phase, modules in self.phases.items():
+            lines.append(f"{phase}: {_kib(sum(modules.values()))} kept")
+            ranked = sorted(modules.items(), key=lambda kv: -kv[1])[:top]
+            lines.extend(f"  {name:<36} {_kib(size):>12}" for name, size in ranked)
+        lines.append(f"live objects ({self.unifier_entries} unifier entries):")
+        ranked = sorted(self.classes.items(), key=lambda kv: -kv[1][1])[:top]
+        lines.extend(f"  {name:<24} {count:>9} {_kib(size):>12}" for name, (count, size) in ranked)
+        return "\n".join(lines)
+
+
+def _kib(n: int) -> str:
+    return f"{n / 1024:.1f} KiB"
+
+
+def _module_of(filename: str) -> Optional[str]:
+    path = os.path.abspath(filename)
+    if not path.startswith(_PACKAGE_ROOT + os.sep) or not path.endswith(".py"):
+        return None
+    return os.path.relpath(path, _PACKAGE_ROOT)[:-3].replace(os.sep, ".")
+
+
+def _by_module(after: tracemalloc.Snapshot, before: tracemalloc.Snapshot) -> Dict[str, int]:
+    sizes: Dict[str, int] = dict()
+    for stat in after.compare_to(before, "traceback"):
+        if stat.size_diff == 0:
+            continue
+        name = "(elsewhere)"
+        for frame in reversed(stat.traceback):  # Innermost frame last.
+            module = _module_of(frame.filename)
+            if module is not None:
+                name = module
+                break
+        if name == __name__:
+            continue  # The snapshots themselves.
+        sizes[name] = sizes.get(name, 0) + stat.size_diff
+    return sizes
+
+
+def census(ast, checker: check.Checker) -> Dict[str, Tuple[int, int]]:
+    """
+    Counts the objects reachable from `ast` and `checker`'s own state (not
+    the shared prelude), by class.
+    """
+    seen = set()
+    classes: Dict[str, Tuple[int, int]] = dict()
+    stack = [ast, checker.type_env]
+    for k, v in checker.unifiers.map.items():
+        stack.append(k)
+        stack.append(v)
+    while stack:
+        x = stack.pop()
+        if id(x) in seen or x is None or type(x) in (int, str, bool, tuple):
+            continue
+        seen.add(id(x))
+        name = type(x).__name__
+        count, size = classes.get(name, (0, 0))
+        classes[name] = count + 1, size + sys.getsizeof(x)
+        if isinstance(x, syntax.AstNode):
+            stack.extend(getattr(x, f) for f in x.__dataclass_fields__)
+            stack.append(x._type)
+        elif isinstance(x, typ.Poly):
+            stack.extend(x.vals)
+        elif type(x) is typ.Scheme:
+            stack.append(x.body)
+        elif type(x) is env.Env and isinstance(x.locals, dict):
+            stack.extend(x.locals.keys())
+            stack.extend(x.locals.values())
+            stack.append(x.parent)
+    return classes
+
+
+def profile_check(src: str, checker: Optional[check.Checker] = None,
+                  recover: bool = False) -> Tuple[program.Result, MemoryReport]:
+    """
+    Checks `src` as `program.check_source` does, with `recover` as it's
+    given, profiling its memory.
+    """
+    checker = check.Checker() if checker is None else checker
+    report = MemoryReport()
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(TRACEBACK_LIMIT)
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        ast = program.parse_source(src)
+        report.peak = tracemalloc.get_traced_memory()[1]
+        parsed = tracemalloc.take_snapshot()
+        report.phases["parse"] = _by_module(parsed, before)
+        if type(ast) is program.Result:
+            result = ast
+            ast = None
+        else:
+            tracemalloc.reset_peak()
+            result = program.infer_source(src, ast, checker, recover=recover)
+            report.peak = max(report.peak, tracemalloc.get_traced_memory()[1])
+            report.phases["infer"] = _by_module(tracemalloc.take_snapshot(), parsed)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    report.classes = census(ast, checker)
+    report.unifier_entries = len(checker.unifiers.map)
+    return result, report
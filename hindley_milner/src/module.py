@@ -0,0 +1,48 @@
+"""
+Checking modules: sequences of top-level declarations.
+"""
+
+from typing import Dict
+
+from hindley_milner.src import check, syntax, typ, unifier_set
+from hindley_milner.src.parse import Module
+
+
+def check_module(decls: Module, checker: check.Checker) -> Dict[str, typ.Scheme]:
+    """
+    Infers the declarations of a module in order, binding each one in the
+    checker's environment under its generalized type. Returns the module's
+    exports. A later declaration shadows an earlier one of the same name.
+
+    Like a `let`, a declaration may refer to itself. A declaration with a
+    declared type is exported under it, however its body is inferred.
+
+    Example:
+    >>> from hindley_milner.src.parse import parse_module
+    >>> exports = check_module(parse_module("fun twice f x = f (f x)"), check.Checker())
+    >>> print(exports["twice"])
+    ∀δ. ((δ → δ) → (δ → δ))
+    """
+    exports = dict()
+    for left, right in decls:
+        if type(right) is syntax.Annotated:
+            # Bound to its declared scheme before its body is checked.
+            scheme = typ.generalize(right.declared)
+            checker.type_env[left] = scheme
+            exports[left.name] = scheme
+            with checker.new_scope():
+                right.infer_type(checker)
+            continue
+        with checker.new_scope():
+            with checker.scoped_non_generic() as alpha:
+                checker.type_env[left] = alpha
+                right_type = right.infer_type(checker)
+            try:
+                checker.unify(alpha, right_type)
+            except unifier_set.UnificationError as err:
+                err.node = right  # As the engines do.
+                checker.recover(err, right)
+        scheme = checker.generalize(alpha)
+        checker.type_env[left] = scheme
+        exports[left.name] = scheme
+    return exports
@@ -0,0 +1,162 @@
+"""
+Dicts and sets that can be forked in O(1).
+
+`fork_dict(d)` freezes what is in `d` so far as a shared base and returns two
+`OverlayDict`s over it: one to use in place of `d` from now on, and one for
+the fork. Each reads through to the base and writes to its own layer, so a
+fork pays only for the entries it touches.
+
+    >>> d = {"a": 1}
+    >>> d, e = fork_dict(d)
+    >>> e["b"] = 2
+    >>> d["a"] = 3
+    >>> sorted(d.items()), sorted(e.items())
+    ([('a', 3)], [('a', 1), ('b', 2)])
+
+`OverlayDict` subclasses `dict`, so lookups of entries already in the top
+layer run at C speed. `OverlaySet` wraps a plain `set` instead and has only
+the methods the checker uses: C code that took it for a `set` would see just
+its top layer. Anything that's never forked stays a plain `dict` or `set`
+and pays nothing at all.
+
+The frozen bases are never written to again: nothing must keep using `d`
+after `fork_dict(d)`, only the two overlays it returns. Reads copy entries
+into the overlay that read them, never into a base.
+"""
+
+MISSING = object()
+
+# Overlays of overlays are squashed into one layer past this depth, so that
+# reads of old entries don't slow down with every generation of forks.
+MAX_DEPTH = 8
+
+
+class OverlayDict(dict):
+    __slots__ = ("base", "depth")
+
+    def __init__(self, base):
+        super().__init__()
+        self.base = base
+        self.depth = base.depth + 1 if type(base) is OverlayDict else 1
+
+    def __missing__(self, key):
+        base = self.base
+        while type(base) is OverlayDict:
+            value = dict.get(base, key, MISSING)
+            if value is not MISSING:
+                break
+            base = base.base
+        else:
+            value = base[key]
+        self[key] = value  # Copy on read: the next lookup is local.
+        return value
+
+    def get(self, key, default=None):
+        value = dict.get(self, key, MISSING)
+        if value is MISSING:
+            value = self.base.get(key, MISSING)
+            if value is MISSING:
+                return default
+        return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self.base
+
+    def flatten(self) -> dict:
+        layers = []
+        d = self
+        while type(d) is OverlayDict:
+            layers.append(d)
+            d = d.base
+        flat = dict(d)
+        for layer in reversed(layers):
+            flat.update(dict.items(layer))
+        return flat
+
+    def keys(self):
+        return self.flatten().keys()
+
+    def values(self):
+        return self.flatten().values()
+
+    def items(self):
+        return self.flatten().items()
+
+    def __iter__(self):
+        return iter(self.flatten())
+
+    def __len__(self):
+        return len(self.flatten())
+
+
+class OverlaySet:
+    __slots__ = ("top", "base", "removed", "depth")
+
+    def __init__(self, base):
+        self.top = set()
+        self.base = base
+        self.removed = set()  # Members of `base` removed from this layer.
+        self.depth = base.depth + 1 if type(base) is OverlaySet else 1
+
+    def __contains__(self, x):
+        return x in self.top or (x not in self.removed and x in self.base)
+
+    def add(self, x):
+        self.top.add(x)
+        self.removed.discard(x)
+
+    def remove(self, x):
+        if x in self.top:
+            self.top.remove(x)
+        elif x in self.base and x not in self.removed:
+            self.removed.add(x)
+        else:
+            raise KeyError(x)
+
+    def discard(self, x):
+        if x in self:
+            self.remove(x)
+
+    def flatten(self) -> set:
+        flat = set(self.base.flatten() if type(self.base) is OverlaySet else self.base)
+        flat -= self.removed
+        flat |= self.top
+        return flat
+
+    def __iter__(self):
+        return iter(self.flatten())
+
+    def __len__(self):
+        return len(self.flatten())
+
+
+def _freeze(layer):
+    """
+    The base for forks of `layer`: `layer` itself, unless it's an overlay
+    with nothing in its own layer yet, or too deep.
+    """
+    if type(layer) is OverlayDict:
+        if dict.__len__(layer) == 0:
+            return layer.base
+    elif type(layer) is OverlaySet:
+        if not layer.top and not layer.removed:
+            return layer.base
+    else:
+        return layer
+    return layer.flatten() if layer.depth >= MAX_DEPTH else layer
+
+
+def fork_dict(d: dict):
+    """
+    Returns two independent overlays over the contents of `d`.
+    """
+    base = _freeze(d)
+    return OverlayDict(base), OverlayDict(base)
+
+
+def fork_set(s: set):
+    """
+    Returns two independent overlays over the members of `s`.
+    """
+    base = _freeze(s)
+    return OverlaySet(base), OverlaySet(base)
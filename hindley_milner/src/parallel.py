@@ -0,0 +1,295 @@
+"""
+Parallel inference of independent `let` bindings.
+
+A chain of `let`s (or the declarations of a module) is split into its
+bindings, and a dependency graph is built from the names each right-hand side
+uses. Its strongly connected components are then inferred level by level, in
+topological order: every component whose dependencies are done is checked in
+a worker process with its own `Checker`, given just the generalized schemes
+of the bindings it uses. The schemes that come back are bound in order, and
+the body of the chain is inferred last, in the calling process. A binding
+with a declared type doesn't hold up its users: they're given the declared
+type and checked alongside it.
+
+Schemes travel between processes encoded by `interface.encode_scheme`,
+which is smaller and quicker to send than a pickled object graph. Large
+read-only sets of schemes, like imported signatures, can be put in a
+`shared.SharedTypes` segment that every worker maps instead of copying.
+
+The types found are the same, up to the names of type variables, as those of
+sequential inference. When bindings fail, the error reported is that of the
+first failing binding in program order, as it would be sequentially.
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from hindley_milner.src import check, env, interface, syntax, typ
+from hindley_milner.src.parse import Module
+from hindley_milner.src.shared import SharedTypes, attach, shared_env
+
+Binding = Tuple[syntax.Ident, syntax.AstNode]
+
+
+def let_chain(ast: syntax.AstNode) -> Tuple[List[Binding], syntax.AstNode]:
+    """
+    Splits nested `let`s into their bindings and the innermost body.
+
+    Bindings are checked as if recursive, which makes no difference unless
+    a `val` uses an outer binding of its own name. The chain stops before
+    such a `val`, leaving it to the body.
+    """
+    bindings = []
+    while type(ast) is syntax.Let:
+        if not ast.recursive and ast.left.name in free_names(ast.right):
+            break
+        bindings.append((ast.left, ast.right))
+        ast = ast.body
+    return bindings, ast
+
+
+def free_names(ast: syntax.AstNode) -> Set[str]:
+    """
+    The names used but not bound inside `ast`.
+
+    >>> from hindley_milner.src.parse import parse
+    >>> sorted(free_names(parse("fn x => let fun f y = f (g x) in h end")))
+    ['g', 'h']
+    """
+    free = set()
+    stack = [(ast, frozenset())]
+    while stack:
+        node, bound = stack.pop()
+        cls = type(node)
+        if cls is syntax.Ident:
+            if node.name not in bound:
+                free.add(node.name)
+        elif cls is syntax.Lambda:
+            stack.append((node.body, bound | {node.param.name}))
+        elif cls is syntax.Call:
+            stack.append((node.fn, bound))
+            stack.append((node.arg, bound))
+        elif cls is syntax.If:
+            stack.extend((child, bound) for child in (node.pred, node.yes, node.no))
+        elif cls is syntax.Let:
+            inner = bound | {node.left.name}
+            stack.append((node.right, inner if node.recursive else bound))
+            stack.append((node.body, inner))
+        elif cls is syntax.Annotated:
+            stack.append((node.expr, bound))
+    return free
+
+
+def dependencies(bindings: Sequence[Binding]) -> List[Set[int]]:
+    """
+    For each binding, the indices of the earlier (or same) bindings its
+    right-hand side refers to. A name refers to the nearest binding of that
+    name at or before it, since bindings may be recursive.
+    """
+    deps = []
+    latest: Dict[str, int] = dict()
+    for i, (left, right) in enumerate(bindings):
+        latest[left.name] = i
+        deps.append({latest[n] for n in free_names(right) if n in latest})
+    return deps
+
+
+def strongly_connected_components(graph: Sequence[Set[int]]) -> List[List[int]]:
+    """
+    Tarjan's algorithm, without recursion. Components are returned in
+    reverse topological order: a component comes after everything it
+    depends on.
+
+    >>> strongly_connected_components([{1}, {0}, {0, 2}])
+    [[0, 1], [2]]
+    """
+    index: Dict[int, int] = dict()
+    lowlink: Dict[int, int] = dict()
+    on_stack: Set[int] = set()
+    stack: List[int] = []
+    sccs = []
+
+    for root in range(len(graph)):
+        if root in index:
+            continue
+        work = [(root, iter(sorted(graph[root])))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            v, children = work[-1]
+            for w in children:
+                if w not in index:
+                    index[w] = lowlink[w] = len(index)
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(sorted(graph[w]))))
+                    break
+                elif w in on_stack:
+                    lowlink[v] = min(lowlink[v], index[w])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[v])
+                if lowlink[v] == index[v]:
+                    scc = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        scc.append(w)
+                        if w == v:
+                            break
+                    sccs.append(sorted(scc))
+    return sccs
+
+
+def levels(graph: Sequence[Set[int]]) -> List[List[List[int]]]:
+    """
+    Groups the strongly connected components of `graph` into levels. Every
+    component only depends on components of earlier levels (or itself).
+    """
+    sccs = strongly_connected_components(graph)
+    component_of = {v: i for i, scc in enumerate(sccs) for v in scc}
+    level_of: List[int] = []
+    for i, scc in enumerate(sccs):
+        deps = {component_of[w] for v in scc for w in graph[v]} - {i}
+        level_of.append(1 + max((level_of[d] for d in deps), default=-1))
+    grouped: List[List[List[int]]] = [[] for _ in range(max(level_of, default=-1) + 1)]
+    for scc, level in zip(sccs, level_of):
+        grouped[level].append(scc)
+    return grouped
+
+
+def infer_component(bindings: Sequence[Binding], visible: Dict[str, bytes],
+                    shared: Optional[str] = None) -> List[bytes]:
+    """
+    Infers one strongly connected component on a fresh checker whose
+    environment holds the `visible` schemes, over the `shared.SharedTypes`
+    segment named `shared`, if any. Runs in a worker process, so schemes
+    come and go encoded by `interface.encode_scheme`.
+    """
+    checker = check.Checker()
+    checker.type_env = env.Env(parent=shared_env(shared))
+    for name, data in visible.items():
+        checker.type_env[syntax.Ident(name)] = interface.decode_scheme(data)
+    if len(bindings) == 1 and type(bindings[0][1]) is syntax.Annotated:
+        # Its scheme is the declared one; only its body is left to check.
+        left, right = bindings[0]
+        scheme = typ.generalize(right.declared)
+        with checker.new_scope():
+            checker.type_env[left] = scheme
+            right.infer_type(checker)
+        return [interface.encode_scheme(scheme)]
+    # As in `Let.infer_type`: the bound names are non-generic while their
+    # right-hand sides are inferred.
+    with checker.new_scope():
+        alphas = [checker.fresh_var(non_generic=True) for _ in bindings]
+        for (left, _), alpha in zip(bindings, alphas):
+            checker.type_env[left] = alpha
+        right_types = [right.infer_type(checker) for _, right in bindings]
+        for alpha, right_type in zip(alphas, right_types):
+            checker.unifiers.make_generic(alpha)
+            checker.unify(alpha, right_type)
+    return [interface.encode_scheme(checker.generalize(alpha)) for alpha in alphas]
+
+
+def _visible_env(bindings, deps, encoded, component) -> Dict[str, bytes]:
+    members = set(component)
+    return {
+        bindings[d][0].name: encoded[d]
+        for v in component for d in deps[v] if d not in members
+    }
+
+
+def infer_bindings(bindings: Sequence[Binding], executor: Executor,
+                   shared: Optional[SharedTypes] = None) -> List[typ.Scheme]:
+    """
+    Infers the generalized type of every binding, running independent
+    components concurrently on `executor`. Names that aren't bound in
+    `bindings` are looked up in `shared`, then in the prelude.
+    """
+    deps = dependencies(bindings)
+    encoded: List[Optional[bytes]] = [None] * len(bindings)
+    errors: Dict[int, Exception] = dict()
+    shared_name = None if shared is None else shared.name
+
+    # The users of a binding with a declared type are given that type, so
+    # they needn't wait for the binding itself to be checked.
+    declared = set()
+    for i, (_, right) in enumerate(bindings):
+        if type(right) is syntax.Annotated:
+            encoded[i] = interface.encode_scheme(typ.generalize(right.declared))
+            declared.add(i)
+    waits = [{d for d in ds if d == v or d not in declared} for v, ds in enumerate(deps)]
+
+    for level in levels(waits):
+        futures = []
+        for component in level:
+            if any(encoded[d] is None and d not in component
+                   for v in component for d in deps[v]):
+                continue  # Depends on a failed binding; never reached sequentially.
+            visible = _visible_env(bindings, deps, encoded, component)
+            members = [bindings[v] for v in component]
+            futures.append((component, executor.submit(infer_component, members, visible, shared_name)))
+        for component, future in futures:
+            try:
+                for v, data in zip(component, future.result()):
+                    encoded[v] = data
+            except Exception as err:
+                errors[min(component)] = err
+
+    if errors:
+        raise errors[min(errors)]
+    return [interface.decode_scheme(data) for data in encoded]
+
+
+@contextmanager
+def _executor(executor: Optional[Executor]):
+    """
+    Uses the given executor, or a process pool for the duration.
+    """
+    if executor is not None:
+        yield executor
+    else:
+        with ProcessPoolExecutor() as pool:
+            yield pool
+
+
+def infer_parallel(ast: syntax.AstNode, checker: check.Checker,
+                   executor: Optional[Executor] = None,
+                   shared: Optional[SharedTypes] = None) -> typ.Type:
+    """
+    Infers the type of `ast`, checking the bindings of its outermost `let`
+    chain in parallel. Their names are bound in `checker` while the body is
+    inferred. Free names other than the chain's own must be in `shared` or
+    the prelude.
+    """
+    bindings, body = let_chain(ast)
+    schemes = []
+    if bindings:
+        with _executor(executor) as pool:
+            schemes = infer_bindings(bindings, pool, shared)
+
+    saved_env = checker.type_env
+    try:
+        if shared is not None:
+            # The body sees the shared schemes just as the bindings did.
+            checker.type_env = env.Env(locals=attach(shared.name), parent=checker.type_env)
+        for (left, _), scheme in zip(bindings, schemes):
+            checker.type_env = env.Env(parent=checker.type_env)
+            checker.type_env[left] = scheme
+        return body.infer_type(checker)
+    finally:
+        checker.type_env = saved_env
+
+
+def check_module_parallel(decls: Module, executor: Optional[Executor] = None,
+                          shared: Optional[SharedTypes] = None) -> Dict[str, typ.Scheme]:
+    """
+    The parallel counterpart of `module.check_module`.
+    """
+    with _executor(executor) as pool:
+        schemes = infer_bindings(decls, pool, shared)
+    return {left.name: scheme for (left, _), scheme in zip(decls, schemes)}
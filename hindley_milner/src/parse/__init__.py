@@ -1,8 +1,49 @@
+from typing import List, Tuple, Union
+
+import rply
+
 from hindley_milner.src import syntax
 from . import parser
 from . import lexer
 
+Module = List[Tuple[syntax.Ident, syntax.AstNode]]
+
+
+def parse_program(src_text: str, intern: bool = False) -> Union[syntax.AstNode, Module]:
+    """
+    Parses either a single expression or a module, whichever `src_text` is.
+    The lexer and parser keep no state between calls, so any number of
+    threads can parse at once.
+
+    With `intern`, identical subtrees share one node; see `intern.intern_ast`.
+    """
+    res = parser.parser.parse(lexer.lexer.lex(src_text))
+    if intern:
+        from .intern import intern_ast  # It needs `Module`, from here.
+        res = intern_ast(res)
+    return res
+
+
+def parse(src_text: str, intern: bool = False) -> syntax.AstNode:
+    """
+    Parses a single expression.
+    """
+    res = parse_program(src_text, intern)
+    if isinstance(res, list):
+        msg = "Expected an expression, found declarations"
+        raise rply.ParsingError(msg, rply.token.SourcePosition(0, 1, 1))
+    return res
+
 
-def parse(src_text: str) -> syntax.AstNode:
-    return parser.parser.parse(lexer.lexer.lex(src_text))
+def parse_module(src_text: str, intern: bool = False) -> Module:
+    """
+    Parses a module: a sequence of top-level `val` and `fun` declarations.
 
+    >>> [str(name) for name, _ in parse_module("val x = 1 fun f y = x")]
+    ['x', 'f']
+    """
+    res = parse_program(src_text, intern)
+    if not isinstance(res, list):
+        msg = "Expected declarations, found an expression"
+        raise rply.ParsingError(msg, rply.token.SourcePosition(0, 1, 1))
+    return res
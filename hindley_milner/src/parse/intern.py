@@ -0,0 +1,116 @@
+"""
+Hash-consing of parsed programs.
+
+`intern_ast` makes structurally identical subtrees share a single node, so a
+program that repeats the same subexpression holds it in memory once:
+
+    >>> from hindley_milner.src.parse import parse
+    >>> ast = parse("pair (fn x => succ x) (fn x => succ x)", intern=True)
+    >>> ast.arg is ast.fn.arg
+    True
+
+Every node used more than once gets a `syntax.Shared` span, which tells
+inference to report its errors at the use they're in. Unless it's a leaf, it
+records the names free in it, which lets `infer.infer_type` infer it once
+where it's closed. A shared node keeps the span of its first use, and the
+type recorded on it is that of its last use.
+"""
+
+from typing import Dict, FrozenSet, List, Union
+
+from hindley_milner.src import syntax
+from hindley_milner.src.parse import Module
+
+# The fields holding each node class's children, in order.
+CHILDREN = {
+    syntax.Lambda: ("param", "body"),
+    syntax.Call: ("fn", "arg"),
+    syntax.If: ("pred", "yes", "no"),
+    syntax.Let: ("left", "right", "body"),
+    syntax.Annotated: ("expr",),
+}
+
+
+def _free_names(node, free: Dict[int, FrozenSet[str]]) -> FrozenSet[str]:
+    cls = type(node)
+    if cls is syntax.Lambda:
+        return free[id(node.body)] - {node.param.name}
+    elif cls is syntax.Let and node.recursive:
+        return (free[id(node.right)] | free[id(node.body)]) - {node.left.name}
+    elif cls is syntax.Let:
+        return free[id(node.right)] | (free[id(node.body)] - {node.left.name})
+    else:
+        return frozenset().union(*(free[id(getattr(node, f))] for f in CHILDREN[cls]))
+
+
+def intern_ast(root: Union[syntax.AstNode, Module]) -> Union[syntax.AstNode, Module]:
+    """
+    Interns `root`, an expression or a module, in place, and returns it.
+    """
+    if isinstance(root, list):
+        decls = _intern_roots([rhs for _, rhs in root])
+        return [(lhs, rhs) for (lhs, _), rhs in zip(root, decls)]
+    [root] = _intern_roots([root])
+    return root
+
+
+def _intern_roots(roots: List[syntax.AstNode]) -> List[syntax.AstNode]:
+    canonical: Dict[tuple, syntax.AstNode] = dict()
+    replaced: Dict[int, syntax.AstNode] = dict()  # By id of the parsed node.
+    free: Dict[int, FrozenSet[str]] = dict()  # By id of a canonical node.
+
+    # Children are interned before their parents, without recursion.
+    stack = [(node, False) for node in reversed(roots)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in replaced:
+            continue
+        cls = type(node)
+        fields = CHILDREN.get(cls)
+        if fields is not None and not expanded:
+            stack.append((node, True))
+            stack.extend((getattr(node, f), False) for f in reversed(fields))
+            continue
+        if cls is syntax.Ident:
+            key = (cls, node.name)
+            names = frozenset([node.name])
+        elif cls is syntax.Const:
+            key = (cls, type(node.value), node.value, node._type)
+            names = frozenset()
+        else:
+            kids = [replaced[id(getattr(node, f))] for f in fields]
+            for f, kid in zip(fields, kids):
+                setattr(node, f, kid)
+            key = (cls, *map(id, kids))
+            if cls is syntax.Lambda:
+                key += (node.annotation,)
+            elif cls is syntax.Annotated:
+                key += (node.declared,)
+            elif cls is syntax.Let:
+                key += (node.recursive,)
+            names = None
+        same = canonical.get(key)
+        if same is None:
+            same = canonical[key] = node
+            free[id(node)] = names if names is not None else _free_names(node, free)
+        replaced[id(node)] = same
+
+    # How often each node is used in the program as a tree. `canonical`
+    # holds children before their parents, so go through it backwards.
+    uses: Dict[int, int] = dict()
+    for node in roots:
+        kid = id(replaced[id(node)])
+        uses[kid] = uses.get(kid, 0) + 1
+    for node in reversed(canonical.values()):
+        fields = CHILDREN.get(type(node))
+        n = uses.get(id(node), 0)
+        if fields is not None and n:
+            for f in fields:
+                kid = id(getattr(node, f))
+                uses[kid] = uses.get(kid, 0) + n
+        if n > 1:
+            names = None
+            if fields is not None:
+                names = tuple(syntax.Ident(name) for name in sorted(free[id(node)]))
+            node._span = syntax.Shared(node._span, names)
+    return [replaced[id(node)] for node in roots]
@@ -3,6 +3,9 @@ import rply
 lg = rply.lexergenerator.LexerGenerator()
 
 lg.add("ROCKET", r"=>")
+lg.add("ARROW", r"->")  # in type annotations
+lg.add("STAR", r"\*")
+lg.add("COLON", r":")
 
 lg.add("LET", r"let")
 lg.add("VAL", r"val")
@@ -22,7 +25,7 @@ lg.add("RPAREN", r"\)")
 
 lg.add("INT_LIT", r"\d+")
 lg.add("BOOL_LIT", r"true|false")
-lg.add("IDENT", r"[a-zA-A_][a-zA-Z0-9'_]*")
+lg.add("IDENT", r"[a-zA-Z_][a-zA-Z0-9'_]*")
 
 lg.ignore(r"\s+")
 
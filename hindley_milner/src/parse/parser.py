@@ -1,8 +1,5 @@
-from functools import reduce
-
 import rply
 
-from hindley_milner.src import utils
 from hindley_milner.src import typ
 from hindley_milner.src import syntax
 from hindley_milner.src.parse import lexer
@@ -22,61 +19,212 @@ pg = rply.ParserGenerator(
 )
 
 
+def start_of(x) -> int:
+    """
+    The index where a token or a parsed node starts in the source.
+    """
+    if isinstance(x, rply.Token):
+        return x.getsourcepos().idx
+    return x.span[0]
+
+
+def end_of(x) -> int:
+    """
+    The index just past the end of a token or a parsed node.
+    """
+    if isinstance(x, rply.Token):
+        return x.getsourcepos().idx + len(x.getstr())
+    return x.span[1]
+
+
+def spanned(node, first, last):
+    """
+    Records that `node` covers the source from `first` to `last`, each a
+    token or an already spanned node.
+    """
+    node._span = (start_of(first), end_of(last))
+    return node
+
+
+def ident(token) -> syntax.Ident:
+    return spanned(syntax.Ident(token.value), token, token)
+
+
+@pg.production("top : expr")
+def top_expr(s):
+    return s[0]
+
+
+@pg.production("top : decls")
+def top_decls(s):
+    return [(decl["lhs"], decl["rhs"]) for decl in s[0]]
+
+
+@pg.production("decls : decl")
+def decls_single(s):
+    return [s[0]]
+
+
+@pg.production("decls : decls decl")
+def decls_multi(s):
+    return s[0] + [s[1]]
+
+
 @pg.production("expr : IF expr THEN expr ELSE expr")
 def if_expr(s):
-    return syntax.If(s[1], s[3], s[5])
+    return spanned(syntax.If(s[1], s[3], s[5]), s[0], s[5])
 
 
 @pg.production("expr : LET decl IN expr END")
 def let_expr(s):
     decl = s[1]
-    return syntax.Let(decl["lhs"], decl["rhs"], s[3])
+    return spanned(syntax.Let(decl["lhs"], decl["rhs"], s[3], decl["recursive"]), s[0], s[4])
 
 
 @pg.production("decl : VAL IDENT EQ expr")
 def val_decl(s):
     return {
-        "lhs": syntax.Ident(s[1].value),
+        "lhs": ident(s[1]),
         "rhs": s[3],
+        "recursive": False,
     }
 
 
+@pg.production("decl : VAL IDENT COLON type EQ expr")
+def val_decl_annotated(s):
+    return {
+        "lhs": ident(s[1]),
+        "rhs": spanned(syntax.Annotated(s[5], s[3]), s[5], s[5]),
+        "recursive": False,
+    }
+
+
+def curried(params, body, annotate: bool = True) -> syntax.AstNode:
+    fn = body
+    for param, annotation in reversed(params):
+        fn = spanned(syntax.Lambda(param, fn, annotation if annotate else None), param, body)
+    return fn
+
+
 @pg.production("decl : FUN IDENT params EQ expr")
 def fun_decl(s):
-    params = s[2]
-    body = s[4]
-    fn = utils.foldr(syntax.Lambda, params + [body])
     return {
-        "lhs": syntax.Ident(s[1].value),
-        "rhs": fn,
+        "lhs": ident(s[1]),
+        "rhs": curried(s[2], s[4]),
+        "recursive": True,
+    }
+
+
+@pg.production("decl : FUN IDENT params COLON type EQ expr")
+def fun_decl_annotated(s):
+    # With a result type, the whole function's type is declared, so it's
+    # checked as one `Annotated` rather than parameter by parameter.
+    params, body = s[2], s[6]
+    declared = s[4]
+    for param, annotation in reversed(params):
+        if annotation is None:
+            msg = f"Parameter '{param}' of '{s[1].value}' needs a type, since its result has one"
+            raise rply.ParsingError(msg, s[1].getsourcepos())
+        declared = typ.Fn(annotation, declared)
+    fn = curried(params, body, annotate=False)
+    return {
+        "lhs": ident(s[1]),
+        "rhs": spanned(syntax.Annotated(fn, declared), fn, fn),
+        "recursive": True,
     }
 
 
-@pg.production("params : IDENT")
+@pg.production("params : param")
 def params_single(s):
-    return [syntax.Ident(s[0].value)]
+    return [s[0]]
 
 
-@pg.production("params : params IDENT")
+@pg.production("params : params param")
 def params_multi(s):
-    return s[0] + [syntax.Ident(s[1].value)]
+    return s[0] + [s[1]]
+
+
+@pg.production("param : IDENT")
+def param_plain(s):
+    return ident(s[0]), None
+
+
+@pg.production("param : LPAREN IDENT COLON type RPAREN")
+def param_annotated(s):
+    return ident(s[1]), s[3]
 
 
 @pg.production("expr : FN IDENT ROCKET expr")
 def fn_expr(s):
-    param = syntax.Ident(s[1].value)
-    return syntax.Lambda(param, s[3])
+    return spanned(syntax.Lambda(ident(s[1]), s[3]), s[0], s[3])
+
+
+@pg.production("expr : FN LPAREN IDENT COLON type RPAREN ROCKET expr")
+def fn_expr_annotated(s):
+    return spanned(syntax.Lambda(ident(s[2]), s[7], s[4]), s[0], s[7])
+
+
+# Types, in the syntax of signature files (see `signatures`).
+
+@pg.production("type : tuple_type")
+def type_tuple(s):
+    elems = s[0]
+    return elems[0] if len(elems) == 1 else typ.Tuple(*elems)
+
+
+@pg.production("type : tuple_type ARROW type")
+def type_fn(s):
+    return typ.Fn(type_tuple([s[0]]), s[2])
+
+
+@pg.production("tuple_type : app_type")
+def tuple_type_single(s):
+    return [s[0]]
+
+
+@pg.production("tuple_type : tuple_type STAR app_type")
+def tuple_type_multi(s):
+    return s[0] + [s[2]]
+
+
+@pg.production("app_type : atom_type")
+def app_type_atom(s):
+    return s[0]
+
+
+@pg.production("app_type : IDENT atom_type")
+def app_type_list(s):
+    if s[0].value != "list":
+        raise rply.ParsingError(f"Unknown type constructor '{s[0].value}'", s[0].getsourcepos())
+    return typ.List(s[1])
+
+
+@pg.production("atom_type : IDENT")
+def atom_type_name(s):
+    name = s[0].value
+    if name == "Int":
+        return typ.Int
+    elif name == "Bool":
+        return typ.Bool
+    elif name[0].islower() and name != "list":
+        return typ.Var(name)
+    raise rply.ParsingError(f"Expected a type, found '{name}'", s[0].getsourcepos())
+
+
+@pg.production("atom_type : LPAREN type RPAREN")
+def atom_type_paren(s):
+    return s[1]
 
 
 @pg.production("expr : expr expr", precedence="application")
 def fn_call(s):
-    return syntax.Call(s[0], s[1])
+    return spanned(syntax.Call(s[0], s[1]), s[0], s[1])
 
 
 @pg.production("expr : INT_LIT")
 def int_lit_expr(s):
     value = int(s[0].value)
-    return syntax.Const(value, typ.Int)
+    return spanned(syntax.Const(value, typ.Int), s[0], s[0])
 
 
 @pg.production("expr : BOOL_LIT")
@@ -85,17 +233,17 @@ def bool_lit_expr(s):
         "true": True,
         "false": False
     }[s[0].value]
-    return syntax.Const(value, typ.Bool)
+    return spanned(syntax.Const(value, typ.Bool), s[0], s[0])
 
 
 @pg.production("expr : IDENT")
 def ident_expr(s):
-    return syntax.Ident(s[0].value)
+    return ident(s[0])
 
 
 @pg.production("expr : LPAREN expr RPAREN")
 def paren_expr(s):
-    return s[1]
+    return spanned(s[1], s[0], s[2])
 
 
 parser = pg.build()
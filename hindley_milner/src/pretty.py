@@ -0,0 +1,138 @@
+"""
+Printing types as graphs.
+
+`str(t)` prints a type as a tree, so a type whose subterms are shared (as
+let-polymorphism makes them) can print exponentially long. `write_type`
+instead finds repeated subterms and prints the large ones once, as `where`
+abbreviations:
+
+    >>> a = typ.Var("α")
+    >>> t = typ.Tuple(a, a)
+    >>> for _ in range(3):
+    ...     t = typ.Tuple(t, t)
+    >>> print(show_type(typ.Fn(a, t), min_size=4))
+    (α → (T2 × T2)) where T1 = ((α × α) × (α × α)), T2 = (T1 × T1)
+
+Subterms are identified by structure, not by object identity, so equal
+subterms are shared whether or not they were built that way. Printing takes
+time and memory proportional to the number of distinct subterms, and the
+output is written piece by piece, so a type can be streamed to a file.
+"""
+
+import io
+from typing import Dict, List, TextIO, Tuple, Union
+
+from hindley_milner.src import typ, unicode
+
+# Repeated subterms with fewer nodes than this (counted as a tree) are
+# printed in place: `(list α)` reads better than an abbreviation.
+MIN_SHARED_SIZE = 8
+
+# Tree sizes are only compared with `MIN_SHARED_SIZE`, so stop counting here.
+_SIZE_CAP = 1 << 30
+
+
+def _intern(t: typ.Type) -> Tuple[int, List[Tuple[typ.Type, Tuple[int, ...]]]]:
+    """
+    Hash-conses `t`. Returns the id of its root and, indexed by id, each
+    distinct subterm with the ids of its children. Children come before
+    their parents.
+    """
+    nodes: List[Tuple[typ.Type, Tuple[int, ...]]] = []
+    canonical: Dict[tuple, int] = dict()
+    id_of: Dict[int, int] = dict()  # By object identity.
+    stack = [(t, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in id_of:
+            continue
+        kids = node.vals if isinstance(node, typ.Poly) else ()
+        if kids and not expanded:
+            stack.append((node, True))
+            stack.extend((k, False) for k in reversed(kids) if id(k) not in id_of)
+            continue
+        if type(node) is typ.Var:
+            key = (typ.Var, node.val)
+        else:
+            key = (type(node), tuple(id_of[id(k)] for k in kids))
+        i = canonical.get(key)
+        if i is None:
+            i = canonical[key] = len(nodes)
+            nodes.append((node, key[1] if kids else ()))
+        id_of[id(node)] = i
+    return id_of[id(t)], nodes
+
+
+def _abbreviations(nodes, min_size: int) -> Dict[int, str]:
+    refs = [0] * len(nodes)
+    sizes = [1] * len(nodes)
+    for i, (_, kids) in enumerate(nodes):
+        for k in kids:
+            refs[k] += 1
+            sizes[i] = min(sizes[i] + sizes[k], _SIZE_CAP)
+    names = dict()
+    for i, (_, kids) in enumerate(nodes):
+        if kids and refs[i] > 1 and sizes[i] >= min_size:
+            names[i] = f"T{len(names) + 1}"
+    return names
+
+
+def _write_node(out: TextIO, root: int, nodes, names: Dict[int, str]) -> None:
+    stack: List[Union[int, str]] = [root]
+    first = True  # `root` itself is spelled out, even if abbreviated.
+    while stack:
+        item = stack.pop()
+        if type(item) is str:
+            out.write(item)
+            continue
+        if item in names and not first:
+            out.write(names[item])
+            continue
+        first = False
+        node, kids = nodes[item]
+        if not kids:
+            out.write(str(node))
+        elif type(node) is typ.List:
+            stack.extend((")", kids[0], "(list "))
+        else:
+            sep = f" {node.JOIN} " if node.JOIN is not None else ", "
+            lparen, rparen = node.PARENS if node.PARENS is not None else ("(", ")")
+            stack.append(rparen)
+            for j in reversed(range(len(kids))):
+                stack.append(kids[j])
+                if j:
+                    stack.append(sep)
+            stack.append(lparen)
+
+
+def write_type(t: Union[typ.Type, typ.Scheme], out: TextIO, min_size: int = MIN_SHARED_SIZE) -> None:
+    """
+    Writes `t` (a type or a scheme) to `out`, abbreviating every repeated
+    subterm of at least `min_size` nodes.
+    """
+    if type(t) is typ.Scheme:
+        if t.bound:
+            out.write(f"{unicode.FOR_ALL}{' '.join(str(v) for v in t.bound)}. ")
+        t = t.body
+    root, nodes = _intern(t)
+    names = _abbreviations(nodes, min_size)
+    _write_node(out, root, nodes, names)
+    if names:
+        out.write(" where ")
+    for n, (i, name) in enumerate(names.items()):
+        if n:
+            out.write(", ")
+        out.write(f"{name} = ")
+        _write_node(out, i, nodes, names)
+
+
+def show_type(t: Union[typ.Type, typ.Scheme], min_size: int = MIN_SHARED_SIZE) -> str:
+    """
+    Like `str(t)`, but with repeated subterms abbreviated.
+
+    >>> show_type(typ.Fn(typ.Int, typ.List(typ.Bool)))
+    '(Int → (list Bool))'
+    """
+    out = io.StringIO()
+    write_type(t, out, min_size)
+    return out.getvalue()
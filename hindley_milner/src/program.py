@@ -0,0 +1,210 @@
+"""
+Checking whole programs given as source text.
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, Union
+
+import rply
+
+from hindley_milner.src import budget, check, env, pretty, syntax, typ, unifier_set
+from hindley_milner.src.parse import parse
+
+
+@dataclass
+class Diagnostic:
+    """
+    Why a program was rejected. `kind` is one of "lexing", "parsing",
+    "unknown-symbol", "type" or "budget". The position, when known, is
+    1-based, and `start`/`end` give the offending range as indices into the
+    source.
+    """
+    kind: str
+    message: str
+    lineno: Optional[int] = None
+    colno: Optional[int] = None
+    start: Optional[int] = None
+    end: Optional[int] = None
+
+
+@dataclass
+class Result:
+    """
+    The concretized type of a program, or the error that stopped it. When
+    checking recovered from errors, `errors` holds all of them in source
+    order, and `error` is the first.
+    """
+    type: Optional[typ.Type] = None
+    error: Optional[Diagnostic] = None
+    errors: List[Diagnostic] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        """
+        A JSON-ready form: `{"type": ...}` or `{"error": {...}}`, with an
+        `"errors"` list too when checking recovered from errors.
+
+        >>> check_source("succ 1").as_dict()
+        {'type': 'Int'}
+        """
+        if self.errors:
+            return {"error": vars(self.error), "errors": [vars(d) for d in self.errors]}
+        elif self.error is not None:
+            return {"error": vars(self.error)}
+        return {"type": pretty.show_type(self.type)}
+
+
+def _position(source_pos):
+    if source_pos is None or source_pos.lineno < 0:
+        return None, None
+    return source_pos.lineno, source_pos.colno
+
+
+def line_col(src: str, index: int) -> Tuple[int, int]:
+    """
+    The 1-based line and column of `index` in `src`.
+
+    >>> line_col("let\\n  val", 6)
+    (2, 3)
+    """
+    lineno = src.count("\n", 0, index) + 1
+    colno = index - (src.rfind("\n", 0, index) + 1) + 1
+    return lineno, colno
+
+
+def lexing_diagnostic(src: str, err: rply.errors.LexingError) -> Diagnostic:
+    lineno, colno = _position(err.source_pos)
+    if lineno is None:
+        pos = f"at index {err.source_pos.idx}"
+    else:
+        pos = f"on line {lineno}, column {colno}"
+    msg = f"Lexing Error: Unexpected character {pos}!"
+    idx = err.source_pos.idx
+    return Diagnostic("lexing", msg, lineno, colno, idx, idx + 1)
+
+
+def parsing_diagnostic(src: str, err: rply.errors.ParsingError) -> Diagnostic:
+    lineno, colno = _position(err.source_pos)
+    if lineno is None:
+        msg = "Parsing Error: Unexpected end of input!"
+        return Diagnostic("parsing", msg, None, None, len(src), len(src))
+    msg = f"Parsing Error: Unexpected token on line {lineno}, column {colno}!"
+    idx = err.source_pos.idx
+    return Diagnostic("parsing", msg, lineno, colno, idx, idx + 1)
+
+
+def _span_of_use(src: str, path: Tuple[int, ...]) -> Optional[Tuple[int, int]]:
+    """
+    The span of the node of `src` that the child indices in `path` lead to
+    from its root, found in a plain parse of it.
+    """
+    from hindley_milner.src.parse.intern import CHILDREN  # It imports `parse`.
+    try:
+        node = parse(src)
+        for i in path:
+            node = getattr(node, CHILDREN[type(node)][i])
+    except (rply.errors.ParsingError, KeyError, IndexError):  # Not an expression `path` fits.
+        return None
+    return node.span
+
+
+def inference_diagnostic(src: str, err: Exception) -> Diagnostic:
+    """
+    Describes an `EnvKeyError`, `UnificationError` or `BudgetExceeded`
+    raised by inference, positioned at the node it was checking. If that's
+    shared by an interned AST (see `parse.intern`), that is the use of it
+    that failed, which is found by parsing `src` again.
+    """
+    if isinstance(err, env.EnvKeyError):
+        diagnostic = Diagnostic("unknown-symbol", f"Semantic Error: Unrecognized symbol '{err.key}'!")
+    elif isinstance(err, budget.BudgetExceeded):
+        diagnostic = Diagnostic("budget", err.msg)
+    else:
+        diagnostic = Diagnostic("type", err.msg)
+    span = getattr(getattr(err, "node", None), "span", None)
+    path = getattr(err, "path", None)
+    if path is not None:
+        span = _span_of_use(src, path) or span
+    if span is not None:
+        diagnostic.start, diagnostic.end = span
+        diagnostic.lineno, diagnostic.colno = line_col(src, span[0])
+    return diagnostic
+
+
+def parse_source(src: str) -> Union[syntax.AstNode, Result]:
+    """
+    Parses `src`, or describes why it can't be parsed.
+    """
+    try:
+        return parse(src)
+    except rply.errors.LexingError as err:
+        return Result(error=lexing_diagnostic(src, err))
+    except rply.errors.ParsingError as err:
+        return Result(error=parsing_diagnostic(src, err))
+
+
+def inference_diagnostics(src: str, errors: List[Exception]) -> List[Diagnostic]:
+    """
+    Diagnostics for the errors recovered from in checking `src`, in source
+    order. A name that isn't bound is only reported at its first use.
+    """
+    pairs = [(inference_diagnostic(src, err), err) for err in errors]
+    pairs.sort(key=lambda p: (p[0].start is None, p[0].start or 0))
+    diagnostics, unbound = [], set()
+    for d, err in pairs:
+        if type(err) is env.EnvKeyError:
+            if err.key in unbound:
+                continue
+            unbound.add(err.key)
+        diagnostics.append(d)
+    return diagnostics
+
+
+def _recovered(src: str, errors: List[Exception]) -> Result:
+    diagnostics = inference_diagnostics(src, errors)
+    return Result(error=diagnostics[0], errors=diagnostics)
+
+
+def infer_source(src: str, ast: syntax.AstNode, checker: check.Checker,
+                 limits: Optional[budget.Budget] = None, recover: bool = False) -> Result:
+    """
+    Infers `ast`, parsed from `src`, as `check_source` does.
+    """
+    saved_budget, saved_errors = checker.budget, checker.errors
+    if limits is not None:
+        checker.budget = limits.start()
+    if recover:
+        checker.errors = []
+    try:
+        t = ast.infer_type(checker)
+        if checker.errors:
+            return _recovered(src, checker.errors)
+        return Result(type=checker.concretize(t))
+    except (env.EnvKeyError, unifier_set.UnificationError, budget.BudgetExceeded) as err:
+        if checker.errors:
+            return _recovered(src, checker.errors + [err])
+        return Result(error=inference_diagnostic(src, err))
+    finally:
+        checker.budget, checker.errors = saved_budget, saved_errors
+
+
+def check_source(src: str, checker: Optional[check.Checker] = None,
+                 limits: Optional[budget.Budget] = None, recover: bool = False) -> Result:
+    """
+    Parses and infers `src`, with a fresh checker unless one is given.
+    Inference is held to `limits`, if given, restarted for this check. With
+    `recover`, inference carries on past type errors to report them all.
+
+    >>> check_source("pair 1 true").type
+    Tuple(Int, Bool)
+    >>> print(check_source("succ true").error.message)
+    Type mismatch: Int != Bool
+    >>> for d in check_source("pair (succ true) (not 1)", recover=True).errors:
+    ...     print(d.colno, d.message)
+    6 Type mismatch: Int != Bool
+    18 Type mismatch: Bool != Int
+    """
+    checker = check.Checker() if checker is None else checker
+    ast = parse_source(src)
+    if type(ast) is Result:
+        return ast
+    return infer_source(src, ast, checker, limits, recover)
@@ -0,0 +1,76 @@
+"""
+Read-only type data shared between processes.
+
+`SharedTypes` writes a set of schemes, such as the prelude and any imported
+signatures, into a `multiprocessing.shared_memory` segment, in the format of
+an interface file. Worker processes `attach` to it by name and look schemes
+up straight from the shared pages, decoding only the ones they use, so no
+worker holds its own copy of the whole set:
+
+    >>> with SharedTypes.with_prelude() as shared:
+    ...     print(attach(shared.name)["succ"])
+    (Int → Int)
+
+The process that creates a `SharedTypes` owns the segment and removes it on
+`close`. Attached segments stay mapped until the worker exits.
+"""
+
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+from hindley_milner.src import env, interface, std_env, syntax, typ
+
+# Segments attached by this process, by name, with their schemes.
+_attached: Dict[str, Tuple[shared_memory.SharedMemory, interface.InterfaceFile]] = dict()
+
+
+class SharedTypes:
+    def __init__(self, schemes: Dict[str, typ.Scheme]):
+        data = interface.encode_interface(schemes)
+        self._shm = shared_memory.SharedMemory(create=True, size=len(data))
+        self._shm.buf[:len(data)] = data
+        self.name = self._shm.name
+        self.size = len(data)
+
+    @classmethod
+    def with_prelude(cls, schemes: Optional[Dict[str, typ.Scheme]] = None) -> "SharedTypes":
+        """
+        Shares every prelude scheme, plus `schemes`, which shadow them.
+        """
+        prelude = std_env.PRELUDE.locals
+        everything = {name: prelude[name] for name in prelude.names()}
+        everything.update(schemes or {})
+        return cls(everything)
+
+    def close(self) -> None:
+        shm, _ = _attached.pop(self.name, (None, None))
+        if shm is not None:
+            shm.close()
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(name: str) -> interface.InterfaceFile:
+    """
+    The schemes in the shared segment `name`, mapped into this process once.
+    """
+    if name not in _attached:
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm, interface.InterfaceFile(shm.buf)
+    return _attached[name][1]
+
+
+def shared_env(name: Optional[str]) -> env.Env["syntax.Ident", typ.Scheme]:
+    """
+    An environment of the schemes in segment `name` over the prelude, or just
+    the prelude if `name` is None.
+    """
+    if name is None:
+        return std_env.PRELUDE
+    return env.Env(locals=attach(name), parent=std_env.PRELUDE)
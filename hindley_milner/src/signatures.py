@@ -0,0 +1,292 @@
+"""
+Typed signatures stored in a sidecar file, loaded lazily through an offset
+index.
+
+A signature file has one signature per line:
+
+    # Comments and blank lines are ignored.
+    pair : a -> b -> a * b
+    null : list a -> Bool
+
+Type variables are lowercase names, `list` is the only type constructor that
+takes an argument, `*` builds tuples and `->` builds (right-associative)
+functions.
+
+The index file next to it lists `name offset` pairs sorted by name, behind a
+header line recording the size, modification time and hash of the signature
+file it was built from. `SignatureFile` memory-maps both files and
+binary-searches the index, so opening one costs the same no matter how many
+signatures it holds, and an entry is only parsed the first time it's looked
+up. The file is only hashed when its modification time no longer matches,
+as after a checkout.
+
+To rebuild an index after editing a signature file:
+
+    $ python -m hindley_milner.src.signatures hindley_milner/src/prelude.sig
+"""
+
+import hashlib
+import mmap
+import os
+import re
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Tuple
+
+from hindley_milner.src import typ
+
+TOKEN = re.compile(r"\s*(->|\*|\(|\)|[A-Za-z_][A-Za-z0-9_']*)")
+INDEX_HEADER = b"#sig "
+
+
+class SignatureError(Exception):
+    def __init__(self, msg):
+        self.msg = msg
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = TOKEN.match(text, pos)
+        if m is None:
+            raise SignatureError(f"Unexpected character in type {text!r} at index {pos}!")
+        tokens.append(m.group(1))
+        pos = m.end()
+    return tokens
+
+
+class _TypeParser:
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.pos = 0
+        self.vars: Dict[str, typ.Var] = dict()
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def expect(self, tok):
+        if self.peek() != tok:
+            raise SignatureError(f"Expected {tok!r}, found {self.peek()!r}!")
+        self.pos += 1
+
+    def parse(self) -> typ.Type:
+        t = self.fn_type()
+        if self.peek() is not None:
+            raise SignatureError(f"Unexpected {self.peek()!r} after type!")
+        return t
+
+    def fn_type(self) -> typ.Type:
+        arg = self.tuple_type()
+        if self.peek() == "->":
+            self.pos += 1
+            return typ.Fn(arg, self.fn_type())
+        return arg
+
+    def tuple_type(self) -> typ.Type:
+        elems = [self.app_type()]
+        while self.peek() == "*":
+            self.pos += 1
+            elems.append(self.app_type())
+        return elems[0] if len(elems) == 1 else typ.Tuple(*elems)
+
+    def app_type(self) -> typ.Type:
+        if self.peek() == "list":
+            self.pos += 1
+            return typ.List(self.atom_type())
+        return self.atom_type()
+
+    def atom_type(self) -> typ.Type:
+        tok = self.peek()
+        self.pos += 1
+        if tok == "(":
+            t = self.fn_type()
+            self.expect(")")
+            return t
+        elif tok == "Int":
+            return typ.Int
+        elif tok == "Bool":
+            return typ.Bool
+        elif tok is not None and tok[0].islower() and tok != "list":
+            return self.vars.setdefault(tok, typ.Var(tok))
+        else:
+            raise SignatureError(f"Expected a type, found {tok!r}!")
+
+
+def parse_type(text: str) -> typ.Type:
+    """
+    >>> print(parse_type("a -> list a * Int -> Bool"))
+    (a → (((list a) × Int) → Bool))
+    """
+    return _TypeParser(tokenize(text)).parse()
+
+
+def format_type(t: typ.Type) -> str:
+    """
+    Writes a type in signature syntax, so that `parse_type` can read it back.
+
+    >>> format_type(typ.Fn(typ.Fn(typ.Var("a"), typ.Int), typ.List(typ.Tuple(typ.Int, typ.Bool))))
+    '(a -> Int) -> list (Int * Bool)'
+    """
+    def fmt(t, prec):
+        # prec: 0 = anywhere, 1 = tuple element/function argument, 2 = atom
+        if type(t) is typ.Var:
+            return str(t.val)
+        elif type(t) is typ.Fn:
+            arg, ret = t.vals
+            s = f"{fmt(arg, 1)} -> {fmt(ret, 0)}"
+            return s if prec == 0 else f"({s})"
+        elif type(t) is typ.Tuple:
+            s = " * ".join(fmt(x, 2) for x in t.vals)
+            return s if prec == 0 else f"({s})"
+        elif type(t) is typ.List:
+            [elem] = t.vals
+            s = f"list {fmt(elem, 2)}"
+            return s if prec < 2 else f"({s})"
+        else:
+            return str(t)
+    return fmt(t, 0)
+
+
+def parse_signature(line: str) -> Tuple[str, typ.Scheme]:
+    """
+    >>> name, scheme = parse_signature("pair : a -> b -> a * b")
+    >>> name, str(scheme)
+    ('pair', '∀a b. (a → (b → (a × b)))')
+    """
+    name, sep, text = line.partition(":")
+    name = name.strip()
+    if not sep or not name:
+        raise SignatureError(f"Expected `name : type`, found {line.strip()!r}!")
+    return name, typ.generalize(parse_type(text))
+
+
+def _entries(data: bytes) -> Iterator[Tuple[bytes, int]]:
+    offset = 0
+    for line in data.splitlines(keepends=True):
+        stripped = line.strip()
+        if stripped and not stripped.startswith(b"#"):
+            yield stripped.partition(b":")[0].strip(), offset
+        offset += len(line)
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.sha256(data).hexdigest().encode()
+
+
+def build_index(data: bytes, mtime_ns: int = 0) -> bytes:
+    entries = sorted(_entries(data))
+    lines = [INDEX_HEADER + b"%d %d %s" % (len(data), mtime_ns, _digest(data))]
+    lines.extend(name + b" " + str(offset).encode() for name, offset in entries)
+    return b"\n".join(lines) + b"\n"
+
+
+def write_index(sig_path: str, idx_path: str = None) -> None:
+    idx_path = idx_path or os.path.splitext(sig_path)[0] + ".idx"
+    with open(sig_path, "rb") as f:
+        index = build_index(f.read(), os.fstat(f.fileno()).st_mtime_ns)
+    with open(idx_path, "wb") as f:
+        f.write(index)
+
+
+def _map(path: str):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class SignatureFile(Mapping):
+    """
+    A read-only mapping from `syntax.Ident`s to the schemes in a signature
+    file. Use it as the `locals` of an `env.Env`.
+
+    Entries are parsed on first lookup and cached after that. Reads only
+    slice the memory maps, so a `SignatureFile` can be shared between
+    threads.
+    """
+
+    def __init__(self, sig_path: str, idx_path: str = None):
+        idx_path = idx_path or os.path.splitext(sig_path)[0] + ".idx"
+        self.sig_path = sig_path
+        self._mtime_ns = os.stat(sig_path).st_mtime_ns
+        self._sigs = _map(sig_path)
+        try:
+            self._index = _map(idx_path)
+        except FileNotFoundError:
+            self._index = b""
+        if not self._index_is_current():
+            # Stale or missing index: rebuild it in memory.
+            self._index = build_index(self._sigs[:])
+        self._cache: Dict[str, typ.Scheme] = dict()
+
+    def _index_is_current(self) -> bool:
+        header = self._index[:self._index.find(b"\n")]
+        if not header.startswith(INDEX_HEADER):
+            return False
+        size, mtime_ns, digest = header[len(INDEX_HEADER):].split(b" ")
+        if int(size) != len(self._sigs):
+            return False
+        # Touched since it was indexed, if not necessarily changed.
+        return int(mtime_ns) == self._mtime_ns or digest == _digest(self._sigs)
+
+    def _offset_of(self, name: bytes):
+        index = self._index
+        lo = index.find(b"\n") + 1  # Skip the header.
+        hi = len(index)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = index.rfind(b"\n", 0, mid) + 1
+            end = index.find(b"\n", start)
+            key, _, offset = index[start:end].partition(b" ")
+            if key == name:
+                return int(offset)
+            elif key < name:
+                lo = end + 1
+            else:
+                hi = start
+        return None
+
+    def _load(self, name: str):
+        offset = self._offset_of(name.encode())
+        if offset is None:
+            return None
+        end = self._sigs.find(b"\n", offset)
+        end = len(self._sigs) if end == -1 else end
+        _, scheme = parse_signature(self._sigs[offset:end].decode())
+        # Two threads may load the same entry; keep whichever lands first.
+        scheme = self._cache.setdefault(name, scheme)
+        return scheme
+
+    def get(self, key, default=None):
+        name = getattr(key, "name", key)
+        scheme = self._cache.get(name)
+        if scheme is None:
+            scheme = self._load(name)
+        return default if scheme is None else scheme
+
+    def __getitem__(self, key):
+        scheme = self.get(key)
+        if scheme is None:
+            raise KeyError(key)
+        return scheme
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def names(self) -> Iterator[str]:
+        lines = self._index[:].split(b"\n")[1:]
+        return (line.partition(b" ")[0].decode() for line in lines if line)
+
+    def __iter__(self):
+        from hindley_milner.src import syntax
+        return (syntax.Ident(name) for name in self.names())
+
+    def __len__(self):
+        return self._index[:].count(b"\n") - 1
+
+
+if __name__ == '__main__':
+    for path in sys.argv[1:]:
+        write_index(path)
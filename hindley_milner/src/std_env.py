@@ -1,24 +1,28 @@
 from __future__ import annotations
 
-from hindley_milner.src import env, check, typ, syntax
+import functools
+import hashlib
+import os
 
-StdEnv = env.Env[syntax.Ident, typ.Type]
+from hindley_milner.src import env, typ, syntax, signatures
 
+StdEnv = env.Env["syntax.Ident", typ.Scheme]
 
-def std_env(checker: check.Checker) -> StdEnv:
-    T = checker.fresh_var()
-    U = checker.fresh_var()
-    V = checker.fresh_var()
-    W = checker.fresh_var()
+PRELUDE_PATH = os.path.join(os.path.dirname(__file__), "prelude.sig")
 
-    return env.Env(locals={
-        syntax.Ident("null"): typ.Fn(typ.List(T), typ.Bool),
-        syntax.Ident("tail"): typ.Fn(typ.List(U), typ.List(U)),
-        syntax.Ident("zero"): typ.Fn(typ.Int, typ.Bool),
-        syntax.Ident("succ"): typ.Fn(typ.Int, typ.Int),
-        syntax.Ident("pred"): typ.Fn(typ.Int, typ.Int),
-        syntax.Ident("times"): typ.Fn(typ.Int, typ.Fn(typ.Int, typ.Int)),
-        syntax.Ident("pair"): typ.Fn(V, typ.Fn(W, typ.Tuple(V, W))),
-    })
+# The prelude is opened once, when this module is imported, and shared by
+# every `Checker`. Its signatures are only parsed when first looked up, and
+# are pre-generalized schemes that get instantiated on use, so no checker ever
+# needs prelude variables in its own `UnifierSet`. A `SignatureFile` can't be
+# assigned to, so the prelude is read-only and safe to share between threads.
+PRELUDE: StdEnv = env.Env(locals=signatures.SignatureFile(PRELUDE_PATH))
 
 
+@functools.lru_cache(maxsize=None)
+def prelude_version() -> str:
+    """
+    A digest of the prelude's signatures. Only computed when asked for, so
+    that startup doesn't have to read the whole signature file.
+    """
+    with open(PRELUDE_PATH, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from abc import ABC, abstractmethod
+from abc import ABC
 from dataclasses import dataclass, field
+from typing import Optional
 
 from hindley_milner.src import check
 from hindley_milner.src import typ
@@ -9,12 +10,23 @@ from hindley_milner.src import utils
 
 
 class AstNode(ABC):
-    def __init__(self):
+    # Nodes are slotted so that large programs don't pay for a `__dict__` per
+    # node. `_type` is preallocated here and filled in by `infer_type`.
+    # `_span` is the node's `(start, end)` character range in the source,
+    # set by the parser, or None for nodes built by hand. On nodes that
+    # `parse.intern_ast` finds used more than once, it's a `Shared` instead.
+    __slots__ = ("_type", "_span")
+
+    def __post_init__(self):
         self._type = None
+        self._span = None
 
-    @abstractmethod
+    @utils.cache_in_attr("_type")
     def infer_type(self, checker: check.Checker) -> typ.Type:
-        pass
+        """
+        Infers this node's type with the checker's `engine.Engine`.
+        """
+        return checker.engine.infer(self, checker)
 
     @property
     def type(self) -> typ.Type:
@@ -30,12 +42,31 @@ class AstNode(ABC):
         else:
             return self._type
 
+    @property
+    def span(self):
+        span = self._span
+        return span.span if type(span) is Shared else span
+
+
+class Shared:
+    """
+    Stands in for the span of a node used more than once in an interned AST,
+    that of its first use. `free` holds the `Ident`s free in the node, so
+    that inference can tell whether it's closed; it's `None` for an `Ident`
+    or a `Const`.
+    """
+    __slots__ = ("span", "free")
+
+    def __init__(self, span, free):
+        self.span = span
+        self.free = free
+
 
 class Value(AstNode, ABC):
-    pass
+    __slots__ = ()
 
 
-@dataclass(eq=True)
+@dataclass(eq=True, slots=True)
 class Ident(Value):
     """
     An identifier.
@@ -43,10 +74,6 @@ class Ident(Value):
     """
     name: str
 
-    @utils.cache_in_attr("_type")
-    def infer_type(self, checker: check.Checker) -> typ.Type:
-        return checker.duplicate_type(checker.type_env[self])
-
     def __str__(self):
         return self.name
 
@@ -54,7 +81,7 @@ class Ident(Value):
         return hash(self.name)
 
 
-@dataclass(eq=True)
+@dataclass(eq=True, slots=True)
 class Const(Value):
     """
     A literal.
@@ -63,38 +90,27 @@ class Const(Value):
     value: object
     _type: field(init=False)  # `_` ensures no collision with superclass property
 
-    def infer_type(self, checker: check.Checker) -> typ.Type:
-        return self.type  # Note: calls superclass property
+    def __post_init__(self):
+        self._span = None  # `_type` is given to the constructor, don't clobber it.
 
     def __str__(self):
         return str(self.value)
 
 
-@dataclass(eq=True)
+@dataclass(eq=True, slots=True)
 class Lambda(AstNode):
     """
     lambda param: body
+
+    `annotation` is the parameter's declared type, if any. Its type variables
+    stand for types still to be inferred, separately for each lambda.
     """
     param: Ident
     body: AstNode
-
-    @utils.cache_in_attr("_type")
-    def infer_type(self, checker: check.Checker) -> typ.Type:
-
-        # In a new scope, infer the type of the body.
-        # Scoped because `self.param` is valid only inside this scope.
-        # Parameter types are non-generic while checking the body.
-        with checker.new_scope(), checker.scoped_non_generic() as arg_type:
-            checker.type_env[self.param] = arg_type
-            body_type = self.body.infer_type(checker)
-
-        # After inferring body's type, arg type might be known.
-        arg_type = checker.unifiers.concretize(arg_type)
-
-        return typ.Fn(arg_type, body_type)
+    annotation: Optional[typ.Type] = None
 
 
-@dataclass(eq=True)
+@dataclass(eq=True, slots=True)
 class Call(AstNode):
     """
     fn(arg)
@@ -102,27 +118,8 @@ class Call(AstNode):
     fn: AstNode
     arg: AstNode
 
-    @utils.cache_in_attr("_type")
-    def infer_type(self, checker: check.Checker) -> typ.Type:
-
-        # Get best guess as to the type of `self.arg`.
-        arg_type = self.arg.infer_type(checker)
-
-        # Set up a function type.
-        beta = checker.fresh_var()
-        fn_type_joiner = typ.Fn(arg_type, beta)
-
-        # Ensure the `self.fn` refers to a Fn type.
-        fn_type = self.fn.infer_type(checker)
-
-        checker.unify(fn_type, fn_type_joiner)
 
-        # In case beta's root was changed in the last unification, get it's
-        # current root.
-        return checker.unifiers.concretize(beta)
-
-
-@dataclass(eq=True)
+@dataclass(eq=True, slots=True)
 class If(AstNode):
     """
     if pred then yes else no
@@ -131,44 +128,28 @@ class If(AstNode):
     yes: AstNode
     no: AstNode
 
-    @utils.cache_in_attr("_type")
-    def infer_type(self, checker: check.Checker) -> typ.Type:
-        pred_type = self.pred.infer_type(checker)
-        checker.unify(pred_type, typ.Bool)
-
-        yes_type = self.yes.infer_type(checker)
-        no_type = self.no.infer_type(checker)
-        checker.unify(yes_type, no_type)
 
-        return checker.unifiers.concretize(yes_type)
-
-
-@dataclass(eq=True)
+@dataclass(eq=True, slots=True)
 class Let(AstNode):
     """
     let left = right in body
+
+    A `fun` binding is `recursive`: `left` is in scope in `right`. A `val`
+    binding isn't, so `right` is inferred before `left` is bound.
     """
     left: Ident
     right: AstNode
     body: AstNode
+    recursive: bool = True
 
-    @utils.cache_in_attr("_type")
-    def infer_type(self, checker: check.Checker) -> typ.Type:
-
-        # Scope the `left = right` binding.
-        with checker.new_scope():
-
-            # First, bind `left` to a fresh type variable. This allows
-            # for recursive let statements.
-            # Note: `alpha` is only non-generic while inferring `right`. TODO: Why tho?
-            with checker.scoped_non_generic() as alpha:
-                checker.type_env[self.left] = alpha
-
-                # Next infer the type of `right` using the binding just created.
-                right_type = self.right.infer_type(checker)
 
-            # Link the type variable with the inferred type of `right`.
-            checker.unify(alpha, right_type)
+@dataclass(eq=True, slots=True)
+class Annotated(AstNode):
+    """
+    expr : declared
 
-            # With the environment set up, now the body can be typechecked.
-            return self.body.infer_type(checker)
+    The right-hand side of a declaration with a declared type. Its type
+    variables are universally quantified: `expr` must be at least as general.
+    """
+    expr: AstNode
+    declared: typ.Type
@@ -1,3 +1,5 @@
+from typing import Iterable, List as ListT
+
 from hindley_milner.src import unicode
 from hindley_milner.src.utils import instance
 
@@ -60,12 +62,32 @@ class Poly(Type):
             return f"{lparen}{vals}{rparen}"
 
     def __hash__(self):
-        return hash((self.__class__, self.vals))
+        # Let-polymorphism builds types that share subterms, whose trees are
+        # exponentially larger than they are; caching each node's hash keeps
+        # hashing linear in the number of nodes.
+        h = self.__dict__.get("_hash")
+        if h is None:
+            h = self._hash = hash((self.__class__, self.vals))
+        return h
+
+    def __reduce__(self):
+        if self.SIZE == 0:
+            # The classes of Int and Bool are hidden behind their instances,
+            # so pickle those by name.
+            return _atom, (self.__class__.__name__,)
+        return self.__class__, self.vals
 
     def __eq__(self, other):
+        if self is other:
+            return True
         return super().__eq__(other) and \
                len(self.vals) == len(other.vals) and \
-               all(x == y for x, y in zip(self.vals, other.vals))
+               hash(self) == hash(other) and \
+               all(x is y or x == y for x, y in zip(self.vals, other.vals))
+
+
+def _atom(name: str) -> Poly:
+    return globals()[name]
 
 
 class Tuple(Poly):
@@ -94,3 +116,72 @@ class Int(Poly):
 @instance
 class Bool(Poly):
     SIZE = 0
+
+
+@instance
+class Error(Poly):
+    """
+    The type of a subexpression that failed to check, when the checker
+    recovers from errors (see `check.Checker.recover`). It unifies with any
+    type, so an error isn't reported again wherever its type flows.
+    """
+    SIZE = 0
+
+
+class Scheme:
+    """
+    A type generalized over some of its type variables.
+    ∀α β. (α → (β → (α × β)))
+
+    Schemes are immutable. Checkers use them through `Checker.instantiate`,
+    which replaces the bound variables with fresh ones, so one scheme can be
+    shared by any number of checkers.
+    """
+
+    def __init__(self, bound: Iterable[Var], body: Type):
+        self.bound = tuple(bound)
+        self.body = body
+
+    def __repr__(self):
+        cls_name = self.__class__.__name__
+        return f"{cls_name}({self.bound!r}, {self.body!r})"
+
+    def __str__(self):
+        if not self.bound:
+            return str(self.body)
+        bound = " ".join(str(v) for v in self.bound)
+        return f"{unicode.FOR_ALL}{bound}. {self.body}"
+
+    def __hash__(self):
+        return hash((self.__class__, self.bound, self.body))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and \
+               self.bound == other.bound and \
+               self.body == other.body
+
+
+def type_vars(t: Type) -> ListT[Var]:
+    """
+    The distinct type variables of `t`, in order of first appearance.
+
+    >>> a, b = Var("a"), Var("b")
+    >>> type_vars(Fn(a, Tuple(b, a, Int)))
+    [Var('a'), Var('b')]
+    """
+    found = dict()
+    stack = [t]
+    while stack:
+        t = stack.pop()
+        if type(t) is Var:
+            found[t] = None
+        elif isinstance(t, Poly):
+            stack.extend(reversed(t.vals))
+    return list(found)
+
+
+def generalize(t: Type) -> Scheme:
+    """
+    Quantifies over every type variable in `t`.
+    """
+    return Scheme(type_vars(t), t)
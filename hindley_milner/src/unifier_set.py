@@ -1,6 +1,7 @@
+from itertools import tee
 from typing import Set
 
-from hindley_milner.src import typ, utils
+from hindley_milner.src import bulk, overlay, typ, utils
 from hindley_milner.src.disjoint_set import DisjointSet
 
 
@@ -13,17 +14,38 @@ class RecursiveUnificationError(UnificationError):
     pass
 
 
+class AnnotationError(UnificationError):
+    """
+    A declared type is more general than the expression it's declared for.
+    """
+
+
 class UnifierSet(DisjointSet):
     def __init__(self):
         super().__init__()
         self._fresh_var_names = utils.fresh_greek_stream()
         self.non_generic_vars: Set[typ.Var] = set()
+        self.budget = None  # An optional `budget.Budget`.
+
+    def fork(self) -> "UnifierSet":
+        """
+        Returns an independent copy of this set in O(1). From now on, both
+        read the unifications made so far from a shared, frozen layer.
+        """
+        copy = UnifierSet.__new__(UnifierSet)
+        self.map, copy.map = overlay.fork_dict(self.map)
+        self.non_generic_vars, copy.non_generic_vars = overlay.fork_set(self.non_generic_vars)
+        self._fresh_var_names, copy._fresh_var_names = tee(self._fresh_var_names)
+        copy.budget = self.budget
+        return copy
 
     def fresh_var(self, non_generic=False) -> typ.Var:
         """
         A Var should always be added to the global UnifierSet whenever it's
         created. Returns a non-generic type variable unless otherwise specified.
         """
+        if self.budget is not None:
+            self.budget.fresh_var()
         v = typ.Var(next(self._fresh_var_names))
         self.add(v)
         if non_generic:
@@ -31,6 +53,8 @@ class UnifierSet(DisjointSet):
         return v
 
     def occurs_in_type(self, t1, t2):
+        if self.budget is not None:
+            self.budget.unify_step()
         if t1 == t2:
             return True
         elif isinstance(t2, typ.Poly):
@@ -39,6 +63,8 @@ class UnifierSet(DisjointSet):
             return False
 
     def unify(self, t1: typ.Type, t2: typ.Type):
+        if self.budget is not None:
+            self.budget.unify_step()
 
         if type(t1) is typ.Var:
 
@@ -59,12 +85,14 @@ class UnifierSet(DisjointSet):
             if t1 == t2:
                 return  # Type variables are identical, no need to unify.
             elif self.occurs_in_type(t1, t2):
-                raise RecursiveUnificationError
+                raise RecursiveUnificationError(f"Recursive unification: {t1} occurs in {t2}")
             else:
                 self.join(t1, t2)
 
         elif isinstance(t1, typ.Poly) and isinstance(t2, typ.Poly):
             if type(t1) is not type(t2):
+                if t1 == typ.Error or t2 == typ.Error:
+                    return
                 msg = f"Type mismatch: {t1} != {t2}"
                 raise UnificationError(msg)
             elif len(t1.vals) != len(t2.vals):
@@ -77,6 +105,130 @@ class UnifierSet(DisjointSet):
         elif isinstance(t1, typ.Poly) and type(t2) is typ.Var:
             return self.unify(t2, t1)  # Swap args and call again
 
+    def unify_all(self, pairs) -> None:
+        """
+        Unifies each pair of types, solving the var-to-var equalities they
+        come down to all at once. Pairs of structures are taken apart first,
+        each distinct pair of subterms once. The var-to-var equalities are
+        then solved together (see `bulk`) and written back into the
+        union-find, and only then is each variable unified with a structure.
+
+        Non-genericity spreads along the var-to-var equalities in order, as
+        if each were unified on its own, so it doesn't depend on whether they
+        are solved in bulk. A mismatch between two structures taken apart is
+        raised before anything is joined; one with a variable bound to a
+        structure is only found afterwards, when variables may already have
+        been joined.
+
+        Example:
+        >>> unifiers = UnifierSet()
+        >>> a, b, c = (unifiers.fresh_var() for _ in range(3))
+        >>> unifiers.unify_all([(a, b), (typ.Tuple(b, typ.Int), typ.Tuple(c, a))])
+        >>> unifiers.concretize(c)
+        Int
+        """
+        budget = self.budget
+        stack = list(pairs)
+        stack.reverse()
+        seen = set()
+        left, right, rest = [], [], []
+        while stack:
+            t1, t2 = stack.pop()
+            if budget is not None:
+                budget.unify_step()
+            if type(t1) is typ.Var:
+                if type(t2) is typ.Var:
+                    left.append(t1)
+                    right.append(t2)
+                else:
+                    rest.append((t1, t2))
+            elif type(t2) is typ.Var:
+                rest.append((t2, t1))
+            elif (id(t1), id(t2)) not in seen:
+                seen.add((id(t1), id(t2)))
+                if type(t1) is not type(t2):
+                    if t1 == typ.Error or t2 == typ.Error:
+                        continue
+                    raise UnificationError(f"Type mismatch: {t1} != {t2}")
+                elif len(t1.vals) != len(t2.vals):
+                    raise UnificationError(f"Type mismatch: {t1} has different arity than {t2}!")
+                stack.extend(reversed(list(zip(t1.vals, t2.vals))))
+        self._join_vars(left, right)
+        for t1, t2 in rest:
+            self.unify(t1, t2)
+
+    def _join_vars(self, left, right):
+        """
+        Unifies each `left[i]` with `right[i]`, all variables, in order.
+        Equalities between classes not bound to structures are gathered into
+        runs and joined together; one with a class bound to a structure is
+        unified on its own, after the run before it.
+        """
+        # Hashing a `Var` runs Python code, so each one is looked up as few
+        # times as possible.
+        map = self.map
+        non_generic_vars = self.non_generic_vars
+        run = ([], [])  # The roots to join.
+        for a, b in zip(left, right):
+            if a in non_generic_vars or b in non_generic_vars:
+                non_generic_vars.add(a)
+                non_generic_vars.add(b)
+            pa, pb = map.get(a), map.get(b)
+            if pa is None:
+                pa = map[a] = 1
+            if pb is None:
+                pb = map[b] = 1
+            ra = a if type(pa) is int else self.root_of(a)
+            rb = b if type(pb) is int else self.root_of(b)
+            if type(ra) is typ.Var and type(rb) is typ.Var:
+                run[0].append(ra)
+                run[1].append(rb)
+            else:
+                self._join_roots(*run)
+                run = ([], [])
+                self.unify(a, b)
+        self._join_roots(*run)
+
+    def _join_roots(self, left, right):
+        """
+        Joins the classes of each `left[i]` and `right[i]`, all roots bound
+        to no structure. Runs of at least `bulk.MIN_EQUALITIES` are solved as
+        a graph of roots (see `bulk`) and written back with weighted roots
+        and sizes.
+        """
+        if len(left) < bulk.MIN_EQUALITIES:
+            for r1, r2 in zip(left, right):
+                self.join(r1, r2)
+            return
+        map = self.map
+        index = dict()  # By root: its number.
+        roots = []
+
+        def number(r):
+            i = index.setdefault(r, len(roots))
+            if i == len(roots):
+                roots.append(r)
+            return i
+
+        ends = [number(r) for r in left], [number(r) for r in right]
+        labels = bulk.components(ends[0], ends[1], len(roots))
+
+        biggest = dict()  # By label: the number of its largest root.
+        totals = dict()
+        for i, label in enumerate(labels):
+            size = map[roots[i]]
+            j = biggest.get(label)
+            if j is None:
+                biggest[label] = i
+                totals[label] = size
+            else:
+                if size > map[roots[j]]:
+                    biggest[label] = i
+                totals[label] += size
+        for i, label in enumerate(labels):
+            j = biggest[label]
+            map[roots[i]] = totals[label] if i == j else roots[j]
+
     def join_roots(self, r1, r2):
         size1, size2 = self.map[r1], self.map[r2]
 
@@ -98,6 +250,8 @@ class UnifierSet(DisjointSet):
                 self.map[r1] = r2
         else:
             if type(r1) is not type(r2):
+                if r1 == typ.Error or r2 == typ.Error:
+                    return
                 msg = f"Type mismatch: {r1} != {r2}"
                 raise UnificationError(msg)
             else:
@@ -107,6 +261,8 @@ class UnifierSet(DisjointSet):
         """
         Recursively searches for `Var`s in `t`, making them all non-generic.
         """
+        if self.budget is not None:
+            self.budget.unify_step()
         if type(t) is typ.Var:
             self.non_generic_vars.add(t)
         elif isinstance(t, typ.Poly):
@@ -125,14 +281,52 @@ class UnifierSet(DisjointSet):
             If T has been unified with Int:
                 self.concretize(T) -> Int
                 self.concretize(Tuple(T)) -> Tuple(Int)
+
+        Subterms shared in `t` (or through the unifier) stay shared in the
+        result, so a type is rebuilt in time proportional to its size as a
+        graph, not as a tree.
         """
+        if self.budget is not None:
+            return self._concretize_within_budget(t)
+        return self._concretize(t, dict())
+
+    def _concretize(self, t: typ.Type, memo) -> typ.Type:
         if type(t) is typ.Var:
             r = self.root_of(t)
-            return r if r == t else self.concretize(r)
+            return r if r == t else self._concretize(r, memo)
         elif isinstance(t, typ.Poly):
-            cls = type(t)
-            vals = (self.concretize(v) for v in t.vals)
-            return cls(*vals)
+            done = memo.get(id(t))
+            if done is None:
+                cls = type(t)
+                done = memo[id(t)] = cls(*(self._concretize(v, memo) for v in t.vals))
+            return done
+
+    def _concretize_within_budget(self, t: typ.Type) -> typ.Type:
+        """
+        `concretize`, but reporting the number of nodes built so far to the
+        budget at every node.
+        """
+        budget = self.budget
+        memo = dict()
+        size = 0
+
+        def build(t):
+            nonlocal size
+            if type(t) is typ.Var:
+                r = self.root_of(t)
+                if r != t:
+                    return build(r)
+            done = memo.get(id(t))
+            if done is not None:
+                return done
+            size += 1
+            budget.type_node(size)
+            if isinstance(t, typ.Poly):
+                done = memo[id(t)] = type(t)(*(build(v) for v in t.vals))
+                return done
+            return t
+
+        return build(t)
 
     def make_generic(self, v: typ.Var):
         self.non_generic_vars.remove(v)
@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import rply
+
+from hindley_milner.src import check, engine, module, parallel, program, typ
+from hindley_milner.src.parse import parse, parse_module
+from hindley_milner.src.parse.intern import intern_ast
+from hindley_milner.src.syntax import Annotated, Lambda
+from hindley_milner.src.typ import Int, Bool, Fn, List, Tuple, Var
+from hindley_milner.src.unifier_set import AnnotationError, UnificationError
+
+ENGINES = [engine.ReferenceEngine(), engine.IterativeEngine()]
+
+
+def infer(src, eng=engine.REFERENCE):
+    checker = check.Checker(engine=eng)
+    return checker.concretize(parse(src).infer_type(checker))
+
+
+def test_parse_annotations():
+    a = Var("a")
+    let = parse("let val f : a -> list a * Int = fn x => pair (cons x nil) 1 in f end")
+    assert type(let.right) is Annotated
+    assert let.right.declared == Fn(a, Tuple(List(a), Int))
+
+    fn = parse("fn (p : (Int -> Bool) * b) => p")
+    assert type(fn) is Lambda
+    assert fn.annotation == Tuple(Fn(Int, Bool), Var("b"))
+
+    # A result type makes the whole function's type declared.
+    [(_, rhs)] = parse_module("fun f (x : Int) (y : a) : a = y")
+    assert rhs.declared == Fn(Int, Fn(a, a))
+    assert rhs.expr.annotation is None
+
+
+@pytest.mark.parametrize("src", [
+    "fun f x : Int = x",  # A result type needs every parameter's type.
+    "val x : Foo = 1",
+    "val x : pair Int = 1",
+])
+def test_bad_annotations_dont_parse(src):
+    with pytest.raises(rply.ParsingError):
+        parse_module(src)
+
+
+@pytest.mark.parametrize("eng", ENGINES, ids=lambda e: e.name)
+def test_declared_scheme_is_used(eng):
+    assert infer("let val f : a -> a = fn x => x in pair (f 1) (f true) end", eng) == Tuple(Int, Bool)
+    # A declared scheme makes polymorphic recursion possible.
+    src = "let fun f (x : a) : a = if true then x else snd (f (pair 1 x)) in pair (f 1) (f true) end"
+    assert infer(src, eng) == Tuple(Int, Bool)
+
+
+@pytest.mark.parametrize("eng", ENGINES, ids=lambda e: e.name)
+def test_parameter_annotations(eng):
+    assert infer("fn (x : Int) => x", eng) == Fn(Int, Int)
+    t = infer("fn (p : a * b) => p", eng)
+    assert type(t) is Fn and t.vals[0] == t.vals[1] and type(t.vals[0]) is Tuple
+    with pytest.raises(UnificationError):
+        infer("fn (x : Int) => not x", eng)
+
+
+@pytest.mark.parametrize("eng", ENGINES, ids=lambda e: e.name)
+@pytest.mark.parametrize("src, problem", [
+    ("let val f : a -> a = fn x => succ x in f end", "a is Int"),
+    ("let val f : a -> b -> a = fn x => fn y => y in f end", "a and b are the same type"),
+    ("fn y => let val f : a -> a = fn x => y in f end", "a depends on the environment"),
+])
+def test_too_general_declarations(eng, src, problem):
+    with pytest.raises(AnnotationError) as err:
+        infer(src, eng)
+    assert err.value.msg.endswith(problem)
+
+
+def test_less_general_declaration_is_fine():
+    assert infer("let val f : Int -> Int = fn x => x in f 1 end") == Int
+
+
+def test_module_exports_declared_scheme():
+    exports = module.check_module(parse_module("fun id (x : a) : a = x val n = id 1"), check.Checker())
+    assert str(exports["id"]) == "∀a. (a → a)"
+    assert exports["n"].body == Int
+
+
+def test_parallel_users_dont_wait_for_declared_bindings():
+    decls = parse_module("fun id (x : a) : a = x val n = id 1 val b = id true")
+    deps = parallel.dependencies(decls)
+    assert deps == [set(), {0}, {0}]
+    with ThreadPoolExecutor(2) as pool:
+        exports = parallel.check_module_parallel(decls, pool)
+    assert exports["n"].body == Int and exports["b"].body == Bool
+
+    with ThreadPoolExecutor(2) as pool, pytest.raises(AnnotationError):
+        parallel.check_module_parallel(parse_module("fun id (x : a) : a = 1 val n = id 1"), pool)
+
+
+def test_intern_keeps_different_annotations_apart():
+    ast = intern_ast(parse("pair (fn (x : Int) => x) (fn (x : Bool) => x)"))
+    assert ast.arg is not ast.fn.arg
+
+
+def test_diagnostic_for_too_general_declaration():
+    result = program.check_source("let val f : a -> a = fn x => succ x in f end")
+    assert result.error.message == "Declared type (a → a) is too general: a is Int"
@@ -0,0 +1,69 @@
+import io
+import json
+import os
+import threading
+
+from hindley_milner.src import batch
+from hindley_milner.src.cache import InferenceCache
+
+
+def records(data: bytes):
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+def test_check_lines():
+    out = io.BytesIO()
+    failures = batch.check_lines(io.BytesIO(b"succ 1\n\nnot 1\nsucc nope"), out)
+    ok, mismatch, unknown = records(out.getvalue())
+    assert failures == 2
+    assert ok == {"line": 1, "type": "Int"}
+    assert mismatch["line"] == 3
+    assert mismatch["error"]["kind"] == "type"
+    assert (mismatch["error"]["lineno"], mismatch["error"]["colno"]) == (1, 1)
+    assert unknown["line"] == 4
+    assert unknown["error"]["start"] == 5
+
+
+def test_lines_split_across_chunks(monkeypatch):
+    monkeypatch.setattr(batch, "CHUNK_SIZE", 3)
+    out = io.BytesIO()
+    batch.check_lines(io.BytesIO(b"pair 1 true\nsucc 2\n"), out)
+    assert [r["type"] for r in records(out.getvalue())] == ["(Int × Bool)", "Int"]
+
+
+def test_check_files(tmp_path):
+    good = tmp_path / "good.hm"
+    good.write_text("let val x = 1\nin pair x true end")
+    bad = tmp_path / "bad.hm"
+    bad.write_text("let val x = 1\nin succ true end")
+    out = io.BytesIO()
+    failures = batch.check_files([str(good), str(bad), str(tmp_path / "missing.hm")], out)
+    good_r, bad_r, missing_r = records(out.getvalue())
+    assert failures == 2
+    assert good_r == {"file": str(good), "type": "(Int × Bool)"}
+    assert (bad_r["error"]["lineno"], bad_r["error"]["colno"]) == (2, 4)
+    assert missing_r["error"]["kind"] == "io"
+
+
+def test_results_stream_before_input_ends():
+    in_r, in_w = os.pipe()
+    out_r, out_w = os.pipe()
+    with open(in_r, "rb") as infile, open(out_w, "wb") as outfile:
+        worker = threading.Thread(target=batch.check_lines, args=(infile, outfile))
+        worker.start()
+        with open(in_w, "wb", buffering=0) as feed, open(out_r, "rb") as results:
+            feed.write(b"succ 1\n")
+            assert json.loads(results.readline()) == {"line": 1, "type": "Int"}
+            feed.write(b"not true\n")
+            assert json.loads(results.readline()) == {"line": 2, "type": "Bool"}
+            feed.close()
+            worker.join(5)
+
+
+def test_cached_checks(tmp_path):
+    cache = InferenceCache(str(tmp_path))
+    src = b"pair 1 true\n" * 3
+    out = io.BytesIO()
+    batch.check_lines(io.BytesIO(src), out, cache.check_source)
+    assert {r["type"] for r in records(out.getvalue())} == {"(Int × Bool)"}
+    assert cache.stats()["hits"] == 2
@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from hindley_milner.src import check, program
+from hindley_milner.src.budget import Budget, BudgetExceeded
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.parse import parse
+
+
+def doubling(n):
+    src = "let val f0 = fn x => pair x x in "
+    for i in range(1, n):
+        src += f"let val f{i} = fn y => f{i - 1} (f{i - 1} y) in "
+    return src + f"f{n - 1}" + " end" * n
+
+
+@pytest.mark.parametrize("limit, stat", [
+    ("max_unify_steps", "unify_steps"),
+    ("max_type_size", "largest_type"),
+    ("max_fresh_vars", "fresh_vars"),
+])
+def test_limits(limit, stat):
+    checker = check.Checker(budget=Budget(**{limit: 10}))
+    with pytest.raises(BudgetExceeded) as err:
+        checker.concretize(infer_type(parse(doubling(5)), checker))
+    assert err.value.stats[stat] == 11
+
+
+def test_deadline():
+    limits = Budget(timeout=0.05)
+    with pytest.raises(BudgetExceeded) as err:
+        infer_type(parse(doubling(6)), check.Checker(budget=limits))
+    assert "longer than" in err.value.msg
+    assert err.value.stats["elapsed"] < 1.0
+
+
+@pytest.mark.parametrize("timeout", [1, 3])
+def test_deadline_stops_hashing_shared_types(timeout):
+    # Unifying the types a doubling chain builds hashes them, which took
+    # exponential time, out of the deadline's reach, before hashes were cached.
+    start = time.perf_counter()
+    result = program.check_source(doubling(7), check.Checker(), Budget(timeout=timeout))
+    assert result.error.kind == "budget"
+    assert time.perf_counter() - start < timeout + 2
+
+
+def test_within_budget():
+    limits = Budget(max_unify_steps=1000, max_type_size=100, max_fresh_vars=100, timeout=10)
+    checker = check.Checker(budget=limits)
+    t = checker.concretize(infer_type(parse(doubling(2)), checker))
+    unlimited = check.Checker()
+    assert str(t) == str(unlimited.concretize(infer_type(parse(doubling(2)), unlimited)))
+    assert 0 < limits.largest_type <= 100
+
+
+def test_check_source_restarts_and_removes_budget():
+    checker = check.Checker()
+    limits = Budget(max_type_size=10)
+    result = program.check_source(doubling(5), checker, limits)
+    assert result.error.kind == "budget"
+    assert checker.budget is None
+    # The counts start over for the next check.
+    assert program.check_source("succ 1", checker, limits).type is not None
+    assert limits.largest_type < 10
@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+from hindley_milner.src import cache, check, program, syntax
+from hindley_milner.src.cache import InferenceCache
+from hindley_milner.src.typ import Int, Bool, Tuple
+
+
+@pytest.fixture
+def inference_cache(tmp_path):
+    return InferenceCache(str(tmp_path / "cache"))
+
+
+def test_hit_skips_checking(inference_cache, monkeypatch):
+    assert inference_cache.check_source("pair 1 true").type == Tuple(Int, Bool)
+
+    def fail(src):
+        raise AssertionError("should have been a cache hit")
+    monkeypatch.setattr(program, "check_source", fail)
+
+    assert inference_cache.check_source("pair 1 true").type == Tuple(Int, Bool)
+    assert inference_cache.stats()["hits"] == 1
+    assert inference_cache.stats()["misses"] == 1
+
+
+def test_errors_are_cached(inference_cache):
+    first = inference_cache.check_source("succ true")
+    second = inference_cache.check_source("succ true")
+    assert first.type is None
+    assert second.error == first.error
+    assert second.error.kind == "type"
+
+
+def test_hits_and_misses_look_the_same(inference_cache):
+    miss = inference_cache.check_source("fn x => pair x x")
+    hit = inference_cache.check_source("fn x => pair x x")
+    assert str(miss.type) == str(hit.type)
+
+
+def test_key_depends_on_engine_version(inference_cache, monkeypatch):
+    key = inference_cache.key("succ 1")
+    monkeypatch.setattr(check, "ENGINE_VERSION", "next")
+    assert inference_cache.key("succ 1") != key
+
+
+def test_no_temporary_files_left(inference_cache):
+    inference_cache.check_source("succ 1")
+    assert not [f for f in os.listdir(inference_cache.directory) if f.startswith(".tmp-")]
+
+
+def test_lru_eviction(tmp_path):
+    entry_size = len(cache.encode_result(program.check_source("succ 0")))
+    inference_cache = InferenceCache(str(tmp_path / "cache"), max_bytes=10 * entry_size)
+
+    for i in range(10):
+        inference_cache.check_source(f"succ {i}")
+        path = inference_cache._path(inference_cache.key(f"succ {i}"))
+        os.utime(path, (i, i))  # Make the use order unambiguous.
+
+    inference_cache.check_source("succ 0")  # Hit: now the most recently used.
+    inference_cache.check_source("succ 10")  # Over the limit: evict.
+
+    assert inference_cache.evictions > 0
+    assert inference_cache.get("succ 0") is not None
+    assert inference_cache.get("succ 1") is None
+
+
+def test_session_hit_leaves_the_unifier_alone(monkeypatch):
+    checker = check.Checker()
+    session = cache.SessionCache(checker)
+    miss = session.check_source("fn x => pair x (succ 1)")
+    entries = len(checker.unifiers.map)
+
+    def fail(src, checker):
+        raise AssertionError("should have been a cache hit")
+    monkeypatch.setattr(program, "check_source", fail)
+
+    hit = session.check_source("fn x => pair x (succ 1)")
+    assert str(hit.type) == str(miss.type)
+    assert len(checker.unifiers.map) == entries
+
+
+def test_session_key_depends_on_the_environment():
+    checker = check.Checker()
+    session = cache.SessionCache(checker)
+    assert session.check_source("x").error.kind == "unknown-symbol"
+    checker.type_env[syntax.Ident("x")] = Int
+    assert session.check_source("x").type == Int
+    assert session.misses == 2
+
+
+def test_session_lru_eviction():
+    session = cache.SessionCache(check.Checker(), max_entries=2)
+    for src in ["succ 0", "succ 1", "succ 0", "succ 2", "succ 0", "succ 1"]:
+        session.check_source(src)
+    # "succ 1" was the least recently used when "succ 2" came in.
+    assert (session.hits, session.misses, len(session)) == (2, 4, 2)
+    assert "hits: 2/6 (33.3%)" in session.format_stats()
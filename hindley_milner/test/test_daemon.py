@@ -0,0 +1,177 @@
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+
+from hindley_milner.src import daemon, program
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "hm.sock")
+
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, **fields):
+        self.writer.write(json.dumps(fields).encode() + b"\n")
+        return json.loads(await self.reader.readline())
+
+    def close(self):
+        self.writer.close()
+
+
+async def connect(path):
+    return Connection(*await asyncio.open_unix_connection(path))
+
+
+def with_daemon(socket_path, session, **kwargs):
+    async def main():
+        d = daemon.Daemon(socket_path, **kwargs)
+        await d.start()
+        try:
+            return await session(d)
+        finally:
+            await d.close()
+    return asyncio.run(main())
+
+
+def test_check_and_errors(socket_path):
+    async def session(d):
+        conn = await connect(socket_path)
+        responses = [
+            await conn.request(id=1, op="check", src="pair 1 true"),
+            await conn.request(id=2, op="check", src="succ true"),
+            await conn.request(op="check", src="succ nope"),
+            await conn.request(op="frobnicate"),
+        ]
+        conn.close()
+        return responses
+
+    ok, mismatch, unknown, bad_op = with_daemon(socket_path, session)
+    assert ok == {"id": 1, "type": "(Int × Bool)"}
+    assert mismatch["id"] == 2
+    assert mismatch["error"]["kind"] == "type"
+    assert mismatch["error"]["start"] == 0
+    assert unknown["error"]["kind"] == "unknown-symbol"
+    assert bad_op["error"]["kind"] == "protocol"
+
+
+def test_bad_json(socket_path):
+    async def session(d):
+        conn = await connect(socket_path)
+        conn.writer.write(b"{not json\n")
+        response = json.loads(await conn.reader.readline())
+        follow_up = await conn.request(op="ping")
+        conn.close()
+        return response, follow_up
+
+    response, follow_up = with_daemon(socket_path, session)
+    assert response["error"]["kind"] == "protocol"
+    assert follow_up == {"ok": True}
+
+
+def test_bad_timeout(socket_path):
+    async def session(d):
+        conn = await connect(socket_path)
+        responses = [await conn.request(op="check", src="succ 1", timeout=t)
+                     for t in [-1, 0, "5", True, None, float("inf")]]
+        responses.append(await conn.request(op="check", src="succ 1", timeout=5))
+        conn.close()
+        return responses
+
+    *bad, ok = with_daemon(socket_path, session)
+    assert [r["error"]["kind"] for r in bad] == ["request"] * 6
+    assert ok == {"type": "Int"}
+
+
+def test_sessions_are_isolated(socket_path):
+    async def session(d):
+        a = await connect(socket_path)
+        b = await connect(socket_path)
+        a1 = await a.request(op="check", src="fn x => x")
+        a2 = await a.request(op="check", src="fn x => x")
+        b1 = await b.request(op="check", src="fn x => x")
+        await a.request(op="reset")
+        a3 = await a.request(op="check", src="fn x => x")
+        a.close()
+        b.close()
+        return a1, a2, b1, a3
+
+    a1, a2, b1, a3 = with_daemon(socket_path, session)
+    assert a1 != a2  # A session's checker carries on, like the repl's.
+    assert a1 == b1 == a3
+
+
+def test_timeout_resets_session(socket_path, monkeypatch):
+    check_source = program.check_source
+    release = threading.Event()
+
+    def slow_check_source(src, checker, limits):
+        if src == "slow":
+            release.wait(5)  # Ignoring the budget.
+        return check_source("succ 1", checker, limits)
+
+    monkeypatch.setattr(program, "check_source", slow_check_source)
+    monkeypatch.setattr(daemon, "GRACE", 0.0)
+
+    async def session(d):
+        slow = await connect(socket_path)
+        other = await connect(socket_path)
+        timed_out = asyncio.ensure_future(slow.request(op="check", src="slow", timeout=0.2))
+        served = await other.request(op="check", src="fast")  # Not held up.
+        response = await timed_out
+        release.set()
+        after = await slow.request(op="check", src="fast")
+        slow.close()
+        other.close()
+        return served, response, after
+
+    served, response, after = with_daemon(socket_path, session)
+    assert served == {"type": "Int"}
+    assert response["error"]["kind"] == "timeout"
+    assert after == {"type": "Int"}
+
+
+def test_blocking_client_and_stale_socket(socket_path):
+    open(socket_path, "w").close()  # Left behind by a dead daemon.
+    loop = asyncio.new_event_loop()
+    d = daemon.Daemon(socket_path)
+    loop.run_until_complete(d.start())
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    try:
+        with pytest.raises(daemon.DaemonError):
+            asyncio.run(daemon.Daemon(socket_path).start())
+        with daemon.Client(socket_path, timeout=5) as client:
+            assert client.check("succ 1") == {"type": "Int"}
+            assert client.request(op="ping") == {"ok": True}
+    finally:
+        asyncio.run_coroutine_threadsafe(d.close(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+    assert not os.path.exists(socket_path)
+
+
+def test_pathological_program_stops_itself(socket_path):
+    src = "let val f = fn x => pair x x in " \
+          "let val g = fn x => f (f (f (f x))) in " \
+          "let val h = fn x => g (g (g (g x))) in " \
+          "let val k = fn x => h (h (h (h x))) in k end end end end"
+
+    async def session(d):
+        conn = await connect(socket_path)
+        response = await conn.request(op="check", src=src, timeout=0.2)
+        after = await conn.request(op="check", src="succ 1")
+        conn.close()
+        return response, after
+
+    response, after = with_daemon(socket_path, session)
+    assert response["error"]["kind"] == "budget"
+    assert after == {"type": "Int"}
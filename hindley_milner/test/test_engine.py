@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+
+import pytest
+
+from hindley_milner.src import check, engine, module, program, syntax
+from hindley_milner.src.parse import parse, parse_module
+from hindley_milner.test.test_infer import BAD_PROGRAMS, PROGRAMS
+
+
+class CountingEngine(engine.ReferenceEngine):
+    name = "counting"
+
+    def __init__(self):
+        self.unifications = 0
+
+    def unify(self, checker, t1, t2):
+        self.unifications += 1
+        super().unify(checker, t1, t2)
+
+
+class NoUnifyEngine(engine.ReferenceEngine):
+    name = "no-unify"
+
+    def unify(self, checker, t1, t2):
+        pass
+
+
+def test_ast_dispatches_to_engine():
+    counting = CountingEngine()
+    checker = check.Checker(engine=counting)
+    assert str(checker.concretize(parse("if true then 1 else 2").infer_type(checker))) == "Int"
+    assert counting.unifications == 2
+
+
+def test_checks_use_the_checkers_engine():
+    counting = CountingEngine()
+    assert str(program.check_source("if true then 1 else 2", check.Checker(engine=counting)).type) == "Int"
+    module.check_module(parse_module("val a = if true then 1 else 2"), check.Checker(engine=counting))
+    assert counting.unifications == 5
+
+
+@pytest.mark.parametrize("src", [
+    "pair (succ true) (pair (nope 1) (if 1 then 2 else true))",
+    "let val x = succ true in pair (not x) (x 1) end",
+    "let val g : Int -> Bool = succ in pair (g 1) (g true) end",
+])
+def test_engines_recover_alike(src):
+    found = []
+    for eng in (engine.ReferenceEngine(), engine.IterativeEngine()):
+        result = program.check_source(src, check.Checker(engine=eng), recover=True)
+        found.append([(d.start, d.message) for d in result.errors])
+    assert found[0] == found[1]
+    assert found[0]
+
+
+def test_reference_and_iterative_agree():
+    engines = [engine.ReferenceEngine(), engine.IterativeEngine()]
+    result = engine.compare(engines, PROGRAMS + BAD_PROGRAMS, repeat=1)
+    assert set(result.seconds) == {"reference", "iterative"}
+    assert result.disagreements == []
+
+
+def test_disagreements_are_reported():
+    engines = [engine.ReferenceEngine(), NoUnifyEngine()]
+    result = engine.compare(engines, ["1", "succ true"], repeat=1)
+    [(i, seen)] = result.disagreements
+    assert i == 1
+    assert seen["reference"] == ("error", "UnificationError")
+    assert seen["no-unify"][0] == "type"
+
+
+def test_outcome_ignores_variable_names():
+    assert engine.outcome("fn x => fn y => pair y x", engine.REFERENCE) == \
+        ("type", "(t0 → (t1 → (t1 × t0)))")
+
+
+@pytest.mark.parametrize("eng", [engine.ReferenceEngine(), engine.IterativeEngine()])
+def test_unknown_nodes(eng):
+    @dataclass(eq=True, slots=True)
+    class Hole(syntax.AstNode):
+        pass
+
+    with pytest.raises(TypeError, match="No inference rule for Hole"):
+        Hole().infer_type(check.Checker(engine=eng))
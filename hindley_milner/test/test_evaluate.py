@@ -0,0 +1,88 @@
+import pytest
+
+from hindley_milner.__main__ import main
+from hindley_milner.src import check, evaluate
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.parse import parse
+
+PROGRAMS = [
+    ("let fun fib n = if less n 2 then n else plus (fib (minus n 1)) (fib (minus n 2)) in fib 15 end", "610"),
+    ("map (fn x => pair x (zero x)) (cons 0 (cons 1 nil))", "[(0, true), (1, false)]"),
+    ("foldr (fn x => fn acc => plus x acc) 0 (cons 1 (cons 2 (cons 3 nil)))", "6"),
+    ("let val x : Int = 3 in let val x = pair x x in x end end", "(3, 3)"),
+    ("reverse (append (cons 1 nil) (cons 2 nil))", "[2, 1]"),
+    ("zip (cons 1 nil) (cons true nil)", "[(1, true)]"),
+    ("and true (or false (not (eq 1 (snd (pair 2 1)))))", "false"),
+    ("let val add = plus in map (add 10) (filter (less 1) (cons 1 (cons 2 nil))) end", "[12]"),
+    ("let fun f (x : Int) : Int = times x x in compose f f 3 end", "81"),
+    ("let val succ = fn x => times x 2 in succ 5 end", "10"),
+    ("fn x => x", "<fn>"),
+]
+
+
+def checked(src):
+    ast = parse(src)
+    checker = check.Checker()
+    t = checker.concretize(infer_type(ast, checker))
+    return ast, checker, t
+
+
+@pytest.mark.parametrize("src, expected", PROGRAMS)
+def test_compiled_and_interpreted_agree(src, expected):
+    ast, checker, t = checked(src)
+    assert evaluate.show_value(evaluate.compile_ast(ast, checker)(), t) == expected
+    assert evaluate.show_value(evaluate.interpret(ast), t) == expected
+
+
+def test_saturated_primitives_are_inlined(monkeypatch):
+    ast, checker, _ = checked("pair (plus 1 2) (map (plus 1) (cons 1 nil))")
+    calls = []
+    plus = evaluate.PRELUDE["plus"]
+    monkeypatch.setitem(evaluate.PRELUDE, "plus", lambda a: calls.append(a) or plus(a))
+    monkeypatch.setitem(evaluate.PRELUDE, "pair", None)
+    # Only the partially applied `plus` is a call of the prelude function.
+    assert evaluate.compile_ast(ast, checker)() == (3, (2, None))
+    assert calls == [1]
+
+
+@pytest.mark.parametrize("src, msg", [
+    ("head nil", "head of an empty list!"),
+    ("div 1 (minus 2 2)", "Division by zero!"),
+])
+def test_runtime_errors(src, msg):
+    ast, checker, _ = checked(src)
+    for run in (evaluate.compile_ast(ast, checker), lambda: evaluate.interpret(ast)):
+        with pytest.raises(evaluate.EvalError) as err:
+            run()
+        assert err.value.msg == msg
+
+
+def test_only_checked_programs_compile():
+    with pytest.raises(evaluate.EvalError):
+        evaluate.compile_ast(parse("succ 1"), check.Checker())
+    with pytest.raises(evaluate.EvalError):
+        evaluate.interpret(parse("if 1 then 2 else 3"))
+
+
+def test_run_command(tmp_path, capsys):
+    good, bad = tmp_path / "good.ml", tmp_path / "bad.ml"
+    good.write_text("pair (succ 1) true")
+    bad.write_text("succ true")
+    assert main(["run", str(good), str(bad)]) == 1
+    assert capsys.readouterr().out.splitlines() == ["(2, true) : (Int × Bool)", "Type mismatch: Int != Bool"]
+
+
+def test_long_let_chains():
+    n = 2000
+    src = "let val a0 = 1 in " + " ".join(f"let val a{i} = plus a{i - 1} 1 in" for i in range(1, n)) \
+        + f" pair a{n - 1} a0" + " end" * n
+    ast, checker, t = checked(src)
+    assert evaluate.compile_ast(ast, checker)() == (n, 1)
+    assert evaluate.interpret(ast) == (n, 1)
+
+
+def test_deep_recursion_is_a_runtime_error(tmp_path, capsys):
+    path = tmp_path / "deep.ml"
+    path.write_text("let fun f x = if zero x then 0 else f (pred x) in f 100000 end")
+    assert main(["run", str(path)]) == 1
+    assert capsys.readouterr().out == "Runtime Error: Recursion too deep!\n"
@@ -0,0 +1,107 @@
+import pytest
+
+from hindley_milner.src import check, overlay, typ
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.module import check_module
+from hindley_milner.src.parse import parse, parse_module
+from hindley_milner.src.syntax import Ident
+from hindley_milner.src.unifier_set import UnificationError
+
+PREFIX = """
+fun compose f g x = f (g x)
+val twice = fn f => compose f f
+fun length l = if null l then 0 else succ (length (tail l))
+"""
+
+
+def checked_prefix():
+    checker = check.Checker()
+    check_module(parse_module(PREFIX), checker)
+    return checker
+
+
+def type_of(src, checker):
+    return str(checker.concretize(infer_type(parse(src), checker)))
+
+
+def test_forks_check_candidates_independently():
+    checker = checked_prefix()
+    candidates = {
+        "twice succ": "(Int → Int)",
+        "length (cons true nil)": "Int",
+        "compose not zero": "(Int → Bool)",
+    }
+    for src, expected in candidates.items():
+        assert type_of(src, checker.fork()) == expected
+    with pytest.raises(UnificationError):
+        type_of("twice length", checker.fork())
+    # The prefix is untouched by its forks.
+    assert type_of("twice not", checker) == "(Bool → Bool)"
+
+
+def test_fork_does_not_copy_state():
+    checker = checked_prefix()
+    fork = checker.fork()
+    assert dict.__len__(fork.unifiers.map) == 0
+    assert len(fork.unifiers.map) == len(checker.unifiers.map) > 0
+
+
+def test_unifications_stay_in_their_fork():
+    checker = check.Checker()
+    a, b = checker.fresh_var(), checker.fresh_var()
+    checker.unify(a, typ.List(b))
+    fork = checker.fork()
+    fork.unify(b, typ.Int)
+    checker.unify(b, typ.Bool)
+    assert str(fork.concretize(a)) == "(list Int)"
+    assert str(checker.concretize(a)) == "(list Bool)"
+
+
+def test_bindings_and_genericness_stay_in_their_fork():
+    checker = check.Checker()
+    x = Ident("x")
+    with checker.new_scope(), checker.scoped_non_generic() as alpha:
+        checker.type_env[x] = alpha
+        fork = checker.fork()
+        fork.type_env[x] = typ.Int
+        fork.unifiers.make_generic(alpha)
+        assert checker.type_env[x] == alpha
+        assert checker.is_non_generic(alpha)
+        assert fork.is_generic(alpha)
+    assert fork.type_env[x] == typ.Int
+
+
+def test_fresh_variables_continue_in_each_fork():
+    checker = check.Checker()
+    checker.fresh_var()
+    fork = checker.fork()
+    assert checker.fresh_var() == fork.fresh_var() == typ.Var("β")
+
+
+def test_forks_of_forks_stay_shallow():
+    checker = checked_prefix()
+    for i in range(3 * overlay.MAX_DEPTH):
+        checker.fresh_var()
+        checker = checker.fork()
+        assert checker.unifiers.map.depth <= overlay.MAX_DEPTH
+    assert type_of("twice succ", checker) == "(Int → Int)"
+
+
+def test_forked_sets_convert_with_all_their_members():
+    a, b = overlay.fork_set({1, 2})
+    b.add(3)
+    b.remove(1)
+    assert set(b) == frozenset(b) == b.flatten() == {2, 3}
+    assert a.flatten() == {1, 2}
+    with pytest.raises(TypeError):
+        b | {9}
+
+
+def test_reads_do_not_write_into_shared_bases():
+    d, e = overlay.fork_dict({"a": 1})
+    e["b"] = 2
+    base = e
+    e, f = overlay.fork_dict(e)
+    assert e["a"] == f["a"] == 1
+    assert dict.__len__(base) == 1
+    assert dict.get(f, "a") == 1
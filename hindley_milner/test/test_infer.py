@@ -0,0 +1,102 @@
+import pytest
+
+from hindley_milner.src import check, engine
+from hindley_milner.src.env import EnvKeyError
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.parse import parse
+from hindley_milner.src.syntax import Ident
+from hindley_milner.src.typ import Int
+from hindley_milner.src.unifier_set import UnificationError
+
+PROGRAMS = [
+    "3",
+    "fn x => zero x",
+    "pair 3 true",
+    "fn f => fn x => f (f x)",
+    "let val f = fn a => a in pair (f 3) (f true) end",
+    "let fun length l = if null l then 0 else succ (length (tail l)) in length end",
+    "let fun f x y = times x y in f end",
+    "fn x => pair x x",
+    "let val x = 1 in let val x = pair x x in x end end",
+    "fn y => let val g = fn x => pair x y in pair (g 1) (g true) end",
+]
+
+BAD_PROGRAMS = [
+    "if 555 then true else false",
+    "fn f => pair (f 3) (f true)",
+    "succ true",
+    "frobnicate 3",
+    "let val f = fn x => f x in f end",
+    "fn y => let val g = y in pair (g 1) (g true) end",
+]
+
+
+@pytest.mark.parametrize("src", PROGRAMS)
+def test_same_types_as_recursive(src):
+    rec_checker, it_checker = check.Checker(engine=engine.REFERENCE), check.Checker()
+    rec_ast, it_ast = parse(src), parse(src)
+
+    rec_type = rec_checker.concretize(rec_ast.infer_type(rec_checker))
+    it_type = it_checker.concretize(infer_type(it_ast, it_checker))
+
+    assert str(rec_type) == str(it_type)
+    assert it_ast.type is not None
+
+
+@pytest.mark.parametrize("src", BAD_PROGRAMS)
+def test_same_errors_as_recursive(src):
+    with pytest.raises((UnificationError, EnvKeyError)) as rec_err:
+        parse(src).infer_type(check.Checker(engine=engine.REFERENCE))
+
+    with pytest.raises((UnificationError, EnvKeyError)) as it_err:
+        infer_type(parse(src), check.Checker())
+
+    assert type(rec_err.value) is type(it_err.value)
+    assert vars(rec_err.value) == vars(it_err.value)  # The failing node too.
+
+
+def test_val_is_not_recursive():
+    checker = check.Checker()
+    t = infer_type(parse("let val x = 1 in let val x = pair x x in x end end"), checker)
+    assert str(checker.concretize(t)) == "(Int × Int)"
+    with pytest.raises(EnvKeyError):
+        infer_type(parse("let val f = fn x => f x in f end"), check.Checker())
+
+
+def test_error_records_failing_node():
+    src = "pair 1 (succ true)"
+    with pytest.raises(UnificationError) as err:
+        infer_type(parse(src), check.Checker())
+    start, end = err.value.node.span
+    assert src[start:end] == "(succ true)"
+
+
+def test_scope_is_restored_after_error():
+    checker = check.Checker()
+    env = checker.type_env
+    with pytest.raises(UnificationError):
+        infer_type(parse("fn x => succ (zero x)"), checker)
+    assert checker.type_env is env
+
+
+def test_long_application_spine():
+    n = 5000
+    checker = check.Checker()
+    checker.type_env[Ident("f")] = checker.fresh_var(non_generic=True)
+    ast = parse("f" + " 1" * n)
+    infer_type(ast, checker)
+
+
+def test_long_let_chain():
+    n = 2000
+    decls = "".join(f"let val x{i + 1} = succ x{i} in " for i in range(n))
+    src = "let val x0 = 0 in " + decls + f"x{n}" + " end" * (n + 1)
+    checker = check.Checker()
+    assert checker.concretize(infer_type(parse(src), checker)) == Int
+
+
+def test_deeply_nested_arguments():
+    n = 5000
+    src = "succ (" * n + "0" + ")" * n
+    checker = check.Checker()
+    assert checker.concretize(infer_type(parse(src), checker)) == Int
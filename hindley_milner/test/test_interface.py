@@ -0,0 +1,108 @@
+import pytest
+
+from hindley_milner.src import check, interface, module, typ
+from hindley_milner.src.env import EnvKeyError
+from hindley_milner.src.parse import parse, parse_module
+from hindley_milner.src.syntax import Ident
+
+LIB = """
+    fun twice f x = f (f x)
+    val four = twice succ 2
+    fun len l = if null l then 0 else succ (len (tail l))
+    val swap = fn p => pair (snd p) (fst p)
+"""
+
+
+@pytest.fixture
+def lib_exports():
+    return module.check_module(parse_module(LIB), check.Checker())
+
+
+def test_check_module(lib_exports):
+    assert list(lib_exports) == ["twice", "four", "len", "swap"]
+    assert lib_exports["four"] == typ.Scheme([], typ.Int)
+    assert len(lib_exports["twice"].bound) == 1
+
+
+def rename(t, names):
+    if type(t) is typ.Var:
+        return names.get(t, t)
+    elif isinstance(t, typ.Poly) and t.vals:
+        return type(t)(*[rename(x, names) for x in t.vals])
+    return t
+
+
+def alpha_equivalent(s1: typ.Scheme, s2: typ.Scheme) -> bool:
+    """
+    Whether `s1` and `s2` are the same scheme, up to the names of their
+    bound variables, which are matched by position.
+    """
+    names = dict(zip(s1.bound, s2.bound))
+    return len(s1.bound) == len(s2.bound) and rename(s1.body, names) == s2.body
+
+
+def test_scheme_round_trip(lib_exports):
+    for scheme in lib_exports.values():
+        decoded = interface.decode_scheme(interface.encode_scheme(scheme))
+        assert alpha_equivalent(decoded, scheme)
+
+
+def test_free_variables_do_not_collide():
+    checker = check.Checker()
+    a, b = checker.fresh_var(), checker.fresh_var()
+    scheme = typ.Scheme([b], typ.Fn(a, b))
+    data = interface.encode_scheme(scheme)
+    first, second = interface.decode_scheme(data), interface.decode_scheme(data)
+    free = {*typ.type_vars(first.body), *typ.type_vars(second.body)} - {*first.bound, *second.bound}
+    assert len(free) == 2
+    assert not free & {a, b, checker.fresh_var()}
+
+
+def test_interface_file(tmp_path, lib_exports):
+    path = tmp_path / "lib.hmi"
+    interface.write_interface(str(path), lib_exports)
+
+    iface = interface.InterfaceFile(str(path))
+    assert len(iface) == 4
+    assert sorted(iface.names()) == sorted(lib_exports)
+    assert iface._cache == {}
+    assert str(iface[Ident("len")]) == "∀α. ((list α) → Int)"
+    assert list(iface._cache) == ["len"]
+    assert iface.get(Ident("nope")) is None
+
+
+def test_downstream_check_uses_interface(tmp_path, lib_exports):
+    path = tmp_path / "lib.hmi"
+    interface.write_interface(str(path), lib_exports)
+
+    checker = check.Checker()
+    interface.import_interface(checker, str(path))
+    t = parse("pair (twice pred four) (len (cons (fst (swap (pair true 1))) nil))").infer_type(checker)
+    assert checker.concretize(t) == typ.Tuple(typ.Int, typ.Int)
+
+    with pytest.raises(EnvKeyError):
+        parse("frobnicate").infer_type(checker)
+
+
+def test_bad_magic():
+    with pytest.raises(interface.InterfaceError):
+        interface.InterfaceFile(b"nope" + bytes(8))
+
+
+@pytest.mark.parametrize("data", [b"", b"HMI"])
+def test_truncated_file(tmp_path, data):
+    path = tmp_path / "lib.hmi"
+    path.write_bytes(data)
+    with pytest.raises(interface.InterfaceError):
+        interface.InterfaceFile(str(path))
+
+
+def test_shared_subterms_are_encoded_once():
+    a = typ.Var("a")
+    t = typ.Tuple(a, a)
+    for _ in range(100):
+        t = typ.Tuple(t, t)  # 2 ** 101 leaves as a tree.
+    data = interface.encode_scheme(typ.Scheme([a], t))
+    assert len(data) < 102 * 20
+    decoded = interface.decode_scheme(data).body
+    assert decoded.vals[0] is decoded.vals[1]
@@ -0,0 +1,72 @@
+import pytest
+
+from hindley_milner.src import check, program, typ
+from hindley_milner.src.budget import Budget
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.parse import parse, parse_module
+from hindley_milner.test.test_infer import BAD_PROGRAMS, PROGRAMS
+
+REPEATING = [
+    "pair (fn x => pair x 1) (fn x => pair x 1)",
+    "let val f = fn x => pair x (succ 1) in pair (f true) (fn x => pair x (succ 1)) end",
+    "let val f = fn g => g (g 1) in pair (f (fn x => x)) (f (fn x => x)) end",
+    "pair (fn x => succ x) (let val succ = not in fn x => succ x end)",
+    "let val a = fn x => cons x nil in let val b = fn x => cons x nil in pair (a 1) (b true) end end",
+    "fn y => pair (fn x => pair x y) (fn x => pair x y)",
+    "pair (if true then fn x => x else fn x => x) (if true then fn x => x else fn x => x)",
+    "let val k = (fn x => fn y => x) in pair ((fn x => fn y => x) 1 true) (k true 1) end",
+]
+
+
+def outcome(ast):
+    checker = check.Checker()
+    try:
+        t = checker.concretize(infer_type(ast, checker))
+    except Exception as err:
+        return type(err).__name__
+    names = {v: typ.Var(f"t{i}") for i, v in enumerate(typ.type_vars(t))}
+    return str(checker._substitute(t, names))
+
+
+@pytest.mark.parametrize("src", PROGRAMS + BAD_PROGRAMS + REPEATING)
+def test_same_types_as_plain_parse(src):
+    assert outcome(parse(src, intern=True)) == outcome(parse(src))
+
+
+def error_spans(src, ast, recover):
+    result = program.infer_source(src, ast, check.Checker(), recover=recover)
+    return [(d.start, d.end) for d in [result.error] + result.errors if d is not None]
+
+
+@pytest.mark.parametrize("recover", [False, True])
+@pytest.mark.parametrize("src", BAD_PROGRAMS + [
+    "pair (fn a => succ a) (let val a = true in succ a end)",
+    "pair (if 1 then 2 else 3) (if 1 then 2 else 3)",
+    "pair (fn x => x) (let val x = 1 in let val y = nope in fn x => x end end)",
+])
+def test_errors_are_reported_at_the_failing_use(src, recover):
+    assert error_spans(src, parse(src, intern=True), recover) == error_spans(src, parse(src), recover)
+
+
+def test_identical_subtrees_share_a_node():
+    ast = parse("pair (pair 1 true) (pair 1 true)", intern=True)
+    assert ast.arg is ast.fn.arg
+    assert ast.arg.fn.arg is not ast.arg.arg  # `1` and `true` stay apart.
+    assert ast.arg.span == (5, 18)  # Its first occurrence.
+
+
+def test_module_declarations_are_interned_together():
+    [(_, f), (_, g)] = parse_module("val f = fn x => succ x val g = fn x => succ x", intern=True)
+    assert f is g
+
+
+def test_closed_shared_subtrees_are_inferred_once():
+    lam = "(fn f => fn x => f (f (f x)))"
+    src = f"pair (pair ({lam} succ) ({lam} not)) (pair ({lam} succ) ({lam} not))"
+
+    def unify_steps(ast):
+        limits = Budget()
+        infer_type(ast, check.Checker(budget=limits))
+        return limits.unify_steps
+
+    assert unify_steps(parse(src, intern=True)) < unify_steps(parse(src)) / 2
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import threading
+
+from hindley_milner.src import lsp
+
+URI = "file:///main.hm"
+
+
+class Client:
+    """
+    Talks to a `LanguageServer` over in-memory streams.
+    """
+
+    def __init__(self, debounce=0.0):
+        self.reader = asyncio.StreamReader()
+        self.inbox = asyncio.Queue()
+        self.server = lsp.LanguageServer(self.reader, self._receive, debounce=debounce)
+        self.task = asyncio.ensure_future(self.server.serve())
+        self.next_id = 0
+
+    def _receive(self, data: bytes):
+        _, _, body = data.partition(b"\r\n\r\n")
+        self.inbox.put_nowait(json.loads(body))
+
+    def notify(self, method, params):
+        self.reader.feed_data(lsp.frame({"jsonrpc": "2.0", "method": method, "params": params}))
+
+    def request(self, method, params):
+        self.next_id += 1
+        self.reader.feed_data(lsp.frame({"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params}))
+        return self.next_id
+
+    async def receive(self, pred, timeout=5):
+        while True:
+            message = await asyncio.wait_for(self.inbox.get(), timeout)
+            if pred(message):
+                return message
+
+    async def response(self, request_id):
+        return await self.receive(lambda m: m.get("id") == request_id)
+
+    async def diagnostics(self):
+        message = await self.receive(lambda m: m.get("method") == "textDocument/publishDiagnostics")
+        return message["params"]
+
+    def open(self, text, version=1):
+        item = {"uri": URI, "languageId": "hm", "version": version, "text": text}
+        self.notify("textDocument/didOpen", {"textDocument": item})
+
+    def change(self, version, *changes):
+        doc = {"uri": URI, "version": version}
+        self.notify("textDocument/didChange", {"textDocument": doc, "contentChanges": list(changes)})
+
+    async def hover(self, line, character):
+        pos = {"line": line, "character": character}
+        request_id = self.request("textDocument/hover", {"textDocument": {"uri": URI}, "position": pos})
+        return (await self.response(request_id))["result"]
+
+    async def close(self):
+        await self.response(self.request("shutdown", None))
+        self.notify("exit", None)
+        return await asyncio.wait_for(self.task, 5)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_initialize_and_shutdown():
+    async def session():
+        client = Client()
+        response = await client.response(client.request("initialize", {"capabilities": {}}))
+        assert response["result"]["capabilities"]["hoverProvider"]
+        return await client.close()
+
+    assert run(session()) == 0
+
+
+def test_diagnostics_for_type_error():
+    async def session():
+        client = Client()
+        client.open("pair 1\n  (succ true)")
+        params = await client.diagnostics()
+        await client.close()
+        return params
+
+    params = run(session())
+    assert params["version"] == 1
+    [diagnostic] = params["diagnostics"]
+    assert diagnostic["message"] == "Type mismatch: Int != Bool"
+    assert diagnostic["range"] == {"start": {"line": 1, "character": 2},
+                                   "end": {"line": 1, "character": 13}}
+
+
+def test_diagnostics_for_unknown_symbol_and_parse_error():
+    async def session():
+        client = Client()
+        client.open("succ nope")
+        first = await client.diagnostics()
+        client.change(2, {"text": "let val x = in x end"})
+        second = await client.diagnostics()
+        client.change(3, {"text": "succ 1"})
+        third = await client.diagnostics()
+        await client.close()
+        return first, second, third
+
+    first, second, third = run(session())
+    assert first["diagnostics"][0]["code"] == "unknown-symbol"
+    assert first["diagnostics"][0]["range"]["start"] == {"line": 0, "character": 5}
+    assert second["diagnostics"][0]["code"] == "parsing"
+    assert third["diagnostics"] == []
+
+
+def test_hover_subexpressions():
+    async def session():
+        client = Client()
+        client.open("let val id = fn x => x in pair (id 1) (id true) end")
+        await client.diagnostics()
+        hovers = [await client.hover(0, i) for i in (8, 16, 31, 40)]
+        await client.close()
+        return hovers
+
+    binder, param, call, ident = run(session())
+    assert binder["contents"]["value"] == "(α → α)"
+    assert param["contents"]["value"] == "α"
+    assert call["contents"]["value"] == "Int"
+    assert call["range"]["start"] == {"line": 0, "character": 31}
+    assert ident["contents"]["value"] == "(Bool → Bool)"
+
+
+def test_hover_in_module():
+    async def session():
+        client = Client()
+        client.open("val one = 1\nfun twice f x = f (f x)")
+        await client.diagnostics()
+        hover = await client.hover(1, 5)
+        await client.close()
+        return hover
+
+    hover = run(session())
+    assert hover["contents"]["value"] == "((ε → ε) → (ε → ε))"
+
+
+def test_incremental_changes_are_debounced():
+    async def session():
+        client = Client(debounce=0.05)
+        client.open("succ 1")
+        for version, char in enumerate("234", start=2):
+            start = {"line": 0, "character": 5}
+            end = {"line": 0, "character": 6}
+            client.change(version, {"range": {"start": start, "end": end}, "text": char})
+        client.change(5, {"range": {"start": {"line": 0, "character": 0},
+                                    "end": {"line": 0, "character": 4}}, "text": "not"})
+        params = await client.diagnostics()
+        assert client.server.documents[URI].text == "not 4"
+        await client.close()
+        assert client.inbox.empty()
+        return params
+
+    params = run(session())
+    assert params["version"] == 5
+    assert params["diagnostics"][0]["message"] == "Type mismatch: Bool != Int"
+
+
+def test_hover_not_blocked_by_slow_check(monkeypatch):
+    release = threading.Event()
+    analyze = lsp.analyze
+
+    def slow_analyze(text):
+        if "succ" in text:
+            release.wait(5)
+        return analyze(text)
+
+    monkeypatch.setattr(lsp, "analyze", slow_analyze)
+
+    async def session():
+        client = Client()
+        client.open("not true")
+        await client.diagnostics()
+        client.change(2, {"range": {"start": {"line": 0, "character": 9},
+                                    "end": {"line": 0, "character": 9}},
+                          "text": " succ 1"})
+        await asyncio.sleep(0.01)  # Let the slow check start.
+        hover = await client.hover(0, 0)
+        release.set()
+        params = await client.diagnostics()
+        await client.close()
+        return hover, params
+
+    hover, params = run(session())
+    assert hover["contents"]["value"] == "(Bool → Bool)"
+    assert params["version"] == 2
+
+
+def test_unknown_request():
+    async def session():
+        client = Client()
+        response = await client.response(client.request("workspace/symbol", {"query": ""}))
+        await client.close()
+        return response
+
+    assert run(session())["error"]["code"] == lsp.METHOD_NOT_FOUND
@@ -0,0 +1,51 @@
+import sys
+import tracemalloc
+
+import pytest
+
+from hindley_milner.__main__ import main
+from hindley_milner.src import check, memprofile
+from hindley_milner.src.parse import parse
+
+PROGRAM = "let fun f x = pair x x in let val a = f (f 1) in let val b = f (f true) in pair a b end end end"
+
+
+def test_report():
+    result, report = memprofile.profile_check(PROGRAM)
+    assert str(result.type).startswith("(((Int × Int)")
+    assert set(report.phases) == {"parse", "infer"}
+    assert "hindley_milner.src.parse.parser" in report.phases["parse"]
+    assert "hindley_milner.src.unifier_set" in report.phases["infer"]
+    assert memprofile.__name__ not in report.phases["infer"]
+    assert report.peak > 0
+    assert report.classes["Let"][0] == 3
+    assert report.classes["Var"][0] > 0
+    assert report.unifier_entries > 0
+    assert "live objects" in report.format()
+    assert not tracemalloc.is_tracing()
+
+
+def test_census_counts_shared_objects_once():
+    ast = parse("pair (succ 1) (succ 1)", intern=True)
+    assert memprofile.census(ast, check.Checker())["Call"] == (3, 3 * sys.getsizeof(ast))
+
+
+def test_rejected_program_has_no_infer_phase():
+    result, report = memprofile.profile_check("succ )")
+    assert result.error.kind == "parsing"
+    assert list(report.phases) == ["parse"]
+
+
+def test_check_command(tmp_path, capsys):
+    path = tmp_path / "prog.hm"
+    path.write_text(PROGRAM)
+    assert main(["--memprofile", "check", str(path)]) == 0
+    out, err = capsys.readouterr()
+    assert '"type"' in out
+    assert "peak traced memory" in err
+
+
+def test_check_command_rejects_cache(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        main(["--memprofile", "check", "--cache", str(tmp_path), "-"])
+    assert "--memprofile can't be used with --cache" in capsys.readouterr().err
@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import pytest
+
+from hindley_milner.src import check, module, parallel
+from hindley_milner.src.parse import parse, parse_module
+from hindley_milner.src.typ import Int, Bool, Tuple
+from hindley_milner.src.unifier_set import UnificationError
+from hindley_milner.test.test_interface import alpha_equivalent
+
+PROGRAM = """
+    let val a = succ 1 in
+    let val b = pair true in
+    let fun len l = if null l then 0 else succ (len (tail l)) in
+    let val c = b a in
+    let val d = zero a in
+    pair c (pair d (len (cons 1 nil)))
+    end end end end end
+"""
+
+
+def test_dependencies_resolve_to_nearest_binding():
+    bindings, _ = parallel.let_chain(parse(PROGRAM))
+    assert parallel.dependencies(bindings) == [set(), set(), {2}, {0, 1}, {0}]
+
+
+def test_chain_stops_at_val_using_outer_binding_of_its_name():
+    bindings, body = parallel.let_chain(parse("let val x = 1 in let val y = x in let val x = pair x y in x end end end"))
+    assert [left.name for left, _ in bindings] == ["x", "y"]
+    assert not body.recursive and body.left.name == "x"
+
+
+def test_levels():
+    assert parallel.levels([set(), set(), {2}, {0, 1}, {0}]) == [[[0], [1], [2]], [[3], [4]]]
+
+
+def test_same_type_as_sequential():
+    sequential = check.Checker()
+    expected = sequential.concretize(parse(PROGRAM).infer_type(sequential))
+
+    checker = check.Checker()
+    with ThreadPoolExecutor(2) as pool:
+        actual = checker.concretize(parallel.infer_parallel(parse(PROGRAM), checker, pool))
+
+    assert actual == expected == Tuple(Tuple(Bool, Int), Tuple(Bool, Int))
+
+
+def test_worker_processes():
+    checker = check.Checker()
+    with ProcessPoolExecutor(2) as pool:
+        t = parallel.infer_parallel(parse(PROGRAM), checker, pool)
+    assert checker.concretize(t) == Tuple(Tuple(Bool, Int), Tuple(Bool, Int))
+
+
+def test_first_error_in_program_order():
+    src = """
+        let val a = succ true in
+        let val b = not 1 in
+        a end end
+    """
+    with pytest.raises(UnificationError) as err:
+        with ThreadPoolExecutor(2) as pool:
+            parallel.infer_parallel(parse(src), check.Checker(), pool)
+    assert err.value.msg == "Type mismatch: Int != Bool"
+    assert err.value.node == parse("succ true")
+
+
+def test_module_exports_match_sequential():
+    src = "fun twice f x = f (f x) val four = twice succ 2 fun id x = x val p = pair (id 1) (id true)"
+    expected = module.check_module(parse_module(src), check.Checker())
+    with ThreadPoolExecutor(2) as pool:
+        actual = parallel.check_module_parallel(parse_module(src), pool)
+    assert list(actual) == list(expected)
+    for name in expected:
+        assert alpha_equivalent(actual[name], expected[name])
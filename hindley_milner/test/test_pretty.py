@@ -0,0 +1,100 @@
+import re
+
+from hindley_milner.src import check, typ
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.parse import parse
+from hindley_milner.src.pretty import show_type, write_type
+
+
+def expand(text: str) -> str:
+    """
+    Substitutes `where` abbreviations back into the type they abbreviate.
+    """
+    body, _, defs = text.partition(" where ")
+    table = dict(re.findall(r"(T\d+) = (.*?)(?:, (?=T\d+ = )|$)", defs))
+    pattern = re.compile(r"T\d+")
+    while pattern.search(body):
+        body = pattern.sub(lambda m: table[m.group()], body)
+    return body
+
+
+def doubling(depth):
+    a = typ.Var("α")
+    t = typ.Tuple(a, a)
+    for _ in range(depth):
+        t = typ.Tuple(t, t)
+    return typ.Fn(a, t)
+
+
+def test_unshared_types_print_as_str():
+    a, b = typ.Var("α"), typ.Var("β")
+    types = [
+        typ.Int,
+        typ.Fn(a, typ.Fn(b, typ.Tuple(a, b))),
+        typ.List(typ.List(typ.Tuple(typ.Int, typ.Bool, a))),
+        typ.Fn(typ.Fn(a, a), typ.Fn(a, a)),
+    ]
+    for t in types:
+        assert show_type(t) == str(t)
+
+
+def test_abbreviations_expand_to_str():
+    t = doubling(6)
+    text = show_type(t)
+    assert " where " in text
+    assert len(text) < len(str(t)) / 5
+    assert expand(text) == str(t)
+
+
+def test_structurally_equal_subterms_are_shared():
+    def big():
+        return typ.Fn(typ.List(typ.Tuple(typ.Int, typ.Bool)), typ.List(typ.Tuple(typ.Bool, typ.Int)))
+    t = typ.Tuple(big(), big())  # Equal, but not the same objects.
+    text = show_type(t)
+    assert text.startswith("(T1 × T1) where T1 = ")
+    assert expand(text) == str(t)
+
+
+def test_output_proportional_to_dag():
+    text = show_type(doubling(200))  # 2 ** 200 nodes as a tree.
+    assert len(text) < 200 * 30
+
+
+def test_writes_incrementally():
+    class Sink:
+        def __init__(self):
+            self.writes = []
+
+        def write(self, s):
+            self.writes.append(s)
+
+    sink = Sink()
+    write_type(doubling(100), sink)
+    assert len(sink.writes) > 100
+    assert max(len(s) for s in sink.writes) < 20
+
+
+def test_deep_types():
+    t = typ.Int
+    for _ in range(50_000):
+        t = typ.List(t)
+    text = show_type(t)
+    assert text.count("(list ") == 50_000
+
+
+def test_scheme():
+    a = typ.Var("a")
+    assert show_type(typ.Scheme([a], typ.Fn(a, a))) == "∀a. (a → a)"
+
+
+def test_inferred_types_keep_their_sharing():
+    src = "let val f0 = fn x => pair x x in "
+    for i in range(1, 5):
+        src += f"let val f{i} = fn y => f{i - 1} (f{i - 1} y) in "
+    src += "f4" + " end" * 5
+    checker = check.Checker()
+    t = checker.concretize(infer_type(parse(src), checker))
+    # The tree has 2 ** 16 leaves; printing must not visit them.
+    text = show_type(t)
+    assert text.count(" where ") == 1
+    assert len(text) < 5000
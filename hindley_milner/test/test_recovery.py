@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from hindley_milner.__main__ import main
+from hindley_milner.src import check, lsp, program, typ, unifier_set
+
+
+def recovered(src):
+    result = program.check_source(src, recover=True)
+    assert result.type is None
+    assert result.error == result.errors[0]
+    return result
+
+
+def errors(src):
+    return [(src[d.start:d.end], d.message) for d in recovered(src).errors]
+
+
+def test_independent_errors_are_all_reported_in_source_order():
+    assert errors("pair (succ true) (pair (not 1) (if 1 then 2 else 3))") == [
+        ("(succ true)", "Type mismatch: Int != Bool"),
+        ("(not 1)", "Type mismatch: Bool != Int"),
+        ("1", "Type mismatch: Int != Bool"),
+    ]
+
+
+@pytest.mark.parametrize("src, expected", [
+    # Uses of a binding whose right side failed.
+    ("let val x = succ true in pair (not x) (plus x 1) end", [("succ true", "Type mismatch: Int != Bool")]),
+    # Applying the result of a failed call.
+    ("let val f = foo in f 1 2 end", [("foo", "Semantic Error: Unrecognized symbol 'foo'!")]),
+    # Parts of a failed structure.
+    ("let val p = pair (succ true) 1 in succ (fst p) end", [("(succ true)", "Type mismatch: Int != Bool")]),
+])
+def test_cascading_errors_are_suppressed(src, expected):
+    assert errors(src) == expected
+
+
+def test_unknown_name_is_reported_at_its_first_use():
+    assert [(d.colno, d.message) for d in recovered("pair (nope 1) (nope true)").errors] == [
+        (7, "Semantic Error: Unrecognized symbol 'nope'!"),
+    ]
+
+
+def test_language_server_reports_unknown_name_at_its_first_use():
+    diagnostics = lsp.analyze("val a = nope 1\nval b = nope true").diagnostics
+    assert [(d.lineno, d.colno) for d in diagnostics] == [(1, 9)]
+
+
+def test_uses_of_a_declared_binding_get_its_declared_type():
+    assert errors("let val g : Int -> Bool = succ in pair (g 1) (g true) end") == [
+        ("succ", "Type mismatch: Bool != Int"),
+        ("(g true)", "Type mismatch: Int != Bool"),
+    ]
+
+
+def test_without_recovery_only_the_first_error_is_reported():
+    result = program.check_source("pair (succ true) (not 1)")
+    assert result.error.message == "Type mismatch: Bool != Int"
+    assert result.errors == []
+    assert "errors" not in result.as_dict()
+
+
+def test_checker_is_left_as_it_was():
+    checker = check.Checker()
+    assert len(program.check_source("pair (succ true) (not 1)", checker, recover=True).errors) == 2
+    assert checker.errors is None
+    assert program.check_source("succ 1", checker, recover=True).type == typ.Int
+
+
+def test_error_type_unifies_with_anything():
+    unifiers = unifier_set.UnifierSet()
+    a = unifiers.fresh_var()
+    unifiers.unify(typ.Fn(typ.Int, typ.Error), typ.Fn(typ.Int, typ.Bool))
+    unifiers.unify(a, typ.Error)
+    unifiers.unify(a, typ.List(typ.Int))
+    assert unifiers.concretize(a) == typ.Error
+
+
+def test_language_server_publishes_every_error():
+    text = "val a = succ true\nval b = not 1\nval c = pair a b"
+    analysis = lsp.analyze(text)
+    assert [(d.lineno, d.message) for d in analysis.diagnostics] == [
+        (1, "Type mismatch: Int != Bool"),
+        (2, "Type mismatch: Bool != Int"),
+    ]
+
+
+def test_check_command(tmp_path, capsys):
+    path = tmp_path / "prog.hm"
+    path.write_text("pair (succ true) (not 1)")
+    assert main(["check", "--all-errors", str(path)]) == 1
+    record = json.loads(capsys.readouterr().out)
+    assert [e["colno"] for e in record["errors"]] == [6, 18]
+
+
+def test_check_command_with_memprofile(tmp_path, capsys):
+    path = tmp_path / "prog.hm"
+    path.write_text("pair (succ true) (not 1)")
+    assert main(["--memprofile", "check", "--all-errors", str(path)]) == 1
+    out, err = capsys.readouterr()
+    assert [e["colno"] for e in json.loads(out)["errors"]] == [6, 18]
+    assert "peak traced memory" in err
@@ -0,0 +1,53 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from hindley_milner.src import check, parallel, shared, signatures
+from hindley_milner.src.parse import parse
+
+IMPORTED = dict([
+    signatures.parse_signature("frobnicate : Int -> list Bool"),
+    signatures.parse_signature("succ : Bool -> Bool"),  # Shadows the prelude.
+])
+
+
+def lookup(name, key):
+    return str(shared.attach(name)[key])
+
+
+def test_workers_look_up_shared_schemes():
+    with shared.SharedTypes.with_prelude(IMPORTED) as types:
+        with ProcessPoolExecutor(2) as pool:
+            found = list(pool.map(lookup, [types.name] * 3, ["frobnicate", "succ", "pair"]))
+    assert found[:2] == ["(Int → (list Bool))", "(Bool → Bool)"]
+    assert found[2].startswith("∀")
+
+
+def test_closed_segments_are_removed():
+    types = shared.SharedTypes(IMPORTED)
+    shared.attach(types.name)
+    types.close()
+    with pytest.raises(FileNotFoundError):
+        shared.attach(types.name)
+
+
+def test_parallel_bindings_use_shared_types():
+    src = "let val a = frobnicate 1 in let val b = succ true in pair a b end end"
+    checker = check.Checker()
+    with shared.SharedTypes.with_prelude(IMPORTED) as types:
+        with ProcessPoolExecutor(2) as pool:
+            t = parallel.infer_parallel(parse(src), checker, pool, types)
+    assert str(checker.concretize(t)) == "((list Bool) × Bool)"
+
+
+@pytest.mark.parametrize("src, expected", [
+    ("let val a = 1 in frobnicate a end", "(list Bool)"),
+    ("let val a = succ true in pair a (succ false) end", "(Bool × Bool)"),
+    ("frobnicate 1", "(list Bool)"),  # No bindings to check in parallel.
+])
+def test_body_uses_shared_types(src, expected):
+    checker = check.Checker()
+    with shared.SharedTypes.with_prelude(IMPORTED) as types:
+        with ProcessPoolExecutor(2) as pool:
+            t = parallel.infer_parallel(parse(src), checker, pool, types)
+    assert str(checker.concretize(t)) == expected
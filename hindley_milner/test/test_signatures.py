@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+from hindley_milner.src import check, signatures, std_env, typ
+from hindley_milner.src.env import Env, EnvKeyError
+from hindley_milner.src.parse import parse
+from hindley_milner.src.signatures import SignatureFile, SignatureError
+from hindley_milner.src.syntax import Ident
+
+SIGS = """\
+# A tiny prelude.
+swap : a * b -> b * a
+konst : Int -> a -> Int
+"""
+
+
+@pytest.fixture
+def sig_path(tmp_path):
+    path = tmp_path / "tiny.sig"
+    path.write_text(SIGS)
+    signatures.write_index(str(path))
+    return str(path)
+
+
+def test_parse_type_round_trip():
+    for text in ["a -> b -> a * b", "(a -> b) -> list a -> list b", "list (a * Int) -> Bool"]:
+        t = signatures.parse_type(text)
+        assert signatures.format_type(t) == text
+        assert signatures.parse_type(signatures.format_type(t)) == t
+
+
+def test_bad_signature():
+    with pytest.raises(SignatureError):
+        signatures.parse_signature("swap a -> a")
+    with pytest.raises(SignatureError):
+        signatures.parse_type("a -> ")
+
+
+def test_entries_load_lazily(sig_path):
+    sigs = SignatureFile(sig_path)
+    assert sigs._cache == {}
+
+    scheme = sigs[Ident("swap")]
+    assert str(scheme) == "∀a b. ((a × b) → (b × a))"
+    assert list(sigs._cache) == ["swap"]
+    assert sigs[Ident("swap")] is scheme
+
+
+def test_missing_entry(sig_path):
+    sigs = SignatureFile(sig_path)
+    assert sigs.get(Ident("nope")) is None
+    with pytest.raises(EnvKeyError):
+        Env(locals=sigs)[Ident("nope")]
+
+
+def test_stale_index_is_rebuilt(sig_path):
+    with open(sig_path, "a") as f:
+        f.write("extra : Bool\n")
+    sigs = SignatureFile(sig_path)
+    assert sigs[Ident("extra")] == typ.Scheme([], typ.Bool)
+    assert sorted(sigs.names()) == ["extra", "konst", "swap"]
+
+
+def test_index_of_an_edit_of_the_same_size_is_rebuilt(sig_path):
+    with open(sig_path, "w") as f:
+        f.write(SIGS.replace("konst", "kinst"))
+    sigs = SignatureFile(sig_path)
+    assert sorted(sigs.names()) == ["kinst", "swap"]
+    assert sigs.get(Ident("konst")) is None
+
+
+def test_opening_an_untouched_file_does_not_hash_it(sig_path, monkeypatch):
+    def digest(data):
+        raise AssertionError("hashed")
+    monkeypatch.setattr(signatures, "_digest", digest)
+    assert SignatureFile(sig_path)._index_is_current()
+
+
+def test_index_of_a_touched_but_unchanged_file_is_current(sig_path):
+    os.utime(sig_path, ns=(0, 0))
+    assert SignatureFile(sig_path)._index_is_current()
+
+
+def test_shipped_index_is_current():
+    with open(std_env.PRELUDE_PATH, "rb") as f:
+        expected = signatures.build_index(f.read())
+    with open(std_env.PRELUDE_PATH[:-len(".sig")] + ".idx", "rb") as f:
+        actual = f.read()
+    # The modification time recorded is the one it was written with.
+    size, _, digest = actual.split(b"\n")[0].split(b" ")[1:]
+    assert [size, digest] == expected.split(b"\n")[0].split(b" ")[1::2]
+    assert actual.split(b"\n")[1:] == expected.split(b"\n")[1:]
+
+
+def test_prelude_lookup_through_ident():
+    checker = check.Checker()
+    t = parse("map succ").infer_type(checker)
+    assert checker.concretize(t) == typ.Fn(typ.List(typ.Int), typ.List(typ.Int))
@@ -0,0 +1,37 @@
+import pytest
+
+from hindley_milner.src import check, std_env, typ
+from hindley_milner.src.parse import parse
+from hindley_milner.src.syntax import Ident
+
+
+def test_prelude_is_shared():
+    c1, c2 = check.Checker(), check.Checker()
+    assert c1.type_env.parent is std_env.PRELUDE
+    assert c2.type_env.parent is std_env.PRELUDE
+
+
+def test_prelude_is_immutable():
+    with pytest.raises(TypeError):
+        std_env.PRELUDE[Ident("succ")] = typ.Bool
+
+
+def test_checker_construction_allocates_no_vars():
+    checker = check.Checker()
+    assert len(checker.unifiers.map) == 0
+
+
+def test_prelude_schemes_are_instantiated_on_use():
+    checker = check.Checker()
+    scheme = std_env.PRELUDE[Ident("pair")]
+    t1 = checker.instantiate(scheme)
+    t2 = checker.instantiate(scheme)
+    assert t1 != t2
+    assert not set(typ.type_vars(t1)) & set(scheme.bound)
+
+
+def test_bindings_shadow_prelude():
+    checker = check.Checker()
+    checker.type_env[Ident("succ")] = typ.Bool
+    assert parse("succ").infer_type(checker) == typ.Bool
+    assert checker.instantiate(std_env.PRELUDE[Ident("succ")]) == typ.Fn(typ.Int, typ.Int)
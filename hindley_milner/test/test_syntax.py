@@ -0,0 +1,71 @@
+import inspect
+import tracemalloc
+from dataclasses import dataclass
+
+from hindley_milner.src import check
+from hindley_milner.src.parse import parse
+from hindley_milner.src.syntax import AstNode, Annotated, Ident, Const, Lambda, Call, Let, If
+from hindley_milner.src.typ import Int
+
+
+@dataclass(eq=True)
+class DictCall:
+    """An unslotted stand-in for `Call`, for comparison."""
+    fn: object
+    arg: object
+
+
+def nodes(ast):
+    yield ast
+    for name in getattr(ast, "__dataclass_fields__", ()):
+        child = getattr(ast, name)
+        if isinstance(child, AstNode):
+            yield from nodes(child)
+
+
+def test_nodes_have_no_dict():
+    ast = parse("let fun f x = if zero x then pair x 1 else f (pred x) in f 3 end")
+    for node in nodes(ast):
+        assert not hasattr(node, "__dict__")
+
+
+def test_type_is_preallocated():
+    for node in [Ident("x"), Lambda(Ident("x"), Ident("x")), Call(Ident("f"), Ident("x"))]:
+        assert node._type is None
+
+    assert Const(3, Int)._type == Int
+
+
+def test_constructor_signatures():
+    def params(cls):
+        return list(inspect.signature(cls).parameters)
+
+    assert params(Ident) == ["name"]
+    assert params(Const) == ["value", "_type"]
+    assert params(Lambda) == ["param", "body", "annotation"]
+    assert params(Call) == ["fn", "arg"]
+    assert params(If) == ["pred", "yes", "no"]
+    assert params(Let) == ["left", "right", "body", "recursive"]
+    assert params(Annotated) == ["expr", "declared"]
+
+
+def test_slotted_nodes_use_less_memory():
+    n = 10_000
+    x = Ident("x")
+
+    def traced(build):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [build(x, x) for _ in range(n)]
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return after - before
+
+    assert traced(Call) < 0.75 * traced(DictCall)
+
+
+def test_infer_type_fills_type():
+    ast = parse("succ 3")
+    checker = check.Checker()
+    ast.infer_type(checker)
+    assert checker.concretize(ast.type) == Int
@@ -0,0 +1,60 @@
+import sys
+import threading
+
+import pytest
+
+from hindley_milner.src import check, signatures, std_env, syntax
+from hindley_milner.src.infer import infer_type
+from hindley_milner.src.parse import parse
+
+PROGRAMS = [
+    "let fun length l = if null l then 0 else succ (length (tail l)) in length end",
+    "let val id = fn x => x in pair (id 1) (id true) end",
+    "fn f => fn x => f (f x)",
+    "let val f = fn x => pair x x in fn y => f (f y) end",
+]
+
+
+def run_threads(target, n=8):
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def run(i):
+        barrier.wait()
+        results[i] = target(i)
+
+    old = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible.
+    try:
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(old)
+    return results
+
+
+def check_all():
+    types = []
+    for src in PROGRAMS * 10:
+        checker = check.Checker()
+        types.append(str(checker.concretize(infer_type(parse(src), checker))))
+    return types
+
+
+def test_threads_check_like_one_thread():
+    expected = check_all()
+    assert run_threads(lambda i: check_all()) == [expected] * 8
+
+
+def test_first_lookups_agree():
+    prelude = signatures.SignatureFile(std_env.PRELUDE_PATH)
+    schemes = run_threads(lambda i: prelude[syntax.Ident("cons")])
+    assert all(s is schemes[0] for s in schemes)
+
+
+def test_prelude_is_read_only():
+    with pytest.raises(TypeError):
+        std_env.PRELUDE[syntax.Ident("succ")] = None
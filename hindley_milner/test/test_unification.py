@@ -1,5 +1,8 @@
+import random
+
 import pytest
 
+from hindley_milner.src import bulk
 from hindley_milner.src.check import Checker
 from hindley_milner.src.typ import *
 from hindley_milner.src.unifier_set import UnificationError
@@ -101,3 +104,70 @@ def test_concretize():
     concrete = checker.concretize(tup)
     assert concrete == Tuple(List(Bool), Fn(List(Bool), Int))
 
+
+
+def random_equalities(unifiers, n, m, seed):
+    rng = random.Random(seed)
+    vs = [unifiers.fresh_var() for _ in range(n)]
+    pairs = [(rng.choice(vs), rng.choice(vs)) for _ in range(m)]
+    return vs, pairs
+
+
+@pytest.mark.parametrize("with_numpy", [True, False])
+def test_bulk_join_matches_one_by_one(monkeypatch, with_numpy):
+    if not with_numpy:
+        monkeypatch.setattr(bulk, "numpy", None)
+    elif bulk.numpy is None:
+        pytest.skip("NumPy isn't installed")
+    one_by_one, together = Checker(), Checker()
+    vs, pairs = random_equalities(one_by_one.unifiers, 3000, 2500, seed=1)
+    ws, _ = random_equalities(together.unifiers, 3000, 0, seed=1)
+    for v, w in zip(vs[:20], ws[:20]):
+        one_by_one.unifiers.non_generic_vars.add(v)
+        together.unifiers.non_generic_vars.add(w)
+    one_by_one.unify(vs[0], vs[1])  # Some classes exist already.
+    together.unify(ws[0], ws[1])
+    for a, b in pairs:
+        one_by_one.unify(a, b)
+    rename = dict(zip(vs, ws))
+    together.unifiers.unify_all((rename[a], rename[b]) for a, b in pairs)
+
+    def classes(unifiers, names):
+        return {frozenset(names[x] for x in c) for c in unifiers.sets()}
+    assert classes(one_by_one.unifiers, {v: i for i, v in enumerate(vs)}) == \
+        classes(together.unifiers, {w: i for i, w in enumerate(ws)})
+    for root, members in together.unifiers.as_dict().items():
+        assert together.unifiers.map[root] == len(members)
+    for v, w in zip(vs, ws):
+        assert one_by_one.is_non_generic(v) == together.is_non_generic(w)
+
+
+def test_bulk_join_with_structures():
+    checker = Checker()
+    n = bulk.MIN_EQUALITIES
+    vs = [checker.fresh_var() for _ in range(n + 1)]
+    checker.unify(vs[0], List(Int))
+    checker.unifiers.unify_all(zip(vs[:n], vs[1:]))
+    assert all(checker.concretize(v) == List(Int) for v in vs)
+    with pytest.raises(UnificationError):
+        checker.unifiers.unify_all(zip(vs[:n], [Int] * n))
+
+
+@pytest.mark.parametrize("min_equalities", [1, 10 ** 9])
+def test_non_genericity_does_not_depend_on_bulk_joins(monkeypatch, min_equalities):
+    # Unifying Tuple(*ys, *xs) with Tuple(*zs, *ys), with the xs non-generic.
+    monkeypatch.setattr(bulk, "MIN_EQUALITIES", min_equalities)
+    results = []
+    for together in (False, True):
+        checker = Checker()
+        xs, ys, zs = ([checker.fresh_var() for _ in range(64)] for _ in range(3))
+        for x in xs:
+            checker.unifiers.non_generic_vars.add(x)
+        pairs = list(zip(ys + xs, zs + ys))
+        if together:
+            checker.unifiers.unify_all(pairs)
+        else:
+            for a, b in pairs:
+                checker.unify(a, b)
+        results.append([[checker.is_non_generic(v) for v in vs] for vs in (xs, ys, zs)])
+    assert results[0] == results[1] == [[True] * 64, [True] * 64, [False] * 64]